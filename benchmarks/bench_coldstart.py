@@ -0,0 +1,144 @@
+"""
+Benchmark: Kaltstart des Monitors (Import-Zeit, --help/--list, Zeit bis zum ersten Frame)
+Jede Messung startet einen frischen Python-Prozess:
+  - Import-Zeit von pc_monitor (python -X importtime, kumuliert)
+  - Laufzeit von 'pc_monitor.py --help' und '--list' inkl. Interpreter-Start
+    und welche schweren Module dabei geladen werden
+  - Zeit vom Prozessstart bis zum ersten Frame am simulierten Display (pty,
+    --no-reset). Mit --lhm-hang nimmt ein Socket auf dem LHM-Port Verbindungen
+    an, antwortet aber nie - wie ein hängender LibreHardwareMonitor bzw.
+    Windows ohne LHM, wo der Verbindungsaufbau erst am Timeout scheitert.
+
+Nutzung:
+    python benchmarks/bench_coldstart.py                        # aktueller Stand
+    python benchmarks/bench_coldstart.py --lhm-hang             # LHM-Probe läuft ins Timeout
+    python benchmarks/bench_coldstart.py --script /tmp/alt/pc_monitor.py  # anderer Stand
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_display import FakeDisplay
+
+DEFAULT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pc_monitor.py')
+
+# Module, die --help/--list nicht laden sollten (außer serial für --list)
+HEAVY_MODULES = ('psutil', 'requests', 'serial', 'http.server', 'concurrent.futures', 'pynvml', 'GPUtil')
+
+# Führt pc_monitor.py mit den übergebenen Argumenten aus und meldet geladene schwere Module
+MODULES_PROBE = """
+import runpy, sys
+script = sys.argv[1]
+sys.argv = [script] + sys.argv[2:]
+sys.path.insert(0, __import__('os').path.dirname(script))
+try:
+    runpy.run_path(script, run_name='__main__')
+except SystemExit:
+    pass
+sys.stderr.write('MODULES ' + ','.join(m for m in {heavy!r} if m in sys.modules) + '\\n')
+"""
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def import_time(script):
+    """
+    Returns:
+        float: Kumulierte Import-Zeit von pc_monitor in Sekunden (laut -X importtime)
+    """
+    directory = os.path.dirname(os.path.abspath(script))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import pc_monitor'],
+                            cwd=directory, capture_output=True, text=True)
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == 'pc_monitor':
+            return int(parts[1]) / 1e6
+    raise RuntimeError(result.stderr[-500:])
+
+
+def run_command(script, args):
+    """
+    Returns:
+        tuple: (Laufzeit in Sekunden, Liste geladener schwerer Module)
+    """
+    probe = MODULES_PROBE.format(heavy=HEAVY_MODULES)
+    start = time.monotonic()
+    result = subprocess.run([sys.executable, '-c', probe, os.path.abspath(script)] + args,
+                            capture_output=True, text=True)
+    elapsed = time.monotonic() - start
+    modules = []
+    for line in result.stderr.splitlines():
+        if line.startswith('MODULES '):
+            modules = [m for m in line[len('MODULES '):].split(',') if m]
+    return elapsed, modules
+
+
+def first_frame(script, display, timeout=10.0):
+    """
+    Returns:
+        float: Sekunden vom Prozessstart bis zum ersten Frame (None, falls keiner ankam)
+    """
+    display.reset()
+    start = time.monotonic()
+    process = subprocess.Popen([sys.executable, os.path.abspath(script), '--port', display.port,
+                                '--no-reset', '--interval', '0.1'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not display.first_frame.wait(timeout):
+            return None
+        return display.frames[0][0] - start
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Kaltstart des Monitors')
+    parser.add_argument('--script', default=DEFAULT_SCRIPT, help='Zu messendes pc_monitor.py (default: dieser Stand)')
+    parser.add_argument('--runs', type=int, default=5, help='Messungen pro Variante, Median (default: 5)')
+    parser.add_argument('--lhm-hang', action='store_true',
+                        help='LHM-Port 8085 belegen, ohne zu antworten (Probe läuft ins Timeout)')
+    args = parser.parse_args()
+    
+    hang = None
+    if args.lhm_hang:
+        hang = socket.socket()
+        hang.bind(('127.0.0.1', 8085))
+        hang.listen(16)
+    
+    print(f"Kaltstart: {os.path.abspath(args.script)}\n")
+    seconds = median([import_time(args.script) for _ in range(args.runs)])
+    print(f"{'import pc_monitor':<24} {seconds * 1000:7.1f} ms")
+    
+    for command in (['--help'], ['--list']):
+        results = [run_command(args.script, command) for _ in range(args.runs)]
+        elapsed = median([r[0] for r in results])
+        modules = ', '.join(results[-1][1]) or '-'
+        print(f"{'pc_monitor.py ' + command[0]:<24} {elapsed * 1000:7.1f} ms   geladen: {modules}")
+    
+    display = FakeDisplay()
+    results = [first_frame(args.script, display) for _ in range(args.runs)]
+    display.close()
+    valid = [r for r in results if r is not None]
+    label = 'erster Frame' + (' (LHM hängt)' if hang else '')
+    if valid:
+        print(f"{label:<24} {median(valid) * 1000:7.1f} ms   (min {min(valid) * 1000:.1f} ms, "
+              f"max {max(valid) * 1000:.1f} ms)")
+    else:
+        print(f"{label:<24} kein Frame")
+    
+    if hang is not None:
+        hang.close()
+
+
+if __name__ == '__main__':
+    main()
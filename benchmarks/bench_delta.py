@@ -0,0 +1,121 @@
+"""
+Benchmark: Bytes pro Sekunde mit und ohne Delta-Modus
+Spielt eine Sensor-Aufzeichnung durch FrameEncoder (JSON/binär, voll/Delta)
+und vergleicht die übertragene Datenmenge.
+
+Nutzung:
+    python benchmarks/bench_delta.py                      # synthetische Traces
+    python benchmarks/bench_delta.py --trace aufnahme.jsonl.gz  # Aufnahme von pc_monitor.py --record
+
+Trace-Format: eine JSON-Zeile pro Tick mit den Feldern von get_system_data
+(optional 't' = Zeitstempel in Sekunden), siehe recording.py. Aufnahmen werden
+als Stream gelesen, auch lange Mitschnitte liegen nie komplett im Speicher.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from recording import read_trace
+from serial_protocol import FrameEncoder, parse_epsilon
+
+
+def make_trace(profile, ticks=600, seed=1):
+    """
+    Erzeugt einen synthetischen Trace (1 Tick pro Sekunde)
+    
+    Args:
+        profile: 'idle' (Desktop im Leerlauf) oder 'gaming' (Lastspitzen)
+    """
+    rnd = random.Random(seed)
+    trace = []
+    cpu_temp, gpu_temp = 42.0, 38.0
+    
+    for tick in range(ticks):
+        if profile == 'gaming':
+            load = 85 if (tick // 120) % 2 else 25
+            cpu_usage = max(0.0, min(100.0, load * 0.6 + rnd.gauss(0, 8)))
+            gpu_usage = max(0.0, min(100.0, load + rnd.gauss(0, 5)))
+        else:
+            cpu_usage = max(0.0, 3 + rnd.expovariate(0.5) + (15 if rnd.random() < 0.03 else 0))
+            gpu_usage = max(0.0, 1 + rnd.expovariate(1.0))
+        
+        # Temperaturen folgen der Last träge
+        cpu_temp += (35 + cpu_usage * 0.45 - cpu_temp) * 0.05 + rnd.gauss(0, 0.3)
+        gpu_temp += (32 + gpu_usage * 0.45 - gpu_temp) * 0.03 + rnd.gauss(0, 0.2)
+        
+        trace.append({
+            't': float(tick),
+            'cpu_temp': round(cpu_temp, 1),
+            'cpu_usage': round(cpu_usage, 1),
+            'cpu_fan': int(800 + max(0.0, cpu_temp - 45) * 40 + rnd.gauss(0, 10)),
+            'gpu_temp': round(gpu_temp, 1),
+            'gpu_usage': round(gpu_usage, 1),
+            'gpu_fan': int(max(0.0, gpu_temp - 50) * 60),
+            'ram_usage': round(40 + 5 * math.sin(tick / 200) + rnd.gauss(0, 0.1), 1),
+        })
+    return trace
+
+
+def measure(trace, binary, delta, epsilon, keyframe_interval):
+    """
+    Args:
+        trace: Iterable von Samples (Liste oder Stream aus read_trace)
+    
+    Returns:
+        tuple: (Bytes pro Sekunde, gesendete Frames, unterdrückte Frames, Ticks)
+    """
+    encoder = FrameEncoder(binary=binary, delta=delta, epsilon=epsilon,
+                           keyframe_interval=keyframe_interval)
+    
+    # Zeitstempel aus dem Trace für den Heartbeat verwenden
+    first = last = None
+    ticks = 0
+    for i, sample in enumerate(trace):
+        last = sample.get('t', float(i))
+        if first is None:
+            first = last
+        encoder.encode({k: v for k, v in sample.items() if k != 't'}, now=last)
+        ticks += 1
+    
+    duration = last - first + 1 if ticks else 1
+    return encoder.bytes_sent / duration, encoder.frames, encoder.suppressed, ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Delta-Modus')
+    parser.add_argument('--trace', action='append', help='Trace-Datei (JSON Lines), mehrfach möglich')
+    parser.add_argument('--epsilon', default=None, help="Delta-Schwellwert wie --delta-epsilon")
+    parser.add_argument('--keyframe-interval', type=int, default=30, help='Keyframe alle N Ticks (default: 30)')
+    args = parser.parse_args()
+    
+    # Pro Variante ein neuer Durchlauf (Aufnahmen werden jeweils neu gestreamt)
+    if args.trace:
+        traces = [(os.path.basename(path), lambda path=path: read_trace(path)) for path in args.trace]
+    else:
+        traces = [(f"synthetisch: {profile}", lambda trace=make_trace(profile): trace)
+                  for profile in ('idle', 'gaming')]
+    epsilon = parse_epsilon(args.epsilon)
+    
+    print("=" * 60)
+    print("Delta-Modus - Bytes pro Sekunde")
+    print("=" * 60)
+    
+    for name, trace in traces:
+        baseline, _, _, ticks = measure(trace(), False, False, epsilon, args.keyframe_interval)
+        print(f"\n{name} ({ticks} Ticks)")
+        print("-" * 60)
+        for label, binary, delta in (('JSON voll', False, False), ('JSON Delta', False, True),
+                                     ('Binär voll', True, False), ('Binär Delta', True, True)):
+            rate, frames, suppressed, _ = measure(trace(), binary, delta, epsilon, args.keyframe_interval)
+            saved = 100 * (1 - rate / baseline)
+            print(f"  {label:12s} {rate:7.1f} B/s  ({frames:4d} Frames, {suppressed:4d} unterdrückt, "
+                  f"-{saved:4.1f}%)")
+
+
+if __name__ == '__main__':
+    main()
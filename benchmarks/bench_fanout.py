@@ -0,0 +1,169 @@
+"""
+Benchmark: Fan-out auf mehrere Displays
+Ein Sender-Takt bietet jeden Frame vier Sinks an simulierten Displays (pty) an:
+    schnell    JSON, alle Felder, jeder Tick
+    auswahl    binär mit DELTA1, nur cpu_temp/gpu_temp, eigenes Intervall
+    gedrosselt JSON mit ACK-Flow-Control an einem Display, das pro Frame
+               0.25 s rechnet (der Writer wartet jeweils auf das ACK)
+    abgezogen  JSON, das Display verschwindet nach einem Drittel der Laufzeit
+Geprüft wird, dass offer() nie blockiert, der schnelle Sink trotz des
+hängenden und des abgezogenen Displays die volle Rate hält, der
+Auswahl-Sink sein Intervall einhält und nie fehlende Felder mit 0
+überschreibt, und dass der gedrosselte Sink überholte Frames verwirft statt
+sich aufzustauen.
+
+Nutzung:
+    python benchmarks/bench_fanout.py
+    python benchmarks/bench_fanout.py --rate 50 --duration 6 --subset-interval 0.25
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from display_sink import DisplaySink
+from fake_display import FakeDisplay
+
+SUBSET_FIELDS = ('cpu_temp', 'gpu_temp')
+STALL_TIME = 0.25  # Verarbeitungszeit pro Frame des gedrosselten Displays
+
+
+def make_frame(tick):
+    """Frame mit eindeutigen, nie 0 werdenden Werten pro Tick"""
+    return {'cpu_temp': 40.0 + tick % 50 / 2, 'cpu_usage': 10.0 + tick % 80, 'cpu_fan': 900 + tick % 500,
+            'gpu_temp': 35.0 + tick % 40 / 2, 'gpu_usage': 5.0 + tick % 90, 'gpu_fan': 1100 + tick % 300,
+            'ram_usage': 30.0 + tick % 20}
+
+
+def run(args):
+    """
+    Returns:
+        dict: Messwerte und Prüfergebnisse
+    """
+    displays = {
+        'schnell': FakeDisplay(capabilities="BIN1 DELTA1"),
+        'auswahl': FakeDisplay(capabilities="BIN1 DELTA1"),
+        'gedrosselt': FakeDisplay(capabilities="ACK1", process_time=STALL_TIME),
+        'abgezogen': FakeDisplay(capabilities=""),
+    }
+    sinks = {
+        'schnell': DisplaySink(displays['schnell'].port, no_reset=True),
+        'auswahl': DisplaySink(displays['auswahl'].port, no_reset=True, protocol='binary',
+                               fields=SUBSET_FIELDS, interval=args.subset_interval),
+        'gedrosselt': DisplaySink(displays['gedrosselt'].port, no_reset=True, ack=True, ack_timeout=1.0),
+        'abgezogen': DisplaySink(displays['abgezogen'].port, no_reset=True, backoff_max=1.0),
+    }
+    log = io.StringIO()  # Verbindungsmeldungen der Sinks
+    with contextlib.redirect_stdout(log):
+        for sink in sinks.values():
+            sink.connect()
+            sink.start()
+        
+        period = 1.0 / args.rate
+        ticks = int(args.duration * args.rate)
+        unplug_tick = ticks // 3
+        offer_max = 0.0
+        offered = []
+        start = time.monotonic()
+        for tick in range(ticks):
+            delay = start + tick * period - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if tick == unplug_tick:
+                displays['abgezogen'].close()
+            frame = make_frame(tick)
+            offered.append(frame)
+            for sink in sinks.values():
+                t = time.perf_counter()
+                sink.offer(frame)
+                offer_max = max(offer_max, time.perf_counter() - t)
+        elapsed = time.monotonic() - start
+        time.sleep(0.3)  # Letzte Frames zustellen
+        
+        status = {name: sink.status() for name, sink in sinks.items()}
+        for sink in sinks.values():
+            sink.close()
+    received = {name: list(display.frames) for name, display in displays.items()}
+    for display in displays.values():
+        display.close()
+    
+    # Schneller Sink: volle Rate trotz hängendem und abgezogenem Display
+    fast_ratio = len(received['schnell']) / ticks
+    
+    # Auswahl-Sink: Intervall, nur gewählte Felder, Werte stammen aus gesendeten Frames
+    subset = received['auswahl']
+    gaps = [b[0] - a[0] for a, b in zip(subset, subset[1:])]
+    expected = elapsed / args.subset_interval
+    zeroed = [data for _, data in subset if set(data) - set(SUBSET_FIELDS)
+              or any(data.get(name) == 0 for name in SUBSET_FIELDS)]
+    known = {tuple(frame[name] for name in SUBSET_FIELDS) for frame in offered}
+    foreign = [data for _, data in subset if set(data) == set(SUBSET_FIELDS)
+               and tuple(data[name] for name in SUBSET_FIELDS) not in known]
+    
+    checks = {
+        'offer_nonblocking': offer_max < 0.005,
+        'fast_full_rate': fast_ratio >= 0.95,
+        'subset_interval': abs(len(subset) - expected) <= 2
+                           and all(gap > args.subset_interval * 0.5 for gap in gaps),
+        'subset_no_zero_fill': bool(subset) and not zeroed and not foreign,
+        'stalled_drops': status['gedrosselt']['dropped'] >= ticks / 2
+                         and len(received['gedrosselt']) <= elapsed / STALL_TIME + 2,
+        'unplugged_detected': status['abgezogen']['errors'] > 0 or not sinks['abgezogen'].connected,
+    }
+    return {
+        'ticks': ticks,
+        'rate_hz': args.rate,
+        'elapsed_s': round(elapsed, 3),
+        'offer_max_ms': round(offer_max * 1000, 3),
+        'received': {name: len(frames) for name, frames in received.items()},
+        'dropped': {name: s['dropped'] for name, s in status.items()},
+        'errors': {name: s['errors'] for name, s in status.items()},
+        'subset_gap_ms': [round(min(gaps) * 1000), round(max(gaps) * 1000)] if gaps else None,
+        'checks': checks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Fan-out auf mehrere Displays')
+    parser.add_argument('--rate', type=float, default=20.0, help='Sender-Takt in Hz (default: 20)')
+    parser.add_argument('--duration', type=float, default=4.0, help='Laufzeit in Sekunden (default: 4)')
+    parser.add_argument('--subset-interval', type=float, default=0.5,
+                        help='Intervall des Auswahl-Sinks in Sekunden (default: 0.5)')
+    parser.add_argument('--output', default=None, help="Ergebnis als JSON in Datei schreiben ('-' = stdout)")
+    args = parser.parse_args()
+    
+    log = sys.stderr if args.output == '-' else sys.stdout
+    result = run(args)
+    print(f"{result['ticks']} Ticks @ {args.rate:.0f} Hz in {result['elapsed_s']:.2f} s, "
+          f"offer() max. {result['offer_max_ms']:.2f} ms", file=log)
+    print(f"{'Sink':<11} {'empfangen':>9} {'überholt':>8} {'Fehler':>6}", file=log)
+    for name, count in result['received'].items():
+        print(f"{name:<11} {count:9d} {result['dropped'][name]:8d} {result['errors'][name]:6d}", file=log)
+    if result['subset_gap_ms']:
+        print(f"Auswahl-Sink: Abstand {result['subset_gap_ms'][0]}-{result['subset_gap_ms'][1]} ms "
+              f"(Intervall {args.subset_interval * 1000:.0f} ms)", file=log)
+    print(file=log)
+    for name, ok in result['checks'].items():
+        print(f"{'✓' if ok else '✗'} {name}", file=log)
+    
+    if args.output:
+        report = {'meta': {'benchmark': 'fanout', 'rate_hz': args.rate, 'duration_s': args.duration,
+                           'subset_interval_s': args.subset_interval}, 'result': result}
+        if args.output == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"✓ Ergebnis gespeichert: {args.output}", file=log)
+    return 0 if all(result['checks'].values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
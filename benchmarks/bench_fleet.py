@@ -0,0 +1,183 @@
+"""
+Benchmark: Aggregator-Modus mit simulierten Agents auf localhost
+Startet 'pc_monitor.py --aggregate' als eigenen Prozess gegen ein FakeDisplay
+am pty und lässt N simulierte Agents (FleetAgent, jeder mit eigenem Socket)
+mit der angegebenen Rate senden - gleichmäßig über das Intervall verteilt wie
+unabhängig laufende Rechner. Gemessen werden CPU-Last und Speicher des
+Aggregator-Prozesses nach dem Aufwärmen sowie empfangene, verlorene und
+ungültige Pakete laut Telemetrie. Geprüft wird, dass der letzte Frame am
+Display alle Hosts zählt und den heißesten Host mit seiner Temperatur zeigt.
+
+Nutzung:
+    python benchmarks/bench_fleet.py                              # 20, 100, 500 Agents per UDP und TCP
+    python benchmarks/bench_fleet.py --agents 1000 --transports udp --duration 20
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fake_display import FakeDisplay
+from fleet import FleetAgent
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'pc_monitor.py')
+
+
+def free_port():
+    """Port, der gerade für UDP und TCP frei ist"""
+    with socket.socket() as tcp, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp:
+        tcp.bind(('127.0.0.1', 0))
+        port = tcp.getsockname()[1]
+        udp.bind(('127.0.0.1', port))
+        return port
+
+
+def host_frame(index, count):
+    """Feste Werte pro Host: Temperaturen sind eine Permutation, der heißeste Host ist eindeutig"""
+    return {
+        'cpu_temp': round(30.0 + 50.0 * ((index * 7919) % count) / count, 1),
+        'cpu_usage': float(index % 100),
+        'cpu_fan': 800 + index,
+        'gpu_temp': 30.0,
+        'gpu_usage': 10.0,
+        'gpu_fan': 1000,
+        'ram_usage': 40.0,
+    }
+
+
+def simulate_agents(agents, frames, rate, stop):
+    """Sendet bis stop mit rate Hz pro Agent, die Agents gleichmäßig über das Intervall verteilt"""
+    period = 1.0 / rate
+    step = period / len(agents)
+    start = time.monotonic()
+    while not stop.is_set():
+        for i, (agent, frame) in enumerate(zip(agents, frames)):
+            delay = start + i * step - time.monotonic()
+            if delay > 0 and stop.wait(delay):
+                return
+            agent.send(frame)  # Im Takt-Thread: ein Sende-Thread pro simuliertem Agent wäre zu teuer
+        start += period
+
+
+def last_metrics(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return {}
+    return json.loads(lines[-1]) if lines else {}
+
+
+def run_case(count, transport, args):
+    """
+    Returns:
+        dict: Ergebnis einer Kombination aus Anzahl Agents und Transport
+    """
+    port = free_port()
+    metrics = os.path.join(tempfile.mkdtemp(), 'fleet.jsonl')
+    display = FakeDisplay()
+    process = subprocess.Popen([sys.executable, SCRIPT, '--aggregate', f"127.0.0.1:{port}", '--port', display.port,
+                                '--no-reset', '--interval', '1', '--fleet-ttl', '3', '--metrics-log', metrics,
+                                '--metrics-interval', '1'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    aggregator = psutil.Process(process.pid)
+    time.sleep(args.startup)
+    
+    agents = [FleetAgent(f"{transport}://127.0.0.1:{port}", name=f"node{i:04d}") for i in range(count)]
+    frames = [host_frame(i, count) for i in range(count)]
+    stop = threading.Event()
+    sender = threading.Thread(target=simulate_agents, args=(agents, frames, args.rate, stop), daemon=True)
+    sender.start()
+    try:
+        time.sleep(args.warmup)
+        cpu_before = aggregator.cpu_times()
+        sent_before = sum(agent.sent for agent in agents)
+        start = time.monotonic()
+        time.sleep(args.duration)
+        elapsed = time.monotonic() - start
+        cpu_after = aggregator.cpu_times()
+        sent = sum(agent.sent for agent in agents) - sent_before
+        rss = aggregator.memory_info().rss
+        time.sleep(1.2)  # Eine Telemetrie-Zeile nach dem Messfenster
+    finally:
+        stop.set()
+        sender.join()
+        process.terminate()
+        process.wait()
+        for agent in agents:
+            agent.close()
+        display.close()
+    
+    hottest = max(range(count), key=lambda i: frames[i]['cpu_temp'])
+    frame = display.frames[-1][1] if display.frames else {}
+    ok = (frame.get('fleet_hosts') == count and frame.get('fleet_hottest') == f"node{hottest:04d}"
+          and frame.get('cpu_temp') == frames[hottest]['cpu_temp'])
+    fleet = last_metrics(metrics).get('fleet', {})
+    cpu = (cpu_after.user + cpu_after.system) - (cpu_before.user + cpu_before.system)
+    return {
+        'agents': count,
+        'transport': transport,
+        'packets_per_s': round(sent / elapsed, 1),
+        'cpu_percent': round(100 * cpu / elapsed, 2),
+        'rss_mb': round(rss / 2**20, 1),
+        'received': fleet.get('packets', 0),
+        'lost': fleet.get('lost', 0),
+        'invalid': fleet.get('invalid', 0),
+        'agent_errors': sum(agent.errors for agent in agents),
+        'frames': len(display.frames),
+        'ok': ok,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Aggregator-Modus mit simulierten Agents')
+    parser.add_argument('--agents', default='20,100,500',
+                        help='Anzahl simulierter Agents, kommagetrennt (default: 20,100,500)')
+    parser.add_argument('--transports', default='udp,tcp', help='Transporte, kommagetrennt (default: udp,tcp)')
+    parser.add_argument('--rate', type=float, default=1.0, help='Frames pro Sekunde und Agent (default: 1)')
+    parser.add_argument('--duration', type=float, default=10.0, help='Messdauer pro Kombination (default: 10 s)')
+    parser.add_argument('--warmup', type=float, default=3.0, help='Aufwärmzeit vor der Messung (default: 3 s)')
+    parser.add_argument('--startup', type=float, default=1.5,
+                        help='Wartezeit auf den Start des Aggregators (default: 1.5 s)')
+    parser.add_argument('--output', default=None, help="Ergebnis als JSON in Datei schreiben ('-' = stdout)")
+    args = parser.parse_args()
+    
+    counts = [int(n) for n in args.agents.split(',') if n.strip()]
+    transports = [t.strip() for t in args.transports.split(',') if t.strip()]
+    
+    results = []
+    log = sys.stderr if args.output == '-' else sys.stdout
+    print(f"{'Agents':>6} {'Transport':<9} {'Pakete/s':>9} {'CPU %':>6} {'RSS MB':>7} {'empfangen':>9} "
+          f"{'verloren':>8} {'Frames':>6}  Frame", file=log)
+    for transport in transports:
+        for count in counts:
+            result = run_case(count, transport, args)
+            results.append(result)
+            print(f"{count:6d} {transport:<9} {result['packets_per_s']:9.1f} {result['cpu_percent']:6.2f} "
+                  f"{result['rss_mb']:7.1f} {result['received']:9d} {result['lost']:8d} {result['frames']:6d}  "
+                  f"{'✓' if result['ok'] else '✗'}", file=log)
+    
+    if args.output:
+        report = {'meta': {'benchmark': 'fleet', 'rate_hz': args.rate, 'duration_s': args.duration},
+                  'results': results}
+        if args.output == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"\n✓ Ergebnis gespeichert: {args.output}", file=log)
+
+
+if __name__ == '__main__':
+    main()
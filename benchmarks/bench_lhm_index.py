@@ -0,0 +1,242 @@
+"""
+Benchmark: Sensor-Suche im LibreHardwareMonitor-Baum
+Vergleicht drei Wege zum Frame: die alte rekursive Suche (pro Sensor ein
+kompletter Baumdurchlauf), die Fallback-Ketten über den abgeflachten,
+gecachten Index (find_sensor) und den aus einer SensorMap kompilierten Plan.
+Rekursiv, Index und Plan laufen mit denselben Ketten (Plan: als Glob-Muster
+nachgebildet) und müssen denselben Frame liefern; zusätzlich zeigt er, welche
+Sensoren die eingebaute Zuordnung wählt.
+
+Nutzung:
+    python benchmarks/bench_lhm_index.py
+    python benchmarks/bench_lhm_index.py --fixture data.json   # echter Mitschnitt
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from librehardwaremonitor_client import LibreHardwareMonitorClient
+from sensor_map import SensorMap
+
+# Frühere, fest verdrahtete Fallback-Ketten: Feld -> [(Hardware-, Gruppe, Sensor-Teilstring), ...]
+LEGACY_CHAINS = {
+    'cpu_temp': [('Intel', 'Temperatures', 'Core Average'), ('Intel', 'Temperatures', 'CPU Package'),
+                 ('Intel', 'Temperatures', 'Core Max'), ('AMD', 'Temperatures', 'Core (Tctl/Tdie)')],
+    'cpu_usage': [('Intel', 'Load', 'CPU Total'), ('AMD', 'Load', 'CPU Total')],
+    'cpu_fan': [('HP', 'Fans', 'Fan'), ('Mainboard', 'Fans', 'Fan #1'), ('Mainboard', 'Fans', 'CPU Fan')],
+    'gpu_temp': [('NVIDIA', 'Temperatures', 'GPU Core'), ('AMD', 'Temperatures', 'GPU Core')],
+    'gpu_usage': [('NVIDIA', 'Load', 'GPU Core'), ('AMD', 'Load', 'GPU Core')],
+    'gpu_fan': [('NVIDIA', 'Fans', 'GPU Fan'), ('AMD', 'Fans', 'GPU Fan')],
+    'ram_usage': [('Memory', 'Load', 'Memory')],
+}
+
+# Dieselben Ketten als Selektoren (Teilstring = *...*)
+LEGACY_SENSOR_MAP = {field: [f"*{hardware}*/{group}/*{sensor}*" for hardware, group, sensor in chain]
+                     for field, chain in LEGACY_CHAINS.items()}
+
+
+def _node(text, value='', children=None):
+    node = {'Text': text, 'Min': value, 'Value': value, 'Max': value, 'ImageURL': ''}
+    node['Children'] = children or []
+    return node
+
+
+def make_server_tree(gpus=8, cpus=2, cores=64, fans=12, disks=16, seed=1):
+    """
+    Erzeugt einen data.json-Baum wie von einem Multi-GPU-Server
+    (mehrere hundert Sensoren)
+    """
+    rnd = random.Random(seed)
+    hardware = []
+    
+    board_fans = [_node(f"Fan #{i + 1}", f"{rnd.randint(600, 3000)} RPM") for i in range(fans)]
+    board_temps = [_node(f"Temperature #{i + 1}", f"{rnd.uniform(25, 60):.1f} °C") for i in range(8)]
+    hardware.append(_node('Supermicro H12DSG', children=[
+        _node('Nuvoton NCT6796D', children=[
+            _node('Temperatures', children=board_temps),
+            _node('Fans', children=board_fans),
+        ]),
+    ]))
+    
+    for c in range(cpus):
+        temps = [_node(f"CPU Core #{i + 1}", f"{rnd.uniform(40, 90):.1f} °C") for i in range(cores)]
+        temps.append(_node('Core (Tctl/Tdie)', f"{rnd.uniform(40, 90):.1f} °C"))
+        loads = [_node(f"CPU Core #{i + 1}", f"{rnd.uniform(0, 100):.1f} %") for i in range(cores)]
+        loads.append(_node('CPU Total', f"{rnd.uniform(0, 100):.1f} %"))
+        clocks = [_node(f"Core #{i + 1}", f"{rnd.uniform(2000, 4500):.0f} MHz") for i in range(cores)]
+        hardware.append(_node(f"AMD EPYC 7763 #{c}", children=[
+            _node('Clocks', children=clocks),
+            _node('Temperatures', children=temps),
+            _node('Load', children=loads),
+        ]))
+    
+    hardware.append(_node('Generic Memory', children=[
+        _node('Load', children=[_node('Memory', f"{rnd.uniform(10, 90):.1f} %")]),
+    ]))
+    
+    for g in range(gpus):
+        hardware.append(_node(f"NVIDIA RTX A6000 #{g}", children=[
+            _node('Temperatures', children=[
+                _node('GPU Core', f"{rnd.uniform(30, 85):.1f} °C"),
+                _node('GPU Hot Spot', f"{rnd.uniform(30, 95):.1f} °C"),
+                _node('GPU Memory Junction', f"{rnd.uniform(30, 95):.1f} °C"),
+            ]),
+            _node('Load', children=[
+                _node('GPU Core', f"{rnd.uniform(0, 100):.1f} %"),
+                _node('GPU Memory Controller', f"{rnd.uniform(0, 100):.1f} %"),
+                _node('GPU Video Engine', f"{rnd.uniform(0, 100):.1f} %"),
+                _node('GPU Memory', f"{rnd.uniform(0, 100):.1f} %"),
+            ]),
+            _node('Fans', children=[_node('GPU Fan', f"{rnd.randint(800, 3500)} RPM")]),
+            _node('Powers', children=[_node('GPU Package', f"{rnd.uniform(50, 300):.1f} W")]),
+        ]))
+    
+    for d in range(disks):
+        hardware.append(_node(f"Samsung SSD 990 PRO #{d}", children=[
+            _node('Temperatures', children=[_node('Temperature', f"{rnd.uniform(30, 60):.1f} °C")]),
+            _node('Load', children=[_node('Used Space', f"{rnd.uniform(0, 100):.1f} %")]),
+        ]))
+    
+    return _node('Sensor', children=[_node('SERVER01', children=hardware)])
+
+
+def legacy_find_sensor(data, hardware_type, sensor_type, name_contains):
+    """Alte Implementierung: rekursive Suche ab der Wurzel (Referenz)"""
+    if not data or 'Children' not in data:
+        return None
+    
+    def search_children(items):
+        for item in items:
+            if 'Text' in item and hardware_type.lower() in item.get('Text', '').lower():
+                if 'Children' in item:
+                    for sensor_group in item['Children']:
+                        if sensor_group.get('Text', '').lower() == sensor_type.lower():
+                            if 'Children' in sensor_group:
+                                for sensor in sensor_group['Children']:
+                                    if name_contains.lower() in sensor.get('Text', '').lower():
+                                        value_str = sensor.get('Value', '0')
+                                        value_str = value_str.replace('°C', '').replace('%', '').replace('RPM', '').strip()
+                                        try:
+                                            return float(value_str)
+                                        except:
+                                            return None
+            if 'Children' in item:
+                result = search_children(item['Children'])
+                if result is not None:
+                    return result
+        return None
+    
+    return search_children(data['Children'])
+
+
+def chain_system_data(find, data):
+    """Frame über die Fallback-Ketten (wie früher get_system_data)"""
+    frame = {}
+    for field, chain in LEGACY_CHAINS.items():
+        value = 0
+        for query in chain:
+            value = find(data, *query)
+            if value:
+                break
+        frame[field] = int(value or 0) if field.endswith('_fan') else round(value or 0.0, 1)
+    return frame
+
+
+def count_sensors(data):
+    return sum(1 + count_sensors(child) for child in data.get('Children', []))
+
+
+def run_benchmark(tree, ticks):
+    """
+    Misst einen Frame pro Tick mit rekursiver Suche, Index und kompiliertem Plan
+    Jeder Tick bekommt eine frische Kopie des Baums (wie nach response.json()).
+    
+    Returns:
+        dict: Zeiten pro Tick in Millisekunden, letzter Frame pro Variante
+              (<name>_snapshot) und die Sensoren der eingebauten Zuordnung
+    """
+    frames = [json.loads(json.dumps(tree)) for _ in range(ticks)]
+    
+    indexed = LibreHardwareMonitorClient()
+    compiled = LibreHardwareMonitorClient(sensor_map=SensorMap(LEGACY_SENSOR_MAP))
+    default = LibreHardwareMonitorClient()
+    multi_gpu = LibreHardwareMonitorClient()
+    variants = (
+        ('legacy', lambda data: chain_system_data(legacy_find_sensor, data)),
+        ('indexed', lambda data: chain_system_data(indexed.find_sensor, data)),
+        ('compiled', None),
+        ('default', None),
+        ('gpus', None),  # Plan + alle GPUs wie --gpu-mode reduce/array
+    )
+    
+    results = {}
+    for name, read in variants:
+        feed = iter(frames)
+        if read is None:
+            client = {'compiled': compiled, 'default': default, 'gpus': multi_gpu}[name]
+            client.get_sensor_data = lambda: next(feed)
+            if name == 'gpus':
+                read = lambda data: (client.get_system_data(), client.get_gpus())
+            else:
+                read = lambda data: client.get_system_data()
+        start = time.perf_counter()
+        for _ in range(ticks):
+            snapshot = read(next(feed) if name in ('legacy', 'indexed') else None)
+        results[name] = (time.perf_counter() - start) * 1000 / ticks
+        results[name + '_snapshot'] = snapshot
+    
+    results['default_sensors'] = default.resolved_sensors()
+    for client in (indexed, compiled, default, multi_gpu):
+        client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark LHM Sensor-Index')
+    parser.add_argument('--fixture', help='Mitgeschnittene data.json (default: synthetischer Server)')
+    parser.add_argument('--ticks', type=int, default=200, help='Anzahl Ticks (default: 200)')
+    parser.add_argument('--gpus', type=int, default=8, help='GPUs im synthetischen Baum (default: 8)')
+    args = parser.parse_args()
+    
+    if args.fixture:
+        with open(args.fixture, encoding='utf-8') as f:
+            tree = json.load(f)
+    else:
+        tree = make_server_tree(gpus=args.gpus)
+    
+    print("=" * 60)
+    print("LibreHardwareMonitor - Sensor-Index Benchmark")
+    print("=" * 60)
+    print(f"  Knoten im Baum: {count_sensors(tree)}")
+    print(f"  Ticks:          {args.ticks}")
+    print()
+    
+    results = run_benchmark(tree, args.ticks)
+    snapshots = {name: results[name + '_snapshot'] for name in ('legacy', 'indexed', 'compiled')}
+    if len({json.dumps(snapshot, sort_keys=True) for snapshot in snapshots.values()}) > 1:
+        print("✗ Ergebnisse unterscheiden sich!")
+        for name, snapshot in snapshots.items():
+            print(f"  {name + ':':<9} {snapshot}")
+        sys.exit(1)
+    
+    print(f"  Rekursive Suche: {results['legacy']:8.3f} ms/Tick")
+    print(f"  Index:           {results['indexed']:8.3f} ms/Tick")
+    print(f"  Plan:            {results['compiled']:8.3f} ms/Tick")
+    print(f"  Plan (Standard): {results['default']:8.3f} ms/Tick")
+    print(f"  Plan + {len(results['gpus_snapshot'][1])} GPUs:   {results['gpus']:8.3f} ms/Tick (--gpu-mode reduce/array)")
+    print(f"  Speedup Plan:    {results['legacy'] / results['compiled']:8.1f}x gegenüber rekursiv, "
+          f"{results['indexed'] / results['compiled']:.1f}x gegenüber Index")
+    print()
+    print("Eingebaute Zuordnung:")
+    for field, paths in results['default_sensors'].items():
+        print(f"  {field:<10} ← {paths[0] if paths else '(kein Sensor, 0)'} = {results['default_snapshot'][field]}")
+
+
+if __name__ == '__main__':
+    main()
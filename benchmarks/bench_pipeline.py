@@ -0,0 +1,269 @@
+"""
+Benchmark: Host-Pipeline (Sammeln -> Kodieren -> Senden) gegen ein simuliertes Display
+Startet SystemMonitor.run mit vorgefertigten Datenquellen (psutil- bzw.
+LHM-Pfad, Werte aus einem synthetischen Trace) gegen ein FakeDisplay am pty,
+das die Baudrate drosselt und IDENTIFY beantwortet. Pro Kombination aus
+Frame-Format und Intervall werden Frames/s, Bytes/s, CPU-Last und Speicher des
+Monitors (ohne den Thread des simulierten Displays) sowie die Latenz vom
+Sender bis zum dekodierten Frame gemessen.
+
+Nutzung:
+    python benchmarks/bench_pipeline.py                           # Standard-Matrix
+    python benchmarks/bench_pipeline.py --output results.json     # zusätzlich als JSON
+    python benchmarks/bench_pipeline.py --formats json,binary-delta --intervals 0.05 --baud 9600
+
+Ausgabe mit --output (bzw. '-' für stdout):
+    {"meta": {...}, "results": [{"format": ..., "interval": ..., "fps": ..., "latency_ms": {...}}, ...]}
+
+Als Sequenznummer für die Latenzmessung überschreibt der Benchmark cpu_fan
+(Delta-Schwellwert 0, wird also auch im Delta-Modus in jedem Frame gesendet).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from contextlib import redirect_stdout
+
+import psutil
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pc_monitor
+from bench_delta import make_trace
+from fake_display import FakeDisplay
+from pc_monitor import SystemMonitor
+from serial_protocol import DEFAULT_EPSILON
+
+# Frame-Format -> (protocol, delta)
+FORMATS = {
+    'json': ('json', False),
+    'json-delta': ('json', True),
+    'binary': ('binary', False),
+    'binary-delta': ('binary', True),
+}
+
+
+class CannedLhmClient:
+    """Ersetzt LibreHardwareMonitorClient: liefert Trace-Frames statt HTTP-Abfragen"""
+    
+    def __init__(self, trace):
+        self.trace = trace
+        self.calls = 0
+    
+    def get_system_data(self):
+        sample = self.trace[self.calls % len(self.trace)]
+        self.calls += 1
+        return {k: v for k, v in sample.items() if k != 't'}
+    
+    def get_gpus(self, data=None):
+        return []
+    
+    def close(self):
+        pass
+
+
+class CannedMonitor(SystemMonitor):
+    """SystemMonitor mit Trace-Werten statt psutil/GPU-Abfragen und Sendezeit pro Frame"""
+    
+    def __init__(self, trace, source='psutil', **kwargs):
+        self.trace = trace
+        self.sent_at = {}
+        self._seq = 0
+        self._ticks = {'temps': 0, 'cpu': 0, 'fans': 0, 'gpu': 0, 'ram': 0}
+        super().__init__(**kwargs)
+        if source == 'lhm':
+            self.lhm_client = CannedLhmClient(trace)
+    
+    def _sample(self, source):
+        sample = self.trace[self._ticks[source] % len(self.trace)]
+        self._ticks[source] += 1
+        return sample
+    
+    def collect_temps(self):
+        return {'cpu_temp': self._sample('temps')['cpu_temp']}
+    
+    def collect_cpu(self):
+        return {'cpu_usage': self._sample('cpu')['cpu_usage']}
+    
+    def collect_fans(self):
+        return {'cpu_fan': self._sample('fans')['cpu_fan']}
+    
+    def collect_gpu(self):
+        sample = self._sample('gpu')
+        return {'gpu_temp': sample['gpu_temp'], 'gpu_usage': sample['gpu_usage'], 'gpu_fan': sample['gpu_fan']}
+    
+    def collect_ram(self):
+        return {'ram_usage': self._sample('ram')['ram_usage']}
+    
+    def assemble_frame(self, store):
+        data = super().assemble_frame(store)
+        if data is None:
+            return None
+        self._seq = self._seq % 60000 + 1  # passt auch binär in uint16
+        data['cpu_fan'] = self._seq
+        return data
+    
+    def send_data(self, data):
+        self.sent_at[data['cpu_fan']] = time.monotonic()
+        super().send_data(data)
+
+
+def percentiles(values):
+    """
+    Returns:
+        dict: p50/p95/p99/max in Millisekunden (Nearest-Rank)
+    """
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    values = sorted(values)
+    result = {f'p{p}': round(values[max(0, -(-len(values) * p // 100) - 1)] * 1000, 2) for p in (50, 95, 99)}
+    result['max'] = round(values[-1] * 1000, 2)
+    return result
+
+
+def thread_cpu(process, native_id):
+    """CPU-Zeit (user + system) eines Threads in Sekunden"""
+    for thread in process.threads():
+        if thread.id == native_id:
+            return thread.user_time + thread.system_time
+    return 0.0
+
+
+def run_case(fmt, interval, trace, args):
+    """
+    Misst eine Kombination aus Frame-Format und Intervall
+    
+    Returns:
+        dict: Ergebnis (maschinenlesbar)
+    """
+    protocol, delta = FORMATS[fmt]
+    display = FakeDisplay(baudrate=args.baud)
+    pc_monitor.LHM_AVAILABLE = False  # Kein echter LHM-Probe im Konstruktor
+    devnull = open(os.devnull, 'w', encoding='utf-8')
+    
+    with redirect_stdout(devnull):
+        monitor = CannedMonitor(trace, args.source, port=display.port, baudrate=args.baud,
+                                protocol=protocol, delta=delta, gpu_backend='none',
+                                delta_epsilon=dict(DEFAULT_EPSILON, cpu_fan=0))
+    
+    process = psutil.Process()
+    display_tid = display._thread.native_id
+    rss_before = process.memory_info().rss
+    cpu_before = sum(process.cpu_times()[:2]) - thread_cpu(process, display_tid)
+    start = time.monotonic()
+    
+    threading.Timer(args.duration, lambda: monitor.pipeline.stop()).start()
+    with redirect_stdout(devnull):
+        monitor.run(interval=interval)
+    
+    elapsed = time.monotonic() - start
+    cpu = sum(process.cpu_times()[:2]) - thread_cpu(process, display_tid) - cpu_before
+    rss = process.memory_info().rss
+    devnull.close()
+    
+    latencies = []
+    for received, frame in list(display.frames):
+        sent = monitor.sent_at.get(frame.get('cpu_fan'))
+        if sent is not None and received >= sent:
+            latencies.append(received - sent)
+    
+    sink = monitor.sinks[0]
+    status = sink.status()
+    stats = monitor.pipeline.timing_stats()
+    display.close()
+    return {
+        'format': fmt,
+        'interval': interval,
+        'baud': args.baud,
+        'source': args.source,
+        'duration_s': round(elapsed, 2),
+        'frames_sent': stats.get('send', {}).get('count', 0),
+        'frames_received': len(display.frames),
+        'fps': round(len(display.frames) / elapsed, 2),
+        'bytes_per_s': round(status['bytes'] / elapsed, 1),
+        'bytes_per_frame': round(status['bytes'] / status['frames'], 1) if status['frames'] else None,
+        'dropped': status['dropped'],
+        'suppressed': sink.encoder.suppressed,
+        'skipped_ticks': stats['skipped_ticks'],
+        'cpu_percent': round(100 * cpu / elapsed, 2),
+        'rss_mb': round(rss / 2**20, 1),
+        'rss_growth_mb': round((rss - rss_before) / 2**20, 2),
+        'latency_ms': percentiles(latencies),
+        'encode_ms': status['encode'],
+        'write_ms': status['write'],
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Host-Pipeline mit simuliertem Display')
+    parser.add_argument('--formats', default=','.join(FORMATS),
+                        help=f"Frame-Formate, kommagetrennt (default: {','.join(FORMATS)})")
+    parser.add_argument('--intervals', default='1.0,0.1,0.02',
+                        help='Sende-Intervalle in Sekunden, kommagetrennt (default: 1.0,0.1,0.02)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Messdauer pro Kombination (default: 5 s)')
+    parser.add_argument('--baud', type=int, default=115200, help='Simulierte Baudrate (default: 115200)')
+    parser.add_argument('--source', choices=['psutil', 'lhm'], default='psutil',
+                        help='Datenpfad: psutil-Collectoren oder LibreHardwareMonitor (default: psutil)')
+    parser.add_argument('--output', default=None, help="Ergebnis als JSON in Datei schreiben ('-' = stdout)")
+    args = parser.parse_args()
+    
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        parser.error(f"Unbekanntes Format: {', '.join(unknown)}")
+    intervals = [float(i) for i in args.intervals.split(',') if i.strip()]
+    trace = make_trace('gaming', ticks=600)
+    
+    results = []
+    log = sys.stderr if args.output == '-' else sys.stdout
+    print(f"{'Format':<13} {'Intervall':>9} {'Frames/s':>9} {'B/s':>8} {'CPU %':>6} {'RSS MB':>7} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'überholt':>8}", file=log)
+    for fmt in formats:
+        for interval in intervals:
+            result = run_case(fmt, interval, trace, args)
+            results.append(result)
+            latency = result['latency_ms']
+            print(f"{fmt:<13} {interval:8.2f}s {result['fps']:9.1f} {result['bytes_per_s']:8.0f} "
+                  f"{result['cpu_percent']:6.2f} {result['rss_mb']:7.1f} "
+                  f"{latency['p50'] or 0:7.2f} {latency['p95'] or 0:7.2f} {latency['p99'] or 0:7.2f} "
+                  f"{result['dropped']:8d}", file=log)
+    
+    if args.output:
+        report = {
+            'meta': {
+                'benchmark': 'pipeline',
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'duration_s': args.duration,
+                'baud': args.baud,
+                'source': args.source,
+            },
+            'results': results,
+        }
+        if args.output == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"\n✓ Ergebnis gespeichert: {args.output}", file=log)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: Port-Erkennung mit parallelen Proben
+Prüft SystemMonitor.verify_usb_display gegen Pseudo-Terminals: ein
+simuliertes Display, das nach boot_time auf IDENTIFY antwortet, und mehrere
+stumme Ports (z.B. Bluetooth-COM-Ports), die in der Kandidatenliste davor
+stehen. Erwartet wird, dass der antwortende Port gewinnt und die stummen
+Proben gleich danach abgebrochen werden - lange vor ihrem Timeout. Eine
+sequentielle Prüfung bräuchte mindestens Anzahl stummer Ports × Timeout.
+
+Nutzung:
+    python benchmarks/bench_probe.py
+    python benchmarks/bench_probe.py --silent 8 --boot-time 0.8 --rounds 10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fake_display import FakeDisplay
+from pc_monitor import SystemMonitor
+
+# Spielraum zwischen Antwort und Abbruch der übrigen Proben (Poll-Intervall von wait_ready + Threads)
+CANCEL_SLACK = 0.5
+
+
+def run_round(silent_count, boot_time, timeout):
+    """
+    Returns:
+        dict: Ergebnis eines Durchlaufs (Sekunden)
+    """
+    silent = [FakeDisplay(boot_time=3600.0) for _ in range(silent_count)]
+    display = FakeDisplay(boot_time=boot_time)
+    for fake in silent + [display]:
+        fake.reset()
+    candidates = [(fake.port, f"stumm #{i}", 1) for i, fake in enumerate(silent)]
+    candidates.append((display.port, "USB Display", 1))
+    
+    results = []
+    try:
+        start = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):
+            port = SystemMonitor.verify_usb_display(candidates, timeout=timeout, results=results, no_reset=True)
+        elapsed = time.monotonic() - start
+    finally:
+        for fake in silent + [display]:
+            fake.close()
+    
+    winner = next((r for r in results if r.verified), None)
+    others = [r for r in results if r is not winner]
+    cancel = max((r.latency for r in others), default=0.0)
+    ok = (port == display.port and winner is not None and len(results) == len(candidates)
+          and all(r.cancelled for r in others)
+          and cancel < winner.latency + CANCEL_SLACK and elapsed < timeout / 2)
+    return {
+        'port_ok': port == display.port,
+        'answer_s': round(winner.latency, 3) if winner else None,
+        'cancel_s': round(cancel, 3),
+        'total_s': round(elapsed, 3),
+        'cancelled': sum(1 for r in others if r.cancelled),
+        'ok': ok,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parallele Port-Erkennung')
+    parser.add_argument('--silent', type=int, default=4, help='Anzahl stummer Ports (default: 4)')
+    parser.add_argument('--boot-time', type=float, default=0.3,
+                        help='Boot-Zeit des simulierten Displays in Sekunden (default: 0.3)')
+    parser.add_argument('--timeout', type=float, default=3.0, help='Timeout pro Probe in Sekunden (default: 3)')
+    parser.add_argument('--rounds', type=int, default=5, help='Durchläufe (default: 5)')
+    parser.add_argument('--output', default=None, help="Ergebnis als JSON in Datei schreiben ('-' = stdout)")
+    args = parser.parse_args()
+    
+    log = sys.stderr if args.output == '-' else sys.stdout
+    print(f"{args.silent} stumme Ports + 1 Display (Boot {args.boot_time} s), Timeout {args.timeout} s", file=log)
+    print(f"{'Lauf':>4} {'Antwort':>8} {'Abbruch':>8} {'Gesamt':>7} {'abgebr.':>7}  Ergebnis", file=log)
+    results = []
+    for i in range(args.rounds):
+        result = run_round(args.silent, args.boot_time, args.timeout)
+        results.append(result)
+        print(f"{i + 1:4d} {result['answer_s'] or 0:7.3f}s {result['cancel_s']:7.3f}s {result['total_s']:6.3f}s "
+              f"{result['cancelled']:4d}/{args.silent}  {'✓' if result['ok'] else '✗'}", file=log)
+    
+    total = statistics.median(r['total_s'] for r in results)
+    print(f"\nMedian {total:.3f} s (sequentiell mindestens {args.silent * args.timeout:.1f} s)", file=log)
+    failed = sum(1 for r in results if not r['ok'])
+    print(f"{'✓' if not failed else '✗'} {args.rounds - failed}/{args.rounds} Durchläufe: Display gewinnt, "
+          f"stumme Proben vor Ablauf des Timeouts abgebrochen", file=log)
+    
+    if args.output:
+        report = {'meta': {'benchmark': 'probe', 'silent': args.silent, 'boot_time_s': args.boot_time,
+                           'timeout_s': args.timeout}, 'results': results}
+        if args.output == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"✓ Ergebnis gespeichert: {args.output}", file=log)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Benchmark: Zeit bis zum ersten Frame (Time-to-First-Frame)
+Vergleicht die frühere feste Wartezeit nach dem Öffnen (2 s + IDENTIFY) mit
+dem Readiness-Handshake (IDENTIFY alle 100 ms bis zur Antwort), jeweils mit
+und ohne ESP32-Reset beim Öffnen.
+
+Nutzung:
+    python benchmarks/bench_startup.py                    # simuliertes Display (pty)
+    python benchmarks/bench_startup.py --boot-time 1.2    # langsamer bootendes Board
+    python benchmarks/bench_startup.py --port COM3        # echtes Display
+
+Mit echtem Display endet die Messung, wenn der erste Frame geschrieben ist.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from display_sink import DisplaySink, open_serial, wait_ready
+
+FRAME = {'cpu_temp': 55.3, 'cpu_usage': 42.5, 'cpu_fan': 1800,
+         'gpu_temp': 68.0, 'gpu_usage': 85.2, 'gpu_fan': 2400, 'ram_usage': 67.8}
+
+
+def legacy_connect(port, baudrate):
+    """Früheres Verhalten: feste 2 s Boot-Wartezeit, dann ein IDENTIFY"""
+    ser = open_serial(port, baudrate, timeout=1)
+    time.sleep(2)
+    wait_ready(ser, timeout=1.0, retry_interval=1.0)
+    ser.write((json.dumps(FRAME) + '\n').encode('utf-8'))
+    ser.flush()
+    return ser
+
+
+def handshake_connect(port, baudrate, no_reset):
+    """Readiness-Handshake über DisplaySink"""
+    sink = DisplaySink(port, baudrate, no_reset=no_reset)
+    sink.connect()
+    sink.write(FRAME)
+    return sink.ser
+
+
+def measure(strategy, port, baudrate, display=None, resets=True):
+    """
+    Returns:
+        float: Sekunden vom Öffnen bis zum ersten Frame (None, falls keiner ankam)
+    """
+    if display is not None and resets:
+        display.reset()
+    elif display is not None:
+        display.frames = []
+        display.first_frame.clear()
+    
+    start = time.monotonic()
+    ser = strategy()
+    if display is None:
+        elapsed = time.monotonic() - start
+    elif display.first_frame.wait(5.0):
+        elapsed = display.frames[0][0] - start
+    else:
+        elapsed = None
+    ser.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Time-to-First-Frame')
+    parser.add_argument('--port', default=None, help='Echtes Display statt Simulation')
+    parser.add_argument('--baud', type=int, default=115200, help='Baudrate (default: 115200)')
+    parser.add_argument('--boot-time', type=float, default=0.8,
+                        help='Simulierte Boot-Zeit nach Reset in Sekunden (default: 0.8)')
+    parser.add_argument('--runs', type=int, default=3, help='Messungen pro Variante (default: 3)')
+    args = parser.parse_args()
+    
+    display = None
+    port = args.port
+    if port is None:
+        from fake_display import FakeDisplay
+        display = FakeDisplay(boot_time=args.boot_time)
+        port = display.port
+        print(f"Simuliertes Display an {port} (Boot-Zeit {args.boot_time:.1f} s)")
+    
+    variants = [
+        ('Feste Wartezeit (2 s)', lambda: legacy_connect(port, args.baud), True),
+        ('Handshake', lambda: handshake_connect(port, args.baud, False), True),
+        ('Handshake ohne Reset', lambda: handshake_connect(port, args.baud, True), False),
+    ]
+    
+    print(f"\n{'Variante':<24} {'Mittel':>9} {'Min':>9} {'Max':>9}")
+    for name, strategy, resets in variants:
+        results = [measure(strategy, port, args.baud, display, resets) for _ in range(args.runs)]
+        valid = [r for r in results if r is not None]
+        if not valid:
+            print(f"{name:<24} {'kein Frame':>9}")
+            continue
+        mean = sum(valid) / len(valid)
+        print(f"{name:<24} {mean * 1000:7.0f}ms {min(valid) * 1000:7.0f}ms {max(valid) * 1000:7.0f}ms")
+    
+    if display is not None:
+        display.close()
+
+
+if __name__ == '__main__':
+    main()
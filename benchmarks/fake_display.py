@@ -0,0 +1,141 @@
+"""
+Simuliertes ESP32-Display über ein Pseudo-Terminal (nur Linux/macOS)
+Antwortet auf IDENTIFY und dekodiert JSON-Zeilen und Binär-Frames wie die
+Firmware. Nach reset() ignoriert es Eingaben für boot_time Sekunden - wie ein
+ESP32, der beim Öffnen des Ports per DTR neu startet. process_time simuliert
+die Zeichenzeit pro Frame, nach "ACK ON" wird jeder Frame mit "ACK" bestätigt,
+"PING <t>" wird nach allen vorherigen Frames mit "PONG <t>" beantwortet.
+Verlaufs-Frames (HIST1) landen ohne ACK in backfills.
+Mit baudrate liest es nur so schnell, wie eine echte UART-Verbindung Bytes
+liefert (10 Bits pro Byte) - der PC blockiert dann wie an einem echten Port.
+
+Beispiel:
+    display = FakeDisplay(boot_time=0.8)
+    display.reset()
+    ... SystemMonitor(port=display.port) ...
+    display.frames  # [(zeitpunkt, dict), ...]
+    display.backfills  # [(zeitpunkt, [(cpu, cpu_peak, gpu, gpu_peak), ...]), ...]
+"""
+
+import json
+import os
+import pty
+import select
+import sys
+import threading
+import time
+import tty
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from serial_protocol import FRAME_TYPE_HISTORY, SYNC, FrameDecoder
+
+
+class FakeDisplay:
+    def __init__(self, capabilities="BIN1 DELTA1 AGG1 ACK1 PING1 HIST1", boot_time=0.0, process_time=0.0,
+                 baudrate=None):
+        """
+        Args:
+            capabilities: Capability-Tokens der IDENTIFY-Antwort
+            boot_time: Simulierte Boot-Zeit nach reset() in Sekunden
+            process_time: Simulierte Verarbeitungszeit pro Frame in Sekunden
+            baudrate: Simulierte Baudrate (None = so schnell wie das pty)
+        """
+        self.capabilities = capabilities
+        self.boot_time = boot_time
+        self.process_time = process_time
+        self.baudrate = baudrate
+        self.ack_mode = False
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+        
+        self.frames = []
+        self.backfills = []  # Vollständig empfangene Verläufe
+        self._history = []
+        self.identify_requests = 0
+        self.bytes_received = 0
+        self.first_frame = threading.Event()
+        self._ready_at = 0.0
+        self._decoder = FrameDecoder()
+        self._line = bytearray()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="fake-display", daemon=True)
+        self._thread.start()
+    
+    def reset(self):
+        """Simuliert einen Neustart: bis boot_time vergangen ist, gehen Eingaben verloren"""
+        self.frames = []
+        self.backfills = []
+        self._history = []
+        self.first_frame.clear()
+        self._ready_at = time.monotonic() + self.boot_time
+    
+    def _frame(self, data):
+        self.frames.append((time.monotonic(), data))
+        self.first_frame.set()
+        if self.process_time:
+            time.sleep(self.process_time)  # Einfädig wie die Firmware: liest währenddessen nicht
+        if self.ack_mode:
+            os.write(self.master, b"ACK\r\n")
+    
+    def _history_frame(self, data):
+        if data['history_offset'] == 0:
+            self._history = []
+        self._history += data['history']
+        if len(self._history) >= data['history_total']:
+            self.backfills.append((time.monotonic(), self._history))
+            self._history = []
+    
+    def _run(self):
+        # Gedrosselt in Häppchen von ca. 10 ms Übertragungszeit lesen
+        chunk_size = max(16, self.baudrate // 1000) if self.baudrate else 4096
+        while not self._closed.is_set():
+            try:
+                if not select.select([self.master], [], [], 0.1)[0]:
+                    continue
+                chunk = os.read(self.master, chunk_size)
+            except (OSError, ValueError):
+                return
+            if self.baudrate:
+                time.sleep(len(chunk) * 10 / self.baudrate)
+            if time.monotonic() < self._ready_at:
+                continue  # Board bootet noch
+            self.bytes_received += len(chunk)
+            
+            for frame_type, data in self._decoder.feed(chunk):
+                if frame_type == FRAME_TYPE_HISTORY:
+                    self._history_frame(data)
+                else:
+                    self._frame(data)
+            
+            self._line += chunk
+            while b'\n' in self._line:
+                line, _, rest = bytes(self._line).partition(b'\n')
+                self._line = bytearray(rest)
+                line = line.strip()
+                if SYNC in line:
+                    continue
+                if line == b'IDENTIFY':
+                    self.identify_requests += 1
+                    self.ack_mode = False
+                    os.write(self.master, f"USB_DISPLAY {self.capabilities}\r\n".encode())
+                elif line == b'ACK ON':
+                    self.ack_mode = True
+                elif line.startswith(b'PING '):
+                    os.write(self.master, b"PONG " + line[5:] + b"\r\n")
+                elif line.startswith(b'{'):
+                    try:
+                        self._frame(json.loads(line))
+                    except ValueError:
+                        pass
+    
+    def close(self):
+        # Erst den Thread beenden: sonst liest er vom wiederverwendeten fd eines neuen pty
+        self._closed.set()
+        self._thread.join(timeout=1.0)
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
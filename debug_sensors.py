@@ -1,15 +1,27 @@
 """
 Debug-Tool für LibreHardwareMonitor
-Zeigt alle verfügbaren Sensoren an
+Zeigt alle verfügbaren Sensoren an und hilft beim Erstellen einer eigenen
+Sensor-Zuordnung (pc_monitor.py --lhm-map, siehe sensor_map.py).
+
+Nutzung:
+    python debug_sensors.py                          # Sensor-Baum wie bisher
+    python debug_sensors.py --paths                  # Ein Sensor pro Zeile als Selektor-Pfad
+    python debug_sensors.py --check sensors.json     # Welcher Sensor landet in welchem Feld?
+    python debug_sensors.py --write-map sensors.json # Aktuelle Zuordnung als Datei festschreiben
+    python debug_sensors.py --save data.json         # Rohdaten sichern (z.B. zum Einschicken)
+    python debug_sensors.py --fixture data.json ...  # Gesicherte Rohdaten statt LHM verwenden
 """
 
-import requests
+import argparse
 import json
+import sys
+
 
-def get_all_sensors():
-    """Holt und zeigt alle Sensoren von LibreHardwareMonitor"""
+def get_all_sensors(url="http://localhost:8085/data.json"):
+    """Holt den Sensor-Baum von LibreHardwareMonitor"""
+    import requests
     try:
-        response = requests.get("http://localhost:8085/data.json", timeout=2)
+        response = requests.get(url, timeout=2)
         if response.status_code == 200:
             return response.json()
         return None
@@ -17,6 +29,7 @@ def get_all_sensors():
         print(f"Fehler: {e}")
         return None
 
+
 def print_tree(data, indent=0):
     """Zeigt die Sensor-Hierarchie"""
     if isinstance(data, dict):
@@ -36,26 +49,159 @@ def print_tree(data, indent=0):
         for item in data:
             print_tree(item, indent)
 
-print("=" * 60)
-print("LibreHardwareMonitor - Sensor Debug")
-print("=" * 60)
-print()
 
-data = get_all_sensors()
-if data:
-    print("✓ Verbunden mit LibreHardwareMonitor")
-    print()
-    print("Verfügbare Sensoren:")
-    print("-" * 60)
-    print_tree(data)
-    print("-" * 60)
-    print()
-    print("Tipp: Kopiere diese Ausgabe und schicke sie,")
-    print("      damit die Sensor-Namen angepasst werden können.")
-else:
+def print_paths(layout, nodes):
+    """Ein Sensor pro Zeile: Pfad = Wert [SensorId] - direkt als Selektor verwendbar"""
+    from sensor_map import exact_selector
+    for (hardware, group, sensor), node in zip(layout, nodes):
+        if node.get('Children'):
+            continue  # Zwischenebene (Computer, Mainboard), kein Sensor
+        sensor_id = node.get('SensorId')
+        print(f"{exact_selector(hardware, group, sensor)} = {node.get('Value', '')}"
+              + (f"  [{sensor_id}]" if sensor_id else ""))
+
+
+def compile_map(sensor_map, layout, nodes):
+    """Kompiliert die Zuordnung gegen den Baum wie der Client (sensor_plan)"""
+    lowered = [(hardware.lower(), group.lower(), sensor.lower()) for hardware, group, sensor in layout]
+    return sensor_map.compile(lowered, [node.get('SensorId') for node in nodes])
+
+
+def print_check(plan, layout, nodes):
+    """Zeigt pro Feld alle Kandidaten mit Wert; ► markiert den, der in den Frame geht"""
+    from librehardwaremonitor_client import parse_sensor_value
+    from sensor_map import sensor_path
+    for entry in plan:
+        chosen = None
+        lines = []
+        for position, scale, offset in entry.candidates:
+            value = parse_sensor_value(str(nodes[position].get('Value', '')))
+            if value is not None:
+                value = value * scale + offset
+                if chosen is None:
+                    chosen = position
+            shown = '-' if value is None else f"{value:.{entry.digits}f}"
+            lines.append((position == chosen, f"{sensor_path(*layout[position])} = {shown}"))
+        if not lines:
+            fallback = 'fehlt im Frame' if entry.default is None else f"{entry.default}"
+            print(f"✗ {entry.field}: kein Sensor gefunden ({fallback})")
+            continue
+        print(f"{'✓' if chosen is not None else '✗'} {entry.field}:")
+        for marked, line in lines:
+            print(f"    {'►' if marked else ' '} {line}")
+
+
+def pinned_map(plan, layout, nodes):
+    """
+    Schreibt die aufgelösten Sensoren als exakte Selektoren fest
+    Bevorzugt die SensorId (übersteht umbenannte Sensoren), sonst den exakten
+    Pfad; alle Kandidaten bleiben in ihrer Reihenfolge erhalten.
+    
+    Returns:
+        dict: Inhalt für --lhm-map
+    """
+    from sensor_map import exact_selector
+    fields = {}
+    for entry in plan:
+        selectors = []
+        for position, scale, offset in entry.candidates:
+            sensor_id = nodes[position].get('SensorId')
+            selector = {'id': sensor_id} if sensor_id else {'path': exact_selector(*layout[position])}
+            if scale != 1.0:
+                selector['scale'] = scale
+            if offset != 0.0:
+                selector['offset'] = offset
+            selectors.append(selector['path'] if list(selector) == ['path'] else selector)
+        if selectors:
+            fields[entry.field] = selectors
+    return {'fields': fields}
+
+
+def print_help_offline():
     print("✗ Keine Verbindung zu LibreHardwareMonitor")
     print()
     print("Prüfe:")
     print("  1. LibreHardwareMonitor als Admin gestartet?")
     print("  2. Options -> Remote Web Server aktiviert?")
     print("  3. Port 8085 frei?")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LibreHardwareMonitor Sensor-Debug')
+    parser.add_argument('--url', default='http://localhost:8085/data.json',
+                        help='LHM-Webserver (default: http://localhost:8085/data.json)')
+    parser.add_argument('--fixture', default=None, metavar='DATEI',
+                        help='Gesicherte data.json statt LibreHardwareMonitor verwenden')
+    parser.add_argument('--save', default=None, metavar='DATEI', help='Rohdaten als JSON speichern')
+    parser.add_argument('--paths', action='store_true',
+                        help="Ein Sensor pro Zeile als 'Hardware/Gruppe/Sensor = Wert [SensorId]'")
+    parser.add_argument('--check', nargs='?', const='', default=None, metavar='DATEI',
+                        help='Zuordnung prüfen: welcher Sensor landet in welchem Feld (ohne DATEI: eingebaute)')
+    parser.add_argument('--map', default=None, metavar='DATEI',
+                        help='Zuordnung, die --write-map festschreibt (default: eingebaute)')
+    parser.add_argument('--write-map', default=None, metavar='DATEI',
+                        help='Aufgelöste Sensoren als --lhm-map-Datei schreiben')
+    args = parser.parse_args()
+    
+    quiet = args.paths or args.check is not None or args.write_map
+    if not quiet:
+        print("=" * 60)
+        print("LibreHardwareMonitor - Sensor Debug")
+        print("=" * 60)
+        print()
+    
+    if args.fixture:
+        try:
+            with open(args.fixture, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            parser.error(f"--fixture {args.fixture}: {e}")
+    else:
+        data = get_all_sensors(args.url)
+    if not data:
+        print_help_offline()
+        return 1
+    
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, ensure_ascii=False)
+        print(f"✓ Rohdaten gespeichert: {args.save}")
+    
+    if not quiet:
+        print("✓ Verbunden mit LibreHardwareMonitor")
+        print()
+        print("Verfügbare Sensoren:")
+        print("-" * 60)
+        print_tree(data)
+        print("-" * 60)
+        print()
+        print("Tipp: Mit --paths als Selektor-Pfade ausgeben, mit --write-map")
+        print("      eine Zuordnung für pc_monitor.py --lhm-map erzeugen.")
+        return 0
+    
+    from librehardwaremonitor_client import flatten_sensor_tree
+    from sensor_map import SensorMap, load_sensor_map
+    layout, nodes, _ = flatten_sensor_tree(data)
+    
+    if args.paths:
+        print_paths(layout, nodes)
+    
+    if args.check is not None or args.write_map:
+        source = args.check or args.map
+        try:
+            sensor_map = load_sensor_map(source) if source else SensorMap()
+        except (OSError, ValueError) as e:
+            parser.error(f"{source}: {e}")
+        plan = compile_map(sensor_map, layout, nodes)
+        if args.check is not None:
+            print_check(plan, layout, nodes)
+        if args.write_map:
+            with open(args.write_map, 'w', encoding='utf-8') as f:
+                json.dump(pinned_map(plan, layout, nodes), f, indent=2, ensure_ascii=False)
+                f.write('\n')
+            print(f"✓ Zuordnung geschrieben: {args.write_map} (prüfen mit --check {args.write_map})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,630 @@
+"""
+Display-Sinks für den PC System Monitor
+Ein Sink ist ein angeschlossenes Display mit eigener Serial-Verbindung, eigenem
+per IDENTIFY ausgehandelten Encoder, eigener Feld-Auswahl und eigener Rate.
+Jeder Sink schreibt aus einer eigenen Queue in einem eigenen Writer-Thread -
+ein langsames oder abgezogenes Display hält die anderen nicht auf. Pro Sink
+wartet höchstens ein Frame (neuere Snapshots ersetzen ältere, noch nicht
+gesendete), optional begrenzen ACK-Credits des Displays die Sendemenge. Der
+Writer-Thread überwacht die Verbindung und verbindet sich nach Schreibfehlern
+oder abgezogenem Gerät mit Backoff neu (inkl. IDENTIFY). Bietet das Display
+PING1 an, misst der Sink regelmäßig die Render-Latenz per PING/PONG, bei
+HIST1 füllt er nach jedem Connect das Histogramm aus dem Verlauf des PCs.
+"""
+
+import threading
+import time
+from collections import deque
+
+import serial
+
+from pipeline import StageStats
+from serial_protocol import (ACK_ON_REQUEST, ACK_RESPONSE, CAP_ACK, CAP_AGGREGATE, CAP_BINARY, CAP_DELTA,
+                             CAP_HISTORY, CAP_PING, HISTORY_SLOTS, PING_REQUEST, PONG_RESPONSE, FrameEncoder,
+                             encode_history_frames, parse_capabilities)
+
+# Führendes \n verwirft Reste einer angefangenen Zeile (z.B. Bootloader-Ausgabe)
+IDENTIFY_REQUEST = b"\nIDENTIFY\n"
+IDENTIFY_RESPONSE = "USB_DISPLAY"
+
+
+def open_serial(port, baudrate, no_reset=False, **kwargs):
+    """
+    Öffnet einen Serial-Port
+    
+    Args:
+        port: Port-Name
+        baudrate: Baudrate
+        no_reset: DTR/RTS beim Öffnen nicht setzen - verhindert bei den meisten
+                  ESP32-Boards (Auto-Reset-Schaltung) den Neustart
+        **kwargs: Weitere Argumente für serial.Serial (timeout, write_timeout, ...)
+    
+    Returns:
+        serial.Serial: Geöffneter Port
+    """
+    ser = serial.Serial(None, baudrate, **kwargs)
+    ser.port = port
+    if no_reset:
+        ser.dtr = False
+        ser.rts = False
+    ser.open()
+    return ser
+
+
+def wait_ready(ser, timeout=3.0, retry_interval=0.1, cancel_event=None):
+    """
+    Readiness-Handshake: sendet IDENTIFY in kurzen Abständen, bis das Display antwortet
+    Ersetzt eine feste Wartezeit nach dem Öffnen - ein bereits laufendes Board
+    antwortet sofort, ein gerade neu startendes sobald seine loop() läuft.
+    
+    Args:
+        ser: Geöffneter Serial-Port
+        timeout: Maximale Wartezeit in Sekunden (Boot-Zeit des Boards)
+        retry_interval: Abstand zwischen zwei IDENTIFY-Anfragen in Sekunden
+        cancel_event: Optionales threading.Event zum vorzeitigen Abbruch
+    
+    Returns:
+        str: Antwortzeile ('USB_DISPLAY ...') oder None bei Timeout/Abbruch
+    """
+    ser.reset_input_buffer()
+    response_buffer = ""
+    deadline = time.monotonic() + timeout
+    next_request = 0.0
+    
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            return None
+        if now >= next_request:
+            ser.write(IDENTIFY_REQUEST)
+            ser.flush()
+            next_request = now + retry_interval
+        
+        if ser.in_waiting > 0:
+            response_buffer += ser.read(ser.in_waiting).decode('utf-8', errors='ignore')
+            start = response_buffer.find(IDENTIFY_RESPONSE)
+            if start >= 0:
+                end = response_buffer.find('\n', start)
+                if end >= 0:
+                    return response_buffer[start:end].strip()
+        
+        if cancel_event is not None:
+            if cancel_event.wait(0.01):
+                return None
+        else:
+            time.sleep(0.01)
+
+
+class DisplaySink:
+    """
+    Ein Display an einem Serial-Port
+    
+    Beispiel:
+        sink = DisplaySink('COM5', fields=('cpu_temp', 'gpu_temp'), interval=5.0)
+        sink.connect()
+        sink.start()
+        sink.offer(data)  # nicht-blockierend, aus dem Sender-Takt
+    """
+    
+    def __init__(self, port, baudrate=115200, fields=None, interval=None, protocol='json',
+                 delta=False, delta_epsilon=None, keyframe_interval=30, write_timeout=1.0,
+                 backoff_base=0.5, backoff_max=10.0, rediscover=None, ready_timeout=3.0,
+                 no_reset=False, ack=False, ack_window=1, ack_timeout=0.5, ping_interval=1.0, backfill=None):
+        """
+        Args:
+            port: Serial-Port des Displays
+            baudrate: Baudrate
+            fields: Zu sendende Felder (None = alle)
+            interval: Eigenes Sende-Intervall in Sekunden (None = jeder Tick)
+            protocol: 'json' oder 'binary' (binär nur, wenn das Display es anbietet)
+            delta: Nur geänderte Felder senden (nur, wenn das Display es anbietet)
+            delta_epsilon: Schwellwert pro Feld (dict) oder None für Standardwerte
+            keyframe_interval: Im Delta-Modus alle N Frames einen vollständigen Frame senden
+            write_timeout: Maximale Blockierzeit eines Schreibvorgangs in Sekunden
+            backoff_base: Erste Wartezeit zwischen Reconnect-Versuchen (Sekunden)
+            backoff_max: Maximale Wartezeit zwischen Reconnect-Versuchen (Sekunden)
+            rediscover: Optionales Callable, liefert einen neuen, per IDENTIFY verifizierten
+                        Port (oder None), falls der bisherige nicht mehr existiert
+                        (z.B. neue COM-Nummer)
+            ready_timeout: Maximale Wartezeit auf die IDENTIFY-Antwort nach dem Öffnen
+            no_reset: ESP32-Reset (DTR/RTS) beim Öffnen vermeiden
+            ack: Flow Control per ACK-Credits (nur, wenn das Display es anbietet)
+            ack_window: Maximale Anzahl unbestätigter Frames
+            ack_timeout: Maximale Wartezeit auf ein ACK in Sekunden (danach weiter senden)
+            ping_interval: Abstand der Render-Latenz-Messungen in Sekunden (0 = aus;
+                           nur, wenn das Display es anbietet)
+            backfill: Optionales Callable(seconds) -> Verlauf der letzten Sekunden
+                      (siehe encode_history_frames), wird nach jedem Connect an
+                      das Display geschickt (nur, wenn es HIST1 anbietet)
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.fields = tuple(fields) if fields else None
+        self.interval = interval
+        self.protocol = protocol
+        self.delta = delta
+        self.delta_epsilon = delta_epsilon
+        self.keyframe_interval = keyframe_interval
+        self.write_timeout = write_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rediscover = rediscover
+        self.ready_timeout = ready_timeout
+        self.no_reset = no_reset
+        self.ack = ack
+        self.ack_window = ack_window
+        self.ack_timeout = ack_timeout
+        self.ping_interval = ping_interval
+        self.backfill = backfill
+        
+        self.ser = None
+        self.connected = False
+        self.capabilities = set()
+        self.encoder = FrameEncoder()
+        
+        # Ein-Frame-Puffer: der neueste Snapshot gewinnt
+        self._pending = None
+        self._pending_cond = threading.Condition()
+        
+        # Flow Control
+        self.flow_control = False
+        self.credits = 0
+        self._unacked = deque()  # Sendezeitpunkte unbestätigter Frames
+        self._rx_buffer = bytearray()
+        
+        # Render-Latenz per PING/PONG
+        self.ping_active = False
+        self._next_ping = 0.0
+        self._ping_sent = None  # Sendezeitpunkt des offenen PINGs
+        
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.encode_stats = StageStats()
+        self.write_stats = StageStats()
+        self.render_stats = StageStats()
+        self.ready_stats = StageStats()
+        self.ack_stats = StageStats()
+        self.reconnect_stats = StageStats()
+        self.backfill_stats = StageStats()
+        self.backfills = 0
+        self.backfill_bytes = 0
+        self.frames = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.ack_timeouts = 0
+        self.errors = 0
+        self.reconnects = 0
+        self.last_error = None
+        self._due = None
+        self._lost_at = None
+    
+    def connect(self, require_reply=False):
+        """
+        Öffnet den Port, wartet per IDENTIFY auf das Display und handelt das Protokoll aus
+        
+        Args:
+            require_reply: Ohne IDENTIFY-Antwort abbrechen statt trotzdem zu senden
+                           (Reconnect: am Port kann inzwischen ein anderes Gerät hängen)
+        
+        Returns:
+            list: Meldungen der Protokoll-Aushandlung
+        
+        Raises:
+            serial.SerialException: Port nicht verfügbar bzw. keine IDENTIFY-Antwort
+                                    (nur mit require_reply)
+        """
+        start = time.monotonic()
+        self.ser = open_serial(self.port, self.baudrate, no_reset=self.no_reset,
+                               timeout=0.05, write_timeout=self.write_timeout)
+        
+        # Bereit, sobald das Display antwortet (statt fester Boot-Wartezeit)
+        try:
+            response = wait_ready(self.ser, self.ready_timeout, cancel_event=self.stop_event)
+        except Exception:
+            self.ser.close()
+            self.ser = None
+            raise
+        if response is None and require_reply:
+            self.ser.close()
+            self.ser = None
+            raise serial.SerialException(f"Keine IDENTIFY-Antwort nach {self.ready_timeout:.1f} s")
+        self.ready_stats.record(time.monotonic() - start)
+        self.capabilities = parse_capabilities(response or "")
+        
+        messages = self.negotiate_protocol()
+        self._rx_buffer.clear()
+        self._unacked.clear()
+        if self.flow_control:
+            self.ser.write(ACK_ON_REQUEST)
+            self.ser.flush()
+            self.credits = self.ack_window
+        if self.backfill is not None and CAP_HISTORY in self.capabilities:
+            message = self.send_backfill()
+            if message:
+                messages.append(message)
+        if response is None:
+            messages.insert(0, f"ℹ Keine IDENTIFY-Antwort nach {self.ready_timeout:.1f} s - sende trotzdem")
+        self.connected = True
+        return messages
+    
+    def negotiate_protocol(self):
+        """
+        Wählt Wire-Protokoll und Delta-Modus anhand der IDENTIFY-Antwort
+        (self.capabilities aus dem Readiness-Handshake in connect())
+        Fallback ist immer vollständiges JSON pro Frame.
+        
+        Returns:
+            list: Meldungen zur Ausgabe (aktivierte bzw. nicht unterstützte Modi)
+        """
+        messages = []
+        binary = False
+        delta = False
+        extended = CAP_AGGREGATE in self.capabilities
+        
+        if self.protocol == 'binary':
+            # Feld-Auswahl binär nur als Delta-Frames (Bitmaske), sonst würden
+            # fehlende Felder auf dem Display mit 0 überschrieben
+            binary = CAP_BINARY in self.capabilities and (self.fields is None or CAP_DELTA in self.capabilities)
+            if binary:
+                messages.append("✓ Binär-Protokoll aktiv")
+            else:
+                messages.append("ℹ Display unterstützt kein Binär-Protokoll - verwende JSON")
+        
+        if self.delta:
+            delta = CAP_DELTA in self.capabilities
+            if delta:
+                messages.append(f"✓ Delta-Modus aktiv (Keyframe alle {self.keyframe_interval} Ticks)")
+            else:
+                messages.append("ℹ Display unterstützt keinen Delta-Modus - sende vollständige Frames")
+        
+        self.flow_control = False
+        if self.ack:
+            self.flow_control = CAP_ACK in self.capabilities
+            if self.flow_control:
+                messages.append(f"✓ Flow Control aktiv (ACK, max. {self.ack_window} unbestätigte Frames)")
+            else:
+                messages.append("ℹ Display unterstützt keine ACKs - sende ohne Flow Control")
+        
+        self.ping_active = self.ping_interval > 0 and CAP_PING in self.capabilities
+        self._next_ping = 0.0
+        self._ping_sent = None
+        
+        self.encoder = FrameEncoder(binary=binary, delta=delta, epsilon=self.delta_epsilon,
+                                    keyframe_interval=self.keyframe_interval, extended=extended,
+                                    partial=self.fields is not None, delta_frames=CAP_DELTA in self.capabilities)
+        return messages
+    
+    def send_backfill(self):
+        """
+        Schickt den Verlauf der letzten HISTORY_SLOTS Sekunden in einem Schwung
+        (alle Verlaufs-Frames in einem Schreibvorgang, vor dem ersten Daten-Frame)
+        
+        Returns:
+            str: Meldung oder None, falls es noch keinen Verlauf gibt
+        
+        Raises:
+            serial.SerialException: Schreibfehler (wie beim Connect)
+        """
+        start = time.perf_counter()
+        samples = self.backfill(HISTORY_SLOTS)
+        filled = sum(1 for sample in samples if sample is not None)
+        if not filled:
+            return None
+        payload = b''.join(encode_history_frames(samples))
+        self.ser.write(payload)
+        self.ser.flush()
+        self.backfill_stats.record(time.perf_counter() - start)
+        self.backfills += 1
+        self.backfill_bytes += len(payload)
+        return f"✓ Verlauf nachgeladen ({filled} s, {len(payload)} Bytes)"
+    
+    def select(self, data):
+        """Reduziert einen Frame auf die Felder dieses Sinks"""
+        if self.fields is None:
+            return data
+        return {name: data[name] for name in self.fields if name in data}
+    
+    def offer(self, data, now=None):
+        """
+        Übergibt einen Frame an den Writer, falls für diesen Sink fällig (blockiert nie)
+        Ein noch nicht gesendeter Frame wird dabei ersetzt - es wartet immer
+        höchstens ein Frame, die Latenz bleibt also begrenzt.
+        
+        Args:
+            data: Vollständiger Frame (dict)
+            now: Zeitpunkt in Sekunden (default: time.monotonic())
+        
+        Returns:
+            bool: True, falls der Frame übernommen wurde
+        """
+        if now is None:
+            now = time.monotonic()
+        if self.interval:
+            if self._due is not None and now < self._due:
+                return False
+            # Auf festem Raster bleiben, verpasste Termine überspringen
+            self._due = now + self.interval if self._due is None else self._due + self.interval
+            if self._due <= now:
+                self._due = now + self.interval
+        
+        frame = self.select(data)
+        with self._pending_cond:
+            if self._pending is not None:
+                self.dropped += 1  # Vom neueren Snapshot überholt
+            self._pending = frame
+            self._pending_cond.notify()
+        return True
+    
+    def _take(self, timeout):
+        """Holt den wartenden Frame (oder None nach timeout Sekunden)"""
+        with self._pending_cond:
+            if self._pending is None:
+                self._pending_cond.wait(timeout)
+            frame, self._pending = self._pending, None
+        return frame
+    
+    def write(self, data):
+        """
+        Kodiert und schreibt einen Frame (im Writer-Thread)
+        
+        Returns:
+            bool: False bei Schreibfehler
+        """
+        start = time.perf_counter()
+        payload = self.encoder.encode(data)
+        self.encode_stats.record(time.perf_counter() - start)
+        if payload is None:
+            return True  # Delta-Modus: nichts geändert
+        
+        start = time.perf_counter()
+        try:
+            self.ser.write(payload)
+            self.ser.flush()  # Im Writer-Thread: wartet, bis das OS den Frame los ist
+        except Exception as e:  # SerialException, OSError, termios.error
+            self.errors += 1
+            self.disconnect(e)
+            return False
+        self.write_stats.record(time.perf_counter() - start)
+        self.frames += 1
+        self.bytes_sent += len(payload)
+        if self.flow_control:
+            self.credits -= 1
+            self._unacked.append(time.monotonic())
+        if self.ping_active:
+            self._ping()
+        return True
+    
+    def _ping(self):
+        """Sendet nach einem Frame einen Zeitstempel, falls eine Messung fällig ist"""
+        now = time.monotonic()
+        if now < self._next_ping:
+            return
+        self._next_ping = now + self.ping_interval
+        try:
+            self.ser.write(PING_REQUEST.format(int(now * 1000)).encode('ascii'))
+            self._ping_sent = now
+        except Exception as e:  # SerialException, OSError, termios.error
+            self.errors += 1
+            self.disconnect(e)
+    
+    def _read_responses(self):
+        """
+        Liest Ausgaben des Displays: ACKs werden als Credits verbucht, PONGs als
+        Render-Latenz (blockiert höchstens das Read-Timeout des Ports, 50 ms)
+        """
+        self._rx_buffer += self.ser.read(max(1, self.ser.in_waiting))
+        while b'\n' in self._rx_buffer:
+            line, _, rest = bytes(self._rx_buffer).partition(b'\n')
+            self._rx_buffer = bytearray(rest)
+            line = line.strip()
+            if line == ACK_RESPONSE:
+                self.credits = min(self.credits + 1, self.ack_window)
+                if self._unacked:
+                    self.ack_stats.record(time.monotonic() - self._unacked.popleft())
+            elif line.startswith(PONG_RESPONSE + b' '):
+                try:
+                    sent = int(line[len(PONG_RESPONSE) + 1:]) / 1000
+                except ValueError:
+                    continue
+                self.render_stats.record(time.monotonic() - sent)
+                self._ping_sent = None
+        if len(self._rx_buffer) > 4096:
+            self._rx_buffer.clear()  # Ausgabe ohne Zeilenende (z.B. Boot-Log)
+    
+    def _await_credit(self):
+        """
+        Wartet im Flow-Control-Modus auf ein freies Credit
+        Bleibt ein ACK länger als ack_timeout aus (verlorener oder verworfener
+        Frame), wird das Fenster zurückgesetzt statt dauerhaft zu blockieren.
+        
+        Returns:
+            bool: False, falls die Verbindung dabei verloren ging
+        """
+        if not self.flow_control or self.credits > 0:
+            return True
+        deadline = self._unacked[0] + self.ack_timeout if self._unacked else time.monotonic()
+        try:
+            while self.credits <= 0 and not self.stop_event.is_set():
+                if time.monotonic() >= deadline:
+                    self.ack_timeouts += 1
+                    self.credits = self.ack_window
+                    self._unacked.clear()
+                    break
+                self._read_responses()
+        except Exception as e:  # SerialException, OSError, termios.error
+            self.disconnect(e)
+            return False
+        return True
+    
+    def disconnect(self, error=None):
+        """Markiert die Verbindung als verloren und schließt den Port (Reconnect folgt)"""
+        if error is not None:
+            self.last_error = str(error)
+        if self.connected:
+            self.connected = False
+            self._lost_at = time.monotonic()
+            print(f"⚠ {self.port}: Verbindung verloren ({self.last_error}) - verbinde neu...")
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+            self.ser = None
+    
+    def check_alive(self):
+        """
+        Prüft im Leerlauf, ob das Gerät noch existiert
+        (abgezogene USB-Geräte fallen sonst erst beim nächsten Schreiben auf)
+        
+        Returns:
+            bool: False, falls die Verbindung verloren ist
+        """
+        try:
+            if self.flow_control or self.ping_active:
+                if self.ser.in_waiting:
+                    self._read_responses()
+            elif self.ser.in_waiting:
+                self.ser.reset_input_buffer()  # Ausgaben des Displays verwerfen
+            return True
+        except Exception as e:  # SerialException, OSError, termios.error
+            self.disconnect(e)
+            return False
+    
+    def reconnect(self):
+        """
+        Verbindet mit exponentiellem Backoff neu, bis es klappt oder stop() gerufen wird
+        Danach wird das Protokoll neu ausgehandelt und der nächste Frame ist ein Keyframe.
+        Ein Port ohne IDENTIFY-Antwort gilt als fehlgeschlagen. rediscover läuft
+        höchstens einmal pro Backoff-Intervall.
+        
+        Returns:
+            bool: True nach erfolgreichem Reconnect
+        """
+        if self._lost_at is None:
+            self._lost_at = time.monotonic()
+        delay = self.backoff_base
+        rediscover_at = 0.0
+        while not self.stop_event.is_set():
+            try:
+                self.connect(require_reply=True)
+            except Exception as e:  # SerialException, OSError, termios.error
+                self.last_error = str(e)
+                self.disconnect()
+                if self.rediscover and time.monotonic() >= rediscover_at:
+                    rediscover_at = time.monotonic() + delay
+                    port = self.rediscover()
+                    if port and port != self.port:
+                        print(f"ℹ {self.port}: Display jetzt an {port}")
+                        self.port = port
+                        continue
+                if self.stop_event.wait(delay):
+                    break
+                delay = min(delay * 2, self.backoff_max)
+                continue
+            
+            latency = time.monotonic() - self._lost_at
+            self._lost_at = None
+            self.reconnects += 1
+            self.reconnect_stats.record(latency)
+            print(f"✓ {self.port}: wieder verbunden nach {latency * 1000:.0f} ms")
+            return True
+        return False
+    
+    def _run(self):
+        while not self.stop_event.is_set():
+            if not self.connected and not self.reconnect():
+                break
+            # Erst auf Credit warten, dann den Frame holen - so wird immer der
+            # neueste Snapshot gesendet (auch direkt nach einem Reconnect)
+            if not self._await_credit():
+                continue
+            # Offener PING: kurz pollen, damit das PONG zeitnah verbucht wird
+            pong_pending = self._ping_sent is not None and time.monotonic() - self._ping_sent < self.ping_interval
+            data = self._take(0.005 if pong_pending else 0.2)
+            if data is None:
+                self.check_alive()
+                continue
+            self.write(data)
+    
+    def start(self):
+        """Startet den Writer-Thread"""
+        self.thread = threading.Thread(target=self._run, name=f"sink-{self.port}", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Stoppt den Writer-Thread"""
+        self.stop_event.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=self.write_timeout + 0.5)
+    
+    def close(self):
+        """Stoppt den Writer-Thread und schließt den Port"""
+        self.stop()
+        if self.ser is not None:
+            try:
+                self.ser.close()
+            except Exception:
+                pass
+    
+    def status(self):
+        """
+        Returns:
+            dict: Verbindungsstatus, frames, bytes, dropped (überholte Frames), errors,
+                  reconnects, ack_timeouts, backfills sowie Kodier- und Schreibzeit, ACK- und
+                  Render-Latenz, Zeit bis zur IDENTIFY-Antwort, Reconnect-Latenz und
+                  Dauer des Verlauf-Backfills (ms)
+        """
+        return {
+            'port': self.port,
+            'connected': self.connected,
+            'frames': self.frames,
+            'bytes': self.bytes_sent,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'reconnects': self.reconnects,
+            'ack_timeouts': self.ack_timeouts,
+            'backfills': self.backfills,
+            'backfill_bytes': self.backfill_bytes,
+            'last_error': self.last_error,
+            'encode': self.encode_stats.snapshot(),
+            'write': self.write_stats.snapshot(),
+            'ack': self.ack_stats.snapshot(),
+            'render': self.render_stats.snapshot(),
+            'ready': self.ready_stats.snapshot(),
+            'reconnect': self.reconnect_stats.snapshot(),
+            'backfill': self.backfill_stats.snapshot(),
+        }
+
+
+def parse_sink_spec(spec):
+    """
+    Liest eine Sink-Beschreibung von der Kommandozeile
+    
+    Format: PORT[:interval=S][:fields=a,b,...][:protocol=json|binary]
+    Beispiel: 'COM5:interval=5:fields=cpu_temp,gpu_temp'
+    
+    Returns:
+        dict: Keyword-Argumente für DisplaySink (port, optional interval/fields/protocol)
+    """
+    port, *options = spec.split(':')
+    if not port:
+        raise ValueError("Port fehlt")
+    sink = {'port': port}
+    for option in options:
+        if '=' not in option:
+            raise ValueError(f"Ungültige Option: {option}")
+        key, value = option.split('=', 1)
+        key = key.strip()
+        if key == 'interval':
+            sink['interval'] = float(value)
+            if sink['interval'] <= 0:
+                raise ValueError("interval muss positiv sein")
+        elif key == 'fields':
+            sink['fields'] = tuple(name.strip() for name in value.split(',') if name.strip())
+        elif key == 'protocol':
+            if value not in ('json', 'binary'):
+                raise ValueError(f"Unbekanntes Protokoll: {value}")
+            sink['protocol'] = value
+        else:
+            raise ValueError(f"Unbekannte Option: {key}")
+    return sink
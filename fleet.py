@@ -0,0 +1,548 @@
+"""
+Flotten-Modus: viele PCs, ein Display
+Ein Agent (pc_monitor.py --agent) schickt jeden Frame zusätzlich als JSON an
+einen Aggregator im LAN - per UDP (ein Datagramm pro Frame, ein verlorenes
+Paket ersetzt der nächste Frame) oder TCP (eine JSON-Zeile pro Frame). Der
+Aggregator (pc_monitor.py --aggregate) empfängt in einem asyncio-Thread von
+beliebig vielen Agents auf UDP und TCP, hält pro Host nur den letzten Frame
+und bildet pro Sende-Takt einen Flotten-Frame für das Display: höchste
+Temperaturen, mittlere Auslastung und die heißesten Hosts. Pro Paket kostet
+das ein json.loads und eine Dict-Zuweisung, die Reduktion läuft einmal pro
+Takt statt pro Paket. Den UDP-Socket liest der Aggregator gesammelt: nach
+jedem Aufwachen ruht der Reader batch_delay Sekunden, die Pakete laufen
+solange im Socket-Puffer auf. Hunderte Agents kosten so höchstens
+1/batch_delay Wakeups pro Sekunde statt einem pro Paket.
+
+Nachricht eines Agents (UDP: ein Datagramm, TCP: eine Zeile):
+    {"host": "rack1-node07", "seq": 42, "data": {"cpu_temp": 61.5, ...}}
+
+Beispiel:
+    aggregator = FleetAggregator('0.0.0.0', 9109, ttl=5.0, top_n=3)
+    aggregator.start()
+    agent = FleetAgent('udp://127.0.0.1:9109', name='rack1-node07')
+    agent.publish({'cpu_temp': 61.5, 'cpu_usage': 12.0, ...})
+    aggregator.frame()  # {'cpu_temp': 61.5, ..., 'fleet_hosts': 1, 'fleet_hottest': 'rack1-node07', ...}
+"""
+
+import heapq
+import json
+import socket
+import threading
+import time
+
+DEFAULT_PORT = 9109
+
+TRANSPORTS = ('udp', 'tcp')
+
+# Größtes UDP-Datagramm (ein Frame mit cpu_cores/gpus bleibt weit darunter)
+MAX_DATAGRAM = 65507
+
+# Empfangspuffer des UDP-Sockets: hält die Datagramme zwischen zwei gesammelten
+# Lesevorgängen (Linux begrenzt ihn auf net.core.rmem_max, typisch 208 KiB =
+# rund 800 Frames pro batch_delay)
+RECEIVE_BUFFER = 1 << 20
+
+# Reduktion der Display-Felder über alle Hosts: Temperaturen als Maximum,
+# Auslastung als Mittelwert. Die Lüfter kommen vom heißesten Host, damit
+# Temperatur und Drehzahl auf dem Display zusammenpassen.
+FLEET_REDUCTIONS = (
+    ('cpu_temp', 'max'),
+    ('cpu_usage', 'mean'),
+    ('cpu_fan', 'hottest'),
+    ('gpu_temp', 'max'),
+    ('gpu_usage', 'mean'),
+    ('gpu_fan', 'hottest'),
+    ('ram_usage', 'mean'),
+)
+
+# Längste JSON-Zeile, die das Display annimmt (LINE_BUFFER_SIZE 512 in src/main.cpp
+# abzüglich '\0'); längere Zeilen kommen abgeschnitten an und werden verworfen
+DISPLAY_LINE_LIMIT = 511
+
+# Obergrenzen für --fleet-top und die Länge der Host-Namen im Flotten-Frame
+FLEET_TOP_MAX = 5
+HOST_NAME_MAX = 24
+
+
+def parse_address(spec, default_host='127.0.0.1'):
+    """
+    Zerlegt eine Adresse wie 'udp://host:port', 'tcp://host:port', 'host:port' oder ':port'
+    
+    Args:
+        spec: Adresse (ohne Transport: udp, ohne Port: DEFAULT_PORT)
+        default_host: Host, falls spec keinen angibt
+    
+    Returns:
+        tuple: (transport, host, port)
+    
+    Raises:
+        ValueError: Unbekannter Transport oder ungültiger Port
+    """
+    transport = 'udp'
+    if '://' in spec:
+        transport, spec = spec.split('://', 1)
+        if transport not in TRANSPORTS:
+            raise ValueError(f"Unbekannter Transport '{transport}' (erlaubt: {', '.join(TRANSPORTS)})")
+    host, _, port = spec.rpartition(':') if ':' in spec else (spec, ':', '')
+    try:
+        port = int(port) if port else DEFAULT_PORT
+    except ValueError:
+        raise ValueError(f"Ungültiger Port '{port}'") from None
+    if not 0 <= port <= 65535:
+        raise ValueError(f"Ungültiger Port {port}")
+    return transport, host.strip('[]') or default_host, port
+
+
+def _heat(data):
+    """Höchste Temperatur eines Hosts (CPU oder GPU) für die Rangfolge"""
+    return max(_number(data.get('cpu_temp')), _number(data.get('gpu_temp')))
+
+
+def _number(value):
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else 0.0
+
+
+def fleet_frame_fields(hosts, top_n=3):
+    """
+    Bildet einen Flotten-Frame aus den letzten Frames aller Hosts
+    
+    Args:
+        hosts: dict Host-Name -> Frame (dict wie von SystemMonitor.get_system_data)
+        top_n: Anzahl der heißesten Hosts in 'fleet_top' (höchstens FLEET_TOP_MAX)
+    
+    Returns:
+        dict: Display-Felder (siehe FLEET_REDUCTIONS) + fleet_hosts, fleet_hottest und
+              fleet_top ([[host, temp, cpu_usage], ...], heißester zuerst);
+              None ohne Hosts. Host-Namen sind auf HOST_NAME_MAX Zeichen gekürzt,
+              fleet_top verliert notfalls die kühlsten Einträge, damit der Frame
+              als JSON-Zeile höchstens DISPLAY_LINE_LIMIT Bytes lang ist.
+    """
+    if not hosts:
+        return None
+    
+    top_n = min(top_n, FLEET_TOP_MAX)
+    top = heapq.nlargest(max(top_n, 1), hosts.items(), key=lambda item: _heat(item[1]))
+    hottest_name, hottest = top[0]
+    fields = {}
+    for name, reduction in FLEET_REDUCTIONS:
+        if reduction == 'hottest':
+            fields[name] = int(_number(hottest.get(name)))
+            continue
+        values = [data[name] for data in hosts.values() if isinstance(data.get(name), (int, float))]
+        if not values:
+            fields[name] = 0.0
+        elif reduction == 'max':
+            fields[name] = round(max(values), 1)
+        else:
+            fields[name] = round(sum(values) / len(values), 1)
+    
+    fields['fleet_hosts'] = len(hosts)
+    fields['fleet_hottest'] = hottest_name[:HOST_NAME_MAX]
+    fields['fleet_top'] = [[name[:HOST_NAME_MAX], round(_heat(data), 1), round(_number(data.get('cpu_usage')), 1)]
+                           for name, data in top[:top_n]]
+    # Nicht-ASCII-Namen werden als \uXXXX kodiert und können trotz Kürzung zu lang sein
+    while fields['fleet_top'] and len(json.dumps(fields)) > DISPLAY_LINE_LIMIT:
+        fields['fleet_top'].pop()
+    return fields
+
+
+class FleetAgent:
+    def __init__(self, target, name=None, timeout=0.5, retry_interval=5.0):
+        """
+        Sendet Frames an einen Aggregator
+        publish() übergibt den Frame nur an einen eigenen Sende-Thread; ein
+        langsamer oder unerreichbarer Aggregator (TCP-Verbindungsaufbau bis
+        timeout) hält so nie den Sender-Takt auf. Wie bei DisplaySink wartet
+        höchstens ein Frame, ältere werden vom neueren überholt.
+        
+        Args:
+            target: Adresse des Aggregators ('udp://host:port', 'tcp://host:port' oder 'host:port')
+            name: Host-Name in den Nachrichten (default: socket.gethostname())
+            timeout: Maximale Blockierzeit des Sende-Threads pro Frame in Sekunden
+                     (TCP-Verbindungsaufbau/Senden)
+            retry_interval: Wartezeit bis zum nächsten Verbindungsversuch nach einem Fehler
+        
+        Raises:
+            ValueError: Ungültige Adresse
+        """
+        self.transport, self.host, self.port = parse_address(target)
+        self.target = f"{self.transport}://{self.host}:{self.port}"
+        self.name = name or socket.gethostname()
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+        
+        self.seq = 0
+        self.sent = 0
+        self.errors = 0
+        self.dropped = 0
+        self._sock = None
+        self._retry_at = 0.0
+        self._pending = None
+        self._pending_cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _open(self):
+        kind = socket.SOCK_DGRAM if self.transport == 'udp' else socket.SOCK_STREAM
+        family, _, _, _, address = socket.getaddrinfo(self.host, self.port, type=kind)[0]
+        sock = socket.socket(family, kind)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(address)  # UDP: Adresse einmal auflösen statt pro sendto
+            if kind == socket.SOCK_STREAM:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    
+    def publish(self, data):
+        """
+        Übergibt einen Frame an den Sende-Thread (blockiert nie)
+        Ein noch nicht gesendeter Frame wird dabei ersetzt.
+        
+        Args:
+            data: dict wie von SystemMonitor.get_system_data
+        
+        Returns:
+            bool: True (der Frame wurde übernommen)
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fleet-agent", daemon=True)
+            self._thread.start()
+        with self._pending_cond:
+            if self._pending is not None:
+                self.dropped += 1  # Vom neueren Frame überholt
+            self._pending = data
+            self._pending_cond.notify()
+        return True
+    
+    def _run(self):
+        while not self._stop.is_set():
+            with self._pending_cond:
+                if self._pending is None:
+                    self._pending_cond.wait(0.2)
+                data, self._pending = self._pending, None
+            if data is not None:
+                self.send(data)
+    
+    def send(self, data):
+        """
+        Sendet einen Frame sofort im aufrufenden Thread (blockiert höchstens timeout Sekunden)
+        
+        Args:
+            data: dict wie von SystemMonitor.get_system_data
+        
+        Returns:
+            bool: True, falls der Frame gesendet wurde
+        """
+        if self._sock is None:
+            if time.monotonic() < self._retry_at:
+                return False
+            try:
+                self._sock = self._open()
+            except OSError:
+                self.errors += 1
+                self._retry_at = time.monotonic() + self.retry_interval
+                return False
+        # seq zählt nur tatsächlich gesendete Frames, Lücken beim Aggregator sind echte Verluste
+        self.seq += 1
+        message = json.dumps({'host': self.name, 'seq': self.seq, 'data': data},
+                             separators=(',', ':')).encode('utf-8')
+        try:
+            if self.transport == 'udp':
+                self._sock.send(message)
+            else:
+                self._sock.sendall(message + b'\n')
+        except OSError:
+            # UDP: ICMP "Port unreachable" vom letzten Datagramm, der Socket bleibt nutzbar
+            self.errors += 1
+            if self.transport == 'tcp':
+                self._disconnect()
+                self._retry_at = time.monotonic() + self.retry_interval
+            return False
+        self.sent += 1
+        return True
+    
+    def status(self):
+        """
+        Returns:
+            dict: Ziel, Host-Name, gesendete, überholte Frames und Fehler
+        """
+        return {'target': self.target, 'name': self.name, 'sent': self.sent, 'dropped': self.dropped,
+                'errors': self.errors}
+    
+    def _disconnect(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+    
+    def close(self):
+        """Stoppt den Sende-Thread und schließt den Socket"""
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            with self._pending_cond:
+                self._pending_cond.notify()
+            self._thread.join(timeout=self.timeout + 0.5)
+        self._disconnect()
+
+
+class FleetAggregator:
+    def __init__(self, host='0.0.0.0', port=DEFAULT_PORT, ttl=5.0, top_n=3, tcp=True, batch_delay=0.05):
+        """
+        Empfängt Frames von Agents und bildet Flotten-Frames
+        
+        Args:
+            host: Adresse, auf der gelauscht wird ('0.0.0.0' = alle Interfaces)
+            port: UDP- und TCP-Port (0 = freien Port wählen, siehe address nach start())
+            ttl: Hosts ohne neuen Frame seit ttl Sekunden fallen aus der Flotte
+            top_n: Anzahl der heißesten Hosts im Frame
+            tcp: Zusätzlich zu UDP auf TCP lauschen
+            batch_delay: UDP-Pakete höchstens alle batch_delay Sekunden gesammelt
+                         lesen (0 = jedes Paket sofort)
+        """
+        self.host = host
+        self.port = port
+        self.ttl = ttl
+        self.top_n = top_n
+        self.tcp = tcp
+        self.batch_delay = batch_delay
+        self.address = None
+        
+        self.hosts = {}  # Host-Name -> (zeitpunkt, frame, seq)
+        self.packets = 0
+        self.invalid = 0
+        self.lost = 0
+        self.expired = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+        self._writers = set()  # Offene TCP-Verbindungen (nur im asyncio-Thread)
+    
+    def receive(self, message, now=None):
+        """
+        Verarbeitet eine Nachricht eines Agents
+        
+        Args:
+            message: JSON-Nachricht (bytes oder str)
+            now: Empfangszeitpunkt (default: time.monotonic())
+        
+        Returns:
+            bool: False, falls die Nachricht ungültig war
+        """
+        try:
+            packet = json.loads(message)
+            name = str(packet['host'])
+            data = packet['data']
+            seq = int(packet.get('seq', 0))
+            if not isinstance(data, dict):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            self.invalid += 1
+            return False
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            previous = self.hosts.get(name)
+            if previous is not None and seq > previous[2]:
+                self.lost += seq - previous[2] - 1  # Kleinere seq: Agent neu gestartet
+            self.hosts[name] = (now, data, seq)
+            self.packets += 1
+        return True
+    
+    def snapshot(self, now=None):
+        """
+        Returns:
+            dict: Host-Name -> letzter Frame aller Hosts, die sich innerhalb ttl gemeldet haben
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            expired = [name for name, (seen, _, _) in self.hosts.items() if now - seen > self.ttl]
+            for name in expired:
+                del self.hosts[name]
+            self.expired += len(expired)
+            return {name: data for name, (_, data, _) in self.hosts.items()}
+    
+    def frame(self):
+        """
+        Returns:
+            dict: Flotten-Frame (siehe fleet_frame_fields) oder None ohne aktive Hosts
+        """
+        return fleet_frame_fields(self.snapshot(), self.top_n)
+    
+    def status(self):
+        """
+        Returns:
+            dict: Aktive Hosts, empfangene/ungültige/verlorene Pakete, abgelaufene Hosts, TCP-Verbindungen
+        """
+        with self._lock:
+            hosts = len(self.hosts)
+        return {'hosts': hosts, 'packets': self.packets, 'invalid': self.invalid, 'lost': self.lost,
+                'expired': self.expired, 'connections': self.connections}
+    
+    def start(self):
+        """
+        Startet den Empfangs-Thread und wartet, bis die Sockets gebunden sind
+        
+        Raises:
+            OSError: Port belegt oder Adresse ungültig
+        """
+        self._thread = threading.Thread(target=self._run, name="fleet-aggregator", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+    
+    def _run(self):
+        import asyncio
+        
+        # Selector-Loop auch unter Windows (die Proactor-Loop kennt kein add_reader)
+        loop = asyncio.SelectorEventLoop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            udp, server = loop.run_until_complete(self._listen(asyncio))
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            loop.close()
+            return
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.remove_reader(udp)
+            udp.close()
+            if server is not None:
+                server.close()
+            # Offene TCP-Verbindungen schließen, die Handler enden dann mit EOF
+            for writer in list(self._writers):
+                writer.close()
+            tasks = asyncio.all_tasks(loop)
+            if tasks:
+                loop.run_until_complete(asyncio.wait(tasks, timeout=1.0))
+            loop.close()
+    
+    async def _listen(self, asyncio):
+        family, _, _, _, address = socket.getaddrinfo(self.host, self.port, type=socket.SOCK_DGRAM)[0]
+        udp = socket.socket(family, socket.SOCK_DGRAM)
+        server = None
+        try:
+            udp.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+            udp.bind(address)
+            udp.setblocking(False)
+            port = udp.getsockname()[1]
+            if self.tcp:
+                server = await asyncio.start_server(self._serve_tcp, self.host, port)
+        except OSError:
+            udp.close()
+            raise
+        loop = asyncio.get_running_loop()
+        loop.add_reader(udp, self._drain_udp, loop, udp)
+        self.address = (self.host, port)
+        return udp, server
+    
+    def _drain_udp(self, loop, udp):
+        """Liest alle wartenden Datagramme, danach ruht der Reader batch_delay Sekunden"""
+        while True:
+            try:
+                message = udp.recv(MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break  # Windows: ConnectionResetError nach ICMP "Port unreachable"
+            self.receive(message)
+        if self.batch_delay > 0:
+            loop.remove_reader(udp)
+            loop.call_later(self.batch_delay, loop.add_reader, udp, self._drain_udp, loop, udp)
+    
+    async def _serve_tcp(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.receive(line)
+        except (ConnectionError, ValueError):
+            pass  # Verbindung abgebrochen bzw. Zeile über dem Puffer-Limit
+        finally:
+            self.connections -= 1
+            self._writers.discard(writer)
+            writer.close()
+    
+    def stop(self):
+        """Stoppt den Empfangs-Thread und schließt die Sockets"""
+        if self._loop is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2.0)
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    print("Teste Flotten-Modus...")
+    assert parse_address('tcp://10.0.0.5:9200') == ('tcp', '10.0.0.5', 9200)
+    assert parse_address('rack1') == ('udp', 'rack1', DEFAULT_PORT)
+    assert parse_address(':9300', default_host='0.0.0.0') == ('udp', '0.0.0.0', 9300)
+    print("  ✓ Adressen")
+    
+    aggregator = FleetAggregator('127.0.0.1', 0, ttl=2.0, top_n=3)
+    aggregator.start()
+    _, port = aggregator.address
+    agents = [FleetAgent(f"{'tcp' if i % 10 == 0 else 'udp'}://127.0.0.1:{port}", name=f"node{i:02d}")
+              for i in range(50)]
+    for i, agent in enumerate(agents):
+        assert agent.send({'cpu_temp': 40.0 + i % 7, 'cpu_usage': float(i), 'cpu_fan': 1000 + i,
+                           'gpu_temp': 30.0, 'gpu_usage': 0.0, 'gpu_fan': 0, 'ram_usage': 50.0})
+    agents[3].publish({'cpu_temp': 90.0, 'cpu_usage': 3.0, 'cpu_fan': 2500,
+                       'gpu_temp': 30.0, 'gpu_usage': 0.0, 'gpu_fan': 0, 'ram_usage': 50.0})
+    aggregator.receive(b'kein json')
+    deadline = time.monotonic() + 2.0
+    while aggregator.status()['packets'] < 51 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    
+    frame = aggregator.frame()
+    assert frame['fleet_hosts'] == 50, frame
+    assert frame['fleet_hottest'] == 'node03' and frame['cpu_temp'] == 90.0 and frame['cpu_fan'] == 2500
+    assert frame['cpu_usage'] == round((sum(range(50)) - 3 + 3.0) / 50, 1)
+    assert [top[0] for top in frame['fleet_top']][0] == 'node03' and len(frame['fleet_top']) == 3
+    print(f"  ✓ Flotten-Frame: {frame}")
+    print(f"  ✓ Status: {aggregator.status()}")
+    
+    assert aggregator.snapshot(now=time.monotonic() + 5.0) == {} and aggregator.frame() is None
+    print("  ✓ Hosts ohne Frame fallen nach ttl aus der Flotte")
+    
+    hosts = {'ü' * 60 + str(i): {'cpu_temp': 50.0 + i, 'cpu_usage': 99.9, 'cpu_fan': 9999, 'gpu_temp': 99.9,
+                                 'gpu_usage': 99.9, 'gpu_fan': 9999, 'ram_usage': 99.9} for i in range(20)}
+    frame = fleet_frame_fields(hosts, top_n=50)
+    assert len(json.dumps(frame)) <= DISPLAY_LINE_LIMIT and 1 <= len(frame['fleet_top']) <= FLEET_TOP_MAX
+    assert len(frame['fleet_hottest']) == HOST_NAME_MAX
+    print(f"  ✓ Flotten-Frame mit langen Namen: {len(json.dumps(frame))} Bytes, Top {len(frame['fleet_top'])}")
+    
+    # Unerreichbarer Aggregator: jeder Verbindungsaufbau hängt bis zum Timeout,
+    # aber nur im Sende-Thread
+    class UnreachableAgent(FleetAgent):
+        def _open(self):
+            time.sleep(self.timeout)
+            raise TimeoutError("timed out")
+    
+    unreachable = UnreachableAgent(f"tcp://127.0.0.1:{port}", name='offline', timeout=0.5, retry_interval=0.0)
+    start = time.perf_counter()
+    for _ in range(20):
+        unreachable.publish({'cpu_temp': 50.0})
+        time.sleep(0.01)
+    blocked = time.perf_counter() - start - 20 * 0.01
+    unreachable.close()
+    status = unreachable.status()
+    assert blocked < 0.05 and status['sent'] == 0 and status['errors'] >= 1 and status['dropped'] > 0, (blocked, status)
+    print(f"  ✓ publish() blockiert nicht bei unerreichbarem Aggregator ({blocked * 1000:.1f} ms für 20 Frames, "
+          f"{status['dropped']} überholt)")
+    
+    for agent in agents:
+        agent.close()
+    aggregator.stop()
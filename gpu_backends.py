@@ -0,0 +1,253 @@
+"""
+GPU-Backends für den PC System Monitor
+NVML (nvidia-ml-py) fragt die GPUs direkt im Prozess ab und hält die Handles
+offen - ohne nvidia-smi-Subprozess pro Tick wie bei GPUtil. GPUtil bleibt als
+Fallback, FakeGpuBackend erlaubt Tests ohne GPU.
+"""
+
+import importlib.util
+from collections import namedtuple
+
+# NVML (optional, pip install nvidia-ml-py) und GPUtil (optional, startet
+# nvidia-smi pro Abfrage) werden erst beim Erzeugen des Backends importiert -
+# pynvml allein kostet ca. 20 ms Startzeit, auch wenn kein Treiber da ist
+NVML_AVAILABLE = importlib.util.find_spec('pynvml') is not None
+GPUTIL_AVAILABLE = importlib.util.find_spec('GPUtil') is not None
+pynvml = None
+GPUtil = None
+
+# Messwerte einer GPU; nicht unterstützte Werte sind None
+# temperature in °C, load in %, fan in RPM, fan_percent in %, power in W, memory_* in MB
+GpuInfo = namedtuple('GpuInfo', ['index', 'name', 'temperature', 'load', 'fan', 'fan_percent',
+                                 'power', 'memory_used', 'memory_total'])
+
+# Frame-Schema bei mehreren GPUs:
+#   first  - nur die erste GPU (bisheriges Verhalten, unveränderter Frame)
+#   reduce - gpu_temp = Maximum, gpu_usage = Mittelwert, gpu_fan der heißesten GPU,
+#            dazu gpu_count und gpu_hottest (Index der heißesten GPU)
+#   array  - wie reduce, zusätzlich 'gpus': [[temp, last, lüfter], ...] pro GPU
+GPU_MODES = ('first', 'reduce', 'array')
+
+# Obergrenze für die Geräte-Liste im array-Modus (hält die JSON-Zeile unter
+# LINE_BUFFER_SIZE der Firmware, ca. 20 Bytes pro GPU)
+MAX_GPU_ARRAY = 8
+
+
+class GpuBackend:
+    """Basisklasse: liefert Messwerte aller GPUs"""
+    
+    name = 'none'
+    cost = 'low'  # Kosten einer Abfrage für die Quellen-Registry (sources.COST_PERIODS)
+    
+    def get_gpus(self):
+        """
+        Returns:
+            list: GpuInfo pro GPU (leer, wenn keine GPU gefunden)
+        """
+        return []
+    
+    def close(self):
+        """Gibt Ressourcen des Backends frei"""
+
+
+class NvmlGpuBackend(GpuBackend):
+    """In-Process NVML-Backend, Handles bleiben über alle Ticks offen"""
+    
+    name = 'nvml'
+    
+    def __init__(self):
+        global pynvml
+        import pynvml
+        pynvml.nvmlInit()
+        self.handles = [pynvml.nvmlDeviceGetHandleByIndex(i) for i in range(pynvml.nvmlDeviceGetCount())]
+        self.names = []
+        for handle in self.handles:
+            name = pynvml.nvmlDeviceGetName(handle)
+            self.names.append(name.decode('utf-8', errors='ignore') if isinstance(name, bytes) else name)
+        
+        # Pro Handle merken, welche Abfragen der Treiber nicht unterstützt
+        self._unsupported = [set() for _ in self.handles]
+    
+    def _query(self, index, key, func, *args):
+        if key in self._unsupported[index]:
+            return None
+        try:
+            return func(self.handles[index], *args)
+        except pynvml.NVMLError as e:
+            if getattr(e, 'value', None) in (pynvml.NVML_ERROR_NOT_SUPPORTED,
+                                             pynvml.NVML_ERROR_FUNCTION_NOT_FOUND):
+                self._unsupported[index].add(key)
+            return None
+    
+    def _fan_rpm(self, index):
+        # Erst ab neueren Treibern/nvidia-ml-py verfügbar
+        func = getattr(pynvml, 'nvmlDeviceGetFanSpeedRPM', None)
+        if func is None:
+            return None
+        result = self._query(index, 'fan_rpm', func)
+        if result is None:
+            return None
+        return int(getattr(result, 'speed', result))
+    
+    def get_gpus(self):
+        gpus = []
+        for index in range(len(self.handles)):
+            temperature = self._query(index, 'temperature', pynvml.nvmlDeviceGetTemperature,
+                                      pynvml.NVML_TEMPERATURE_GPU)
+            utilization = self._query(index, 'utilization', pynvml.nvmlDeviceGetUtilizationRates)
+            power = self._query(index, 'power', pynvml.nvmlDeviceGetPowerUsage)
+            memory = self._query(index, 'memory', pynvml.nvmlDeviceGetMemoryInfo)
+            gpus.append(GpuInfo(
+                index=index,
+                name=self.names[index],
+                temperature=float(temperature) if temperature is not None else None,
+                load=float(utilization.gpu) if utilization is not None else None,
+                fan=self._fan_rpm(index),
+                fan_percent=self._query(index, 'fan_percent', pynvml.nvmlDeviceGetFanSpeed),
+                power=power / 1000.0 if power is not None else None,
+                memory_used=memory.used / 2**20 if memory is not None else None,
+                memory_total=memory.total / 2**20 if memory is not None else None,
+            ))
+        return gpus
+    
+    def close(self):
+        try:
+            pynvml.nvmlShutdown()
+        except pynvml.NVMLError:
+            pass
+
+
+class GPUtilGpuBackend(GpuBackend):
+    """GPUtil-Backend (nvidia-smi Subprozess pro Abfrage, kein Lüfter/Power)"""
+    
+    name = 'gputil'
+    cost = 'high'
+    
+    def __init__(self):
+        global GPUtil
+        import GPUtil
+    
+    def get_gpus(self):
+        return [
+            GpuInfo(index=i, name=gpu.name, temperature=gpu.temperature, load=gpu.load * 100,
+                    fan=None, fan_percent=None, power=None,
+                    memory_used=gpu.memoryUsed, memory_total=gpu.memoryTotal)
+            for i, gpu in enumerate(GPUtil.getGPUs())
+        ]
+
+
+class FakeGpuBackend(GpuBackend):
+    """
+    Test-Backend ohne GPU
+    
+    Beispiel:
+        FakeGpuBackend([fake_gpu(0, temperature=65, load=80)])
+        FakeGpuBackend(lambda: [...])  # dynamische Werte pro Abfrage
+    """
+    
+    name = 'fake'
+    
+    def __init__(self, gpus=None):
+        self.gpus = gpus if gpus is not None else [fake_gpu(0)]
+        self.calls = 0
+    
+    def get_gpus(self):
+        self.calls += 1
+        return list(self.gpus() if callable(self.gpus) else self.gpus)
+
+
+def fake_gpu(index, name='Fake GPU', temperature=50.0, load=25.0, fan=1200, fan_percent=30,
+             power=80.0, memory_used=2048.0, memory_total=8192.0):
+    """Erzeugt einen GpuInfo-Eintrag für FakeGpuBackend"""
+    return GpuInfo(index, name, temperature, load, fan, fan_percent, power, memory_used, memory_total)
+
+
+def gpu_frame_fields(gpus, mode='first', max_devices=MAX_GPU_ARRAY):
+    """
+    Bildet die GPU-Felder eines Frames aus allen GPUs
+    
+    Args:
+        gpus: Liste von GpuInfo (ein Abfrage-Durchlauf über alle Geräte)
+        mode: 'first', 'reduce' oder 'array' (siehe GPU_MODES)
+        max_devices: Maximale Anzahl Einträge in 'gpus' (array-Modus)
+    
+    Returns:
+        dict: gpu_temp, gpu_usage, gpu_fan (+ gpu_count, gpu_hottest, gpus je nach Modus)
+    """
+    if not gpus:
+        return {'gpu_temp': 0.0, 'gpu_usage': 0.0, 'gpu_fan': 0}
+    
+    if mode == 'first':
+        gpu = gpus[0]
+        return {
+            'gpu_temp': round(gpu.temperature or 0.0, 1),
+            'gpu_usage': round(gpu.load or 0.0, 1),
+            'gpu_fan': int(gpu.fan or 0),
+        }
+    
+    hottest = max(range(len(gpus)), key=lambda i: gpus[i].temperature or 0.0)
+    loads = [gpu.load for gpu in gpus if gpu.load is not None]
+    fields = {
+        'gpu_temp': round(gpus[hottest].temperature or 0.0, 1),
+        'gpu_usage': round(sum(loads) / len(loads), 1) if loads else 0.0,
+        'gpu_fan': int(gpus[hottest].fan or 0),
+        'gpu_count': len(gpus),
+        'gpu_hottest': hottest,
+    }
+    if mode == 'array':
+        fields['gpus'] = [
+            [round(gpu.temperature or 0.0, 1), round(gpu.load or 0.0, 1), int(gpu.fan or 0)]
+            for gpu in gpus[:max_devices]
+        ]
+    return fields
+
+
+def create_gpu_backend(preferred='auto'):
+    """
+    Wählt ein GPU-Backend
+    
+    Args:
+        preferred: 'auto' (NVML, sonst GPUtil), 'nvml', 'gputil', 'fake' oder 'none'
+    
+    Returns:
+        GpuBackend: Backend (GpuBackend ohne GPUs, wenn nichts verfügbar ist)
+    """
+    if preferred == 'fake':
+        return FakeGpuBackend()
+    if preferred in ('auto', 'nvml') and NVML_AVAILABLE:
+        try:
+            return NvmlGpuBackend()
+        except ImportError:
+            pass  # nvidia-ml-py unvollständig installiert
+        except pynvml.NVMLError:
+            pass  # Kein NVIDIA-Treiber
+    if preferred in ('auto', 'gputil') and GPUTIL_AVAILABLE:
+        try:
+            return GPUtilGpuBackend()
+        except ImportError:
+            pass  # GPUtil braucht distutils (ab Python 3.12 nicht mehr enthalten)
+    return GpuBackend()
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    backend = create_gpu_backend()
+    print(f"GPU-Backend: {backend.name}")
+    gpus = backend.get_gpus()
+    if not gpus:
+        print("  Keine GPU gefunden - verwende Fake-Backend")
+        backend = FakeGpuBackend([fake_gpu(0), fake_gpu(1, temperature=71.5, load=99.0)])
+        gpus = backend.get_gpus()
+    for gpu in gpus:
+        print(f"  [{gpu.index}] {gpu.name}: {gpu.temperature}°C | {gpu.load}% | {gpu.fan} RPM "
+              f"| {gpu.power} W | {gpu.memory_used}/{gpu.memory_total} MB")
+    backend.close()
+    
+    # Frame-Schema für einen Render-Node mit 8 GPUs
+    node = [fake_gpu(i, temperature=60.0 + i, load=10.0 * i, fan=1000 + 100 * i) for i in range(8)]
+    reduced = gpu_frame_fields(node, 'reduce')
+    assert reduced['gpu_temp'] == 67.0 and reduced['gpu_hottest'] == 7 and reduced['gpu_usage'] == 35.0
+    print(f"  ✓ reduce: {reduced}")
+    fields = gpu_frame_fields(node * 2, 'array')
+    assert len(fields['gpus']) == MAX_GPU_ARRAY and fields['gpu_count'] == 16
+    print(f"  ✓ array: {len(fields['gpus'])} von {fields['gpu_count']} GPUs im Frame")
@@ -0,0 +1,352 @@
+"""
+Verlauf der Messwerte auf dem PC
+MetricHistory speichert jeden gesendeten Frame in mehreren Auflösungen
+(default 1 s / 10 s / 1 min) als Mittelwert und Maximum pro Feld. Jede
+Auflösung ist ein Ringpuffer fester Größe aus array-Spalten: Der Speicher
+steht beim Start fest (default rund 450 KB) und wächst nie, ältere Buckets
+werden überschrieben. Buckets ohne Frames (Monitor gestoppt, Display
+getrennt) bleiben als Lücke erkennbar.
+
+Nach jedem (Re-)Connect schickt der Sink daraus die letzten 320 Sekunden in
+einem Schwung an das Display (HIST1, siehe serial_protocol), das Histogramm
+ist so sofort wieder gefüllt. Lokal lässt sich der Verlauf als CSV abfragen
+(--history-csv, Telemetrie-Endpunkt /history.csv).
+
+Beispiel:
+    history = MetricHistory()
+    history.add({'cpu_temp': 45.0, 'cpu_usage': 12.5, ...})
+    history.rows(resolution=10)        # [HistoryRow(time, means, maxima), ...]
+    history.write_csv('verlauf.csv', resolution=60)
+"""
+
+import math
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+# (Sekunden pro Bucket, Anzahl Buckets): 1 Stunde, 6 Stunden, 24 Stunden
+RESOLUTIONS = ((1, 3600), (10, 2160), (60, 1440))
+
+HISTORY_FIELDS = ('cpu_temp', 'cpu_usage', 'cpu_fan', 'gpu_temp', 'gpu_usage', 'gpu_fan', 'ram_usage')
+
+# Felder, deren Maximum aus einem Aggregat-Feld kommt (High-Rate Sampling, --sample-rate)
+PEAK_FIELDS = {'cpu_usage': 'cpu_usage_max'}
+
+# Felder des Display-Backfills (Histogramm: CPU- und GPU-Last, je Mittelwert und Spitze)
+BACKFILL_FIELDS = ('cpu_usage', 'gpu_usage')
+
+# Bucket-Start (Unix-Zeit), Mittelwerte und Maxima pro Feld (None = keine Werte)
+HistoryRow = namedtuple('HistoryRow', ['time', 'means', 'maxima'])
+
+
+class RollupRing:
+    def __init__(self, resolution, capacity, fields):
+        """
+        Ringpuffer einer Auflösung (Slot = Bucket-Nummer modulo capacity)
+        
+        Args:
+            resolution: Sekunden pro Bucket
+            capacity: Anzahl Buckets
+            fields: Feldnamen (Spalten)
+        """
+        self.resolution = resolution
+        self.capacity = capacity
+        self.width = len(fields)
+        
+        self.buckets = array('q', [-1]) * capacity  # Bucket-Nummer pro Slot (-1 = leer)
+        self.means = array('f', [math.nan]) * (capacity * self.width)
+        self.maxima = array('f', [math.nan]) * (capacity * self.width)
+        self.newest = None  # Nummer des letzten abgeschlossenen Buckets
+        
+        self._bucket = None  # Laufender Bucket
+        self._sum = [0.0] * self.width
+        self._count = [0] * self.width
+        self._max = [-math.inf] * self.width
+    
+    def add(self, now, values, peaks):
+        """Verbucht einen Frame (values/peaks: ein Wert oder None pro Feld)"""
+        bucket = int(now // self.resolution)
+        if self._bucket is None:
+            self._bucket = bucket
+        elif bucket > self._bucket:
+            self._flush()
+            self._bucket = bucket
+        # Uhr zurückgestellt (bucket < laufender Bucket): in den laufenden Bucket zählen
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            self._sum[i] += value
+            self._count[i] += 1
+            peak = peaks[i]
+            if peak > self._max[i]:
+                self._max[i] = peak
+    
+    def _flush(self):
+        slot = self._bucket % self.capacity
+        base = slot * self.width
+        self.buckets[slot] = self._bucket
+        for i in range(self.width):
+            count = self._count[i]
+            self.means[base + i] = self._sum[i] / count if count else math.nan
+            self.maxima[base + i] = self._max[i] if count else math.nan
+            self._sum[i] = 0.0
+            self._count[i] = 0
+            self._max[i] = -math.inf
+        self.newest = self._bucket
+    
+    def _partial(self):
+        means = tuple(round(self._sum[i] / self._count[i], 2) if self._count[i] else None for i in range(self.width))
+        maxima = tuple(round(self._max[i], 2) if self._count[i] else None for i in range(self.width))
+        return means, maxima
+    
+    def rows(self, first, last, partial=False):
+        """
+        Buckets first..last (Bucket-Nummern, inklusive), ältester zuerst
+        
+        Args:
+            partial: Den laufenden, noch nicht abgeschlossenen Bucket mitliefern
+        
+        Returns:
+            list: (Bucket-Nummer, means, maxima) pro Bucket; None statt means/maxima
+                  für Buckets ohne Frames
+        """
+        rows = []
+        for bucket in range(first, last + 1):
+            if partial and bucket == self._bucket:
+                rows.append((bucket, *self._partial()))
+                continue
+            slot = bucket % self.capacity
+            if self.buckets[slot] != bucket:
+                rows.append((bucket, None, None))
+                continue
+            base = slot * self.width
+            rows.append((bucket,
+                         tuple(None if math.isnan(v) else round(v, 2) for v in self.means[base:base + self.width]),
+                         tuple(None if math.isnan(v) else round(v, 2) for v in self.maxima[base:base + self.width])))
+        return rows
+    
+    def memory_bytes(self):
+        return (self.buckets.itemsize * len(self.buckets) + self.means.itemsize * len(self.means)
+                + self.maxima.itemsize * len(self.maxima))
+
+
+class MetricHistory:
+    def __init__(self, resolutions=RESOLUTIONS, fields=HISTORY_FIELDS):
+        """
+        Args:
+            resolutions: (Sekunden pro Bucket, Anzahl Buckets) pro Auflösung
+            fields: Gespeicherte Felder
+        """
+        self.fields = tuple(fields)
+        self.rings = {resolution: RollupRing(resolution, capacity, self.fields)
+                      for resolution, capacity in resolutions}
+        self.frames = 0
+        self._lock = threading.Lock()  # add() im Sender, Abfragen aus Sink-Writer/Telemetrie
+    
+    def add(self, data, now=None):
+        """
+        Verbucht einen gesendeten Frame in allen Auflösungen
+        
+        Args:
+            data: dict wie von SystemMonitor.get_system_data
+            now: Unix-Zeit in Sekunden (default: time.time())
+        """
+        if now is None:
+            now = time.time()
+        values = []
+        peaks = []
+        for name in self.fields:
+            value = data.get(name)
+            if not isinstance(value, (int, float)):
+                value = None
+            values.append(value)
+            peak = data.get(PEAK_FIELDS.get(name), value)
+            peaks.append(peak if isinstance(peak, (int, float)) and value is not None else value)
+        with self._lock:
+            for ring in self.rings.values():
+                ring.add(now, values, peaks)
+            self.frames += 1
+    
+    def rows(self, resolution=1, start=None, end=None, partial=False):
+        """
+        Fragt den Verlauf einer Auflösung ab
+        
+        Args:
+            resolution: Sekunden pro Bucket (einer der Schlüssel von self.rings)
+            start: Unix-Zeit, ab der Buckets geliefert werden (default: ältester gespeicherter)
+            end: Unix-Zeit, bis zu der Buckets geliefert werden (default: jetzt)
+            partial: Den laufenden Bucket mit den bisherigen Werten mitliefern
+        
+        Returns:
+            list: HistoryRow pro Bucket, ältester zuerst; means/maxima sind
+                  dicts Feld -> Wert, None für Buckets ohne Frames
+        
+        Raises:
+            KeyError: Unbekannte Auflösung
+        """
+        ring = self.rings[resolution]
+        with self._lock:
+            newest = ring._bucket if partial else ring.newest
+            if newest is None:
+                return []
+            last = newest if end is None else min(newest, int(end // resolution))
+            first = newest - ring.capacity + 1
+            if start is not None:
+                first = max(first, int(start // resolution))
+            raw = ring.rows(first, last, partial)
+        if start is None:
+            # Ohne Startzeit ab dem ältesten Bucket mit Frames
+            skip = 0
+            while skip < len(raw) and raw[skip][1] is None:
+                skip += 1
+            raw = raw[skip:]
+        rows = []
+        for bucket, means, maxima in raw:
+            if means is not None:
+                means = dict(zip(self.fields, means))
+                maxima = dict(zip(self.fields, maxima))
+            rows.append(HistoryRow(bucket * resolution, means, maxima))
+        return rows
+    
+    def recent(self, fields, seconds, now=None):
+        """
+        Letzte Sekunden in 1-s-Auflösung für den Display-Backfill (inkl. der laufenden)
+        
+        Args:
+            fields: Felder, deren Mittelwert und Maximum geliefert werden
+            seconds: Anzahl Sekunden (Einträge)
+            now: Unix-Zeit (default: time.time())
+        
+        Returns:
+            list: Pro Sekunde ein Tupel (mean, max, mean, max, ...) in der Reihenfolge
+                  von fields oder None für Sekunden ohne Frames; ältester zuerst
+        """
+        if now is None:
+            now = time.time()
+        current = int(now)
+        rows = self.rows(1, start=current - seconds, end=current - 1, partial=True)
+        by_time = {row.time: row for row in rows}
+        samples = []
+        for second in range(current - seconds, current):
+            row = by_time.get(second)
+            if row is None or row.means is None:
+                samples.append(None)
+                continue
+            sample = []
+            for name in fields:
+                sample += [row.means[name], row.maxima[name]]
+            samples.append(tuple(sample))
+        return samples
+    
+    def backfill(self, seconds, now=None):
+        """Verlauf für das Display-Histogramm (DisplaySink backfill, serial_protocol HIST1)"""
+        return self.recent(BACKFILL_FIELDS, seconds, now)
+    
+    def write_csv(self, target, resolution=1, start=None, end=None):
+        """
+        Exportiert den Verlauf als CSV (eine Zeile pro Bucket mit Frames, inkl.
+        des laufenden Buckets)
+        
+        Spalten: time (ISO 8601, lokale Zeit), unix, dann <feld>_mean und <feld>_max
+        
+        Args:
+            target: Dateipfad oder Textdatei-Objekt
+            resolution: Sekunden pro Bucket
+            start: Unix-Zeit ab (default: ältester gespeicherter Bucket)
+            end: Unix-Zeit bis (default: jetzt)
+        
+        Returns:
+            int: Anzahl geschriebener Zeilen
+        """
+        rows = [row for row in self.rows(resolution, start, end, partial=True) if row.means is not None]
+        if isinstance(target, str):
+            with open(target, 'w', encoding='utf-8', newline='') as f:
+                return self._write_rows(f, rows)
+        return self._write_rows(target, rows)
+    
+    def _write_rows(self, f, rows):
+        import csv
+        
+        writer = csv.writer(f)
+        writer.writerow(['time', 'unix'] + [f"{name}_{kind}" for name in self.fields for kind in ('mean', 'max')])
+        for row in rows:
+            values = []
+            for name in self.fields:
+                values += [row.means[name], row.maxima[name]]
+            writer.writerow([time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(row.time)), row.time]
+                            + ['' if value is None else value for value in values])
+        return len(rows)
+    
+    def memory_bytes(self):
+        """
+        Returns:
+            int: Feste Größe aller Ringpuffer in Bytes
+        """
+        return sum(ring.memory_bytes() for ring in self.rings.values())
+    
+    def status(self):
+        """
+        Returns:
+            dict: Verbuchte Frames, Speicher und Spanne pro Auflösung in Sekunden
+        """
+        with self._lock:
+            spans = {f"{resolution}s": resolution * ring.capacity for resolution, ring in self.rings.items()}
+            frames = self.frames
+        return {'frames': frames, 'memory_kb': round(self.memory_bytes() / 1024, 1), 'span_s': spans}
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    import io
+    
+    print("Teste Verlauf...")
+    history = MetricHistory()
+    print(f"  Speicher: {history.memory_bytes() / 1024:.0f} KB fest")
+    start = 1_699_999_980.0  # Minutengrenze
+    
+    # 10 Minuten mit 2 Frames pro Sekunde, dann 30 s Lücke, dann 1 Minute
+    for tick in range(1200):
+        now = start + tick * 0.5
+        history.add({'cpu_temp': 40.0 + (tick % 20), 'cpu_usage': 10.0, 'cpu_usage_max': 35.0,
+                     'cpu_fan': 1200, 'gpu_temp': 50.0, 'gpu_usage': 20.0, 'gpu_fan': 900, 'ram_usage': 40.0},
+                    now=now)
+    for tick in range(120):
+        history.add({'cpu_temp': 70.0, 'cpu_usage': 90.0, 'cpu_fan': 2000, 'gpu_temp': 60.0,
+                     'gpu_usage': 80.0, 'gpu_fan': 1500, 'ram_usage': 50.0}, now=start + 630 + tick * 0.5)
+    now = start + 690
+    
+    minutes = history.rows(60, end=now)
+    assert len(minutes) == 11 and minutes[0].time == start, minutes[0]
+    assert minutes[0].means['cpu_temp'] == 49.5 and minutes[0].maxima['cpu_temp'] == 59.0
+    assert minutes[0].maxima['cpu_usage'] == 35.0  # Maximum aus cpu_usage_max
+    print(f"  ✓ 1 min: {len(minutes)} Buckets, erster: Mittel {minutes[0].means['cpu_temp']} °C, "
+          f"max {minutes[0].maxima['cpu_temp']} °C")
+    
+    seconds = history.rows(1, start=start + 595, end=start + 635)
+    gaps = [row.time - start for row in seconds if row.means is None]
+    assert gaps == list(range(600, 630)), gaps
+    print(f"  ✓ 1 s: Lücke {gaps[0]:.0f}-{gaps[-1]:.0f} s erkannt")
+    
+    recent = history.recent(('cpu_usage', 'gpu_usage'), 320, now=now)
+    assert len(recent) == 320 and recent[-1] == (90.0, 90.0, 80.0, 80.0) and recent[-61] is None
+    print(f"  ✓ Backfill: {sum(1 for s in recent if s)} von {len(recent)} Sekunden mit Werten")
+    
+    buffer = io.StringIO()
+    lines = history.write_csv(buffer, resolution=10)
+    header = buffer.getvalue().splitlines()[0]
+    assert lines == 66 and header.startswith('time,unix,cpu_temp_mean,cpu_temp_max'), (lines, header)
+    print(f"  ✓ CSV (10 s): {lines} Zeilen, {header[:60]}...")
+    
+    # Ring läuft über: Speicher bleibt, älteste Buckets fallen heraus
+    for tick in range(5000):
+        history.add({'cpu_temp': 45.0}, now=start + 1000 + tick)
+    rows = history.rows(1)
+    assert len(rows) == 3600 and rows[0].time == start + 2399 and rows[-1].time == start + 5998
+    print(f"  ✓ Überlauf: 1 s hält die letzten {len(rows)} Buckets, {history.status()}")
+    
+    ticks = 20000
+    begin = time.perf_counter()
+    for tick in range(ticks):
+        history.add({'cpu_temp': 45.0, 'cpu_usage': 10.0, 'gpu_temp': 50.0}, now=start + 10000 + tick * 0.1)
+    print(f"  ✓ add(): {(time.perf_counter() - begin) / ticks * 1e6:.1f} µs pro Frame")
@@ -0,0 +1,239 @@
+"""
+Linux hwmon-Backend (sysfs) für Temperaturen und Lüfter
+psutil.sensors_temperatures()/sensors_fans() durchsuchen bei jedem Aufruf alle
+Dateien unter /sys/class/hwmon und öffnen sie neu. HwmonSensors sucht die
+Sensor-Dateien einmal beim Start, hält sie offen und liest pro Abfrage nur die
+benötigten Werte mit os.pread (sysfs liefert bei Offset 0 immer den aktuellen
+Wert) - pro Tick zwei kleine Lesezugriffe für CPU-Temperatur und -Lüfter.
+
+Beispiel:
+    sensors = open_hwmon()
+    if sensors:
+        sensors.cpu_temp()       # 45.0
+        sensors.temperatures()   # [SensorReading('coretemp', 'Package id 0', 45.0), ...]
+        sensors.close()
+"""
+
+import os
+import re
+from collections import namedtuple
+
+HWMON_ROOT = '/sys/class/hwmon'
+
+# pread gibt es nur unter Unix
+HWMON_AVAILABLE = hasattr(os, 'pread')
+
+# CPU-Sensoren nach Priorität (Teilstring des Chip-Namens): Intel, AMD, ARM-SoCs
+CPU_CHIPS = ('coretemp', 'k10temp', 'zenpower', 'cpu')
+
+# Bevorzugte Labels für die CPU-Temperatur (sonst erster Kanal des Chips)
+CPU_LABELS = ('Package id 0', 'Tctl', 'Tdie')
+
+# Sensor-Datei eines Kanals, z.B. temp1_input oder fan2_input
+_INPUT_FILE = re.compile(r'^(temp|fan)(\d+)_input$')
+
+# kind = 'temp' oder 'fan', fd = offener Datei-Deskriptor der *_input-Datei
+HwmonChannel = namedtuple('HwmonChannel', ['kind', 'chip', 'label', 'path', 'fd'])
+
+# Messwert eines Kanals: value in °C bzw. RPM
+SensorReading = namedtuple('SensorReading', ['chip', 'label', 'value'])
+
+
+def _natural_key(name):
+    """Sortiert hwmon2 vor hwmon10 und temp2 vor temp10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def _read_text(path):
+    try:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class HwmonSensors:
+    def __init__(self, root=HWMON_ROOT):
+        """
+        Sucht alle Temperatur- und Lüfter-Kanäle und öffnet deren Dateien
+        
+        Args:
+            root: sysfs-Verzeichnis mit hwmon*-Einträgen (Tests: Fake-Baum)
+        """
+        self.root = root
+        self.channels = []
+        
+        try:
+            devices = sorted(os.listdir(root), key=_natural_key)
+        except OSError:
+            devices = []
+        for device in devices:
+            self._discover(os.path.join(root, device))
+        
+        self.cpu_temp_channel = self._find_cpu_temp()
+        fans = [channel for channel in self.channels if channel.kind == 'fan']
+        cpu_fans = [channel for channel in fans if 'cpu' in channel.label.lower()]
+        self.cpu_fan_channel = (cpu_fans or fans or [None])[0]
+    
+    def _discover(self, device):
+        chip = _read_text(os.path.join(device, 'name'))
+        if chip is None:
+            return
+        # Ältere Treiber legen die Dateien unter device/ ab
+        for directory in (device, os.path.join(device, 'device')):
+            try:
+                files = sorted(os.listdir(directory), key=_natural_key)
+            except OSError:
+                continue
+            for filename in files:
+                match = _INPUT_FILE.match(filename)
+                if not match:
+                    continue
+                kind, number = match.groups()
+                label = _read_text(os.path.join(directory, f"{kind}{number}_label")) or f"{kind}{number}"
+                path = os.path.join(directory, filename)
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except OSError:
+                    continue  # Keine Leserechte
+                self.channels.append(HwmonChannel(kind, chip, label, path, fd))
+    
+    def _find_cpu_temp(self):
+        temps = [channel for channel in self.channels if channel.kind == 'temp']
+        for name in CPU_CHIPS:
+            candidates = [channel for channel in temps if name in channel.chip.lower()]
+            if candidates:
+                preferred = [channel for channel in candidates if channel.label in CPU_LABELS]
+                return (preferred or candidates)[0]
+        return None
+    
+    def _read(self, channel):
+        """
+        Returns:
+            int: Rohwert (Milligrad bzw. RPM) oder None, falls der Sensor gerade nichts liefert
+        """
+        try:
+            return int(os.pread(channel.fd, 32, 0))
+        except (OSError, ValueError):
+            return None  # ENODATA/EIO bei abgeschalteten Sensoren, ENODEV bei entferntem Gerät
+    
+    def _value(self, channel):
+        raw = self._read(channel)
+        if raw is None:
+            return None
+        return raw / 1000.0 if channel.kind == 'temp' else raw
+    
+    def cpu_temp(self):
+        """
+        Returns:
+            float: CPU-Temperatur in °C oder None (kein CPU-Sensor)
+        """
+        if self.cpu_temp_channel is None:
+            return None
+        return self._value(self.cpu_temp_channel)
+    
+    def cpu_fan(self):
+        """
+        Returns:
+            int: Drehzahl des CPU-Lüfters (bzw. des ersten Lüfters) in RPM oder None
+        """
+        if self.cpu_fan_channel is None:
+            return None
+        return self._value(self.cpu_fan_channel)
+    
+    def temperatures(self):
+        """
+        Returns:
+            list: SensorReading pro Temperatur-Kanal (°C, None = kein Wert)
+        """
+        return [SensorReading(channel.chip, channel.label, self._value(channel))
+                for channel in self.channels if channel.kind == 'temp']
+    
+    def fans(self):
+        """
+        Returns:
+            list: SensorReading pro Lüfter-Kanal (RPM, None = kein Wert)
+        """
+        return [SensorReading(channel.chip, channel.label, self._value(channel))
+                for channel in self.channels if channel.kind == 'fan']
+    
+    def close(self):
+        """Schließt alle Sensor-Dateien"""
+        for channel in self.channels:
+            try:
+                os.close(channel.fd)
+            except OSError:
+                pass
+        self.channels = []
+
+
+def open_hwmon(root=HWMON_ROOT):
+    """
+    Öffnet das hwmon-Backend, falls das System Sensoren anbietet
+    
+    Returns:
+        HwmonSensors oder None (kein Linux bzw. keine Kanäle gefunden)
+    """
+    if not HWMON_AVAILABLE or not os.path.isdir(root):
+        return None
+    sensors = HwmonSensors(root)
+    if not sensors.channels:
+        return None
+    return sensors
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    import tempfile
+    import time
+    
+    def write(path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    
+    sensors = open_hwmon()
+    if sensors:
+        print(f"hwmon: {len(sensors.channels)} Kanäle unter {HWMON_ROOT}")
+        for reading in sensors.temperatures():
+            print(f"  {reading.chip} / {reading.label}: {reading.value} °C")
+        for reading in sensors.fans():
+            print(f"  {reading.chip} / {reading.label}: {reading.value} RPM")
+        sensors.close()
+    else:
+        print(f"hwmon: keine Sensoren unter {HWMON_ROOT}")
+    
+    print("\nTeste mit Fake-sysfs...")
+    root = tempfile.mkdtemp()
+    write(os.path.join(root, 'hwmon0', 'name'), 'acpitz')
+    write(os.path.join(root, 'hwmon0', 'temp1_input'), '27800')
+    write(os.path.join(root, 'hwmon2', 'name'), 'coretemp')
+    write(os.path.join(root, 'hwmon2', 'temp1_input'), '52000')
+    write(os.path.join(root, 'hwmon2', 'temp1_label'), 'Package id 0')
+    write(os.path.join(root, 'hwmon2', 'temp2_input'), '49000')
+    write(os.path.join(root, 'hwmon2', 'temp2_label'), 'Core 0')
+    write(os.path.join(root, 'hwmon10', 'name'), 'nct6798')
+    write(os.path.join(root, 'hwmon10', 'device', 'fan1_input'), '0')
+    write(os.path.join(root, 'hwmon10', 'device', 'fan2_input'), '1250')
+    write(os.path.join(root, 'hwmon10', 'device', 'fan2_label'), 'CPU Fan')
+    
+    sensors = open_hwmon(root)
+    assert [c.chip for c in sensors.channels] == ['acpitz', 'coretemp', 'coretemp', 'nct6798', 'nct6798']
+    assert sensors.cpu_temp() == 52.0 and sensors.cpu_fan() == 1250
+    print(f"  ✓ {len(sensors.channels)} Kanäle, CPU {sensors.cpu_temp()} °C / {sensors.cpu_fan()} RPM")
+    print(f"  ✓ Temperaturen: {sensors.temperatures()}")
+    
+    # Neuer Wert über den offenen Deskriptor (sysfs erzeugt ihn beim Lesen, im Fake-Baum in-place)
+    with open(os.path.join(root, 'hwmon2', 'temp1_input'), 'r+', encoding='utf-8') as f:
+        f.write('61500\n')
+    assert sensors.cpu_temp() == 61.5
+    print(f"  ✓ Aktualisierter Wert über offenen Deskriptor: {sensors.cpu_temp()} °C")
+    
+    ticks = 10000
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sensors.cpu_temp()
+        sensors.cpu_fan()
+    per_tick = (time.perf_counter() - start) / ticks
+    print(f"  ✓ CPU-Temperatur + Lüfter: {per_tick * 1e6:.1f} µs pro Tick (2 x pread)")
+    sensors.close()
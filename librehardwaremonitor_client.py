@@ -2,29 +2,310 @@
 LibreHardwareMonitor Integration für vollständige Sensor-Daten
 Benötigt LibreHardwareMonitor als Admin gestartet mit aktiviertem Remote Server
 Download: https://github.com/LibreHardwareMonitor/LibreHardwareMonitor/releases
+Welche Sensoren in den Frame gehen, legt eine SensorMap fest (sensor_map.py,
+eigene Zuordnung mit --lhm-map).
 """
 
 import requests
 import json
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+from gpu_backends import GpuInfo
+from sensor_map import SensorMap
+
+# Einheiten, die LibreHardwareMonitor an die Werte anhängt
+VALUE_UNITS = ('°C', '%', 'RPM')
+
+# Höchstens so viele Bytes pro Lesevorgang des Bodys (vor jedem wird die Restzeit neu gesetzt)
+BODY_CHUNK = 4096
+
+
+def parse_sensor_value(value_str):
+    """
+    Wandelt einen LHM-Wert wie '45.0 °C' in float um
+    
+    Returns:
+        float: Sensor-Wert oder None
+    """
+    # Übliche Form '45.0 °C' (auch W, MHz, V, ...): Zahl vor dem Leerzeichen
+    number = value_str.strip().partition(' ')[0]
+    try:
+        return float(number)
+    except ValueError:
+        pass
+    for unit in VALUE_UNITS:
+        value_str = value_str.replace(unit, '')
+    try:
+        return float(value_str.strip())
+    except ValueError:
+        return None
+
+
+def flatten_sensor_tree(data):
+    """
+    Flacht den LHM-Baum in Suchreihenfolge ab
+    Jeder Knoten mit Kindern gilt als Hardware, seine direkten Kinder als
+    Sensor-Gruppen und deren Kinder als Sensoren.
+    
+    Args:
+        data: JSON-Daten von LibreHardwareMonitor
+    
+    Returns:
+        tuple: (layout, nodes, owners) - layout ist ein Tupel aus
+               (hardware, gruppe, sensor)-Texten, nodes die zugehörigen Sensor-Knoten,
+               owners die laufende Nummer des Hardware-Knotens pro Eintrag
+               (unterscheidet baugleiche GPUs mit gleichem Namen)
+    """
+    layout = []
+    nodes = []
+    owners = []
+    hardware_count = 0
+    stack = list(reversed(data.get('Children', [])))
+    
+    while stack:
+        item = stack.pop()
+        children = item.get('Children')
+        if not children:
+            continue
+        hardware = item.get('Text', '')
+        for sensor_group in children:
+            group = sensor_group.get('Text', '')
+            for sensor in sensor_group.get('Children', ()):
+                layout.append((hardware, group, sensor.get('Text', '')))
+                nodes.append(sensor)
+                owners.append(hardware_count)
+        hardware_count += 1
+        stack.extend(reversed(children))
+    
+    return tuple(layout), nodes, owners
+
+
+def node_routes(data, targets):
+    """
+    Ermittelt die Kind-Indizes von der Wurzel bis zu bestimmten Knoten
+    
+    Args:
+        data: JSON-Daten von LibreHardwareMonitor
+        targets: Gesuchte Knoten (Objekte aus demselben Baum)
+    
+    Returns:
+        dict: id(Knoten) -> Tupel der Kind-Indizes
+    """
+    wanted = {id(node) for node in targets}
+    routes = {}
+    stack = [(data, ())]
+    while stack and len(routes) < len(wanted):
+        item, route = stack.pop()
+        for i, child in enumerate(item.get('Children', ())):
+            if id(child) in wanted:
+                routes[id(child)] = route + (i,)
+            stack.append((child, route + (i,)))
+    return routes
+
 
 class LibreHardwareMonitorClient:
-    def __init__(self, host='localhost', port=8085):
+    def __init__(self, host='localhost', port=8085, timeout=0.5,
+                 failure_threshold=3, backoff_base=1.0, backoff_max=30.0, sensor_map=None,
+                 layout_check_interval=10.0):
+        """
+        Args:
+            host: Host des LHM Remote Web Servers
+            port: Port des LHM Remote Web Servers
+            timeout: Latenz-Budget pro Abfrage in Sekunden (Verbindung + Antwort)
+            failure_threshold: Fehler in Folge, nach denen der Circuit Breaker öffnet
+            backoff_base: Erste Wartezeit bei offenem Circuit Breaker (Sekunden)
+            backoff_max: Maximale Wartezeit bei offenem Circuit Breaker (Sekunden)
+            sensor_map: SensorMap - Zuordnung Frame-Feld -> Sensoren (default: eingebaute)
+            layout_check_interval: Abstand in Sekunden, in dem der ganze Baum neu
+                                   indiziert wird (neue Sensoren); dazwischen werden
+                                   nur die zugeordneten Sensoren direkt gelesen
+        """
         self.base_url = f"http://{host}:{port}/data.json"
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.sensor_map = sensor_map or SensorMap()
+        self.layout_check_interval = layout_check_interval
         
+        # Persistente Keep-Alive Verbindung statt neuer TCP-Verbindung pro Tick
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=0)
+        self.session.mount('http://', adapter)
+        
+        # Conditional Fetch (ETag / Last-Modified, falls vom Server geliefert)
+        self._etag = None
+        self._last_modified = None
+        self._last_data = None
+        
+        # Circuit Breaker
+        self.consecutive_failures = 0
+        self._retry_at = 0.0
+        
+        # Sensor-Index (wird nur bei Layout-Änderung neu aufgebaut)
+        self._layout = None
+        self._index = {}
+        self._lowered = []
+        self._lookup_cache = {}
+        self._nodes = []
+        self._owners = []
+        self._gpu_plan = None
+        self._plan = None
+        self._plan_routes = None  # Position -> (Route, Texte) der Plan-Kandidaten und GPU-Sensoren
+        self._direct = (None, None)  # (Daten, Position -> Knoten) des letzten direkten Lesens
+        self._next_layout_check = 0.0
+        self._indexed_data = None
+        self._frame_data = None  # Daten des letzten get_system_data (auch ohne Neu-Indizierung)
+    
+    @property
+    def circuit_open(self):
+        """True, solange nach wiederholten Fehlern keine Abfragen gesendet werden"""
+        return self.consecutive_failures >= self.failure_threshold and time.monotonic() < self._retry_at
+    
+    def _record_failure(self):
+        """Zählt einen Fehler und öffnet ggf. den Circuit Breaker (exponentielles Backoff)"""
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            exponent = self.consecutive_failures - self.failure_threshold
+            delay = min(self.backoff_max, self.backoff_base * (2 ** min(exponent, 16)))
+            self._retry_at = time.monotonic() + delay
+    
+    def _record_success(self):
+        self.consecutive_failures = 0
+        self._retry_at = 0.0
+    
     def get_sensor_data(self):
         """
         Holt alle Sensor-Daten von LibreHardwareMonitor
+        Überspringt Abfragen, solange der Circuit Breaker offen ist. Das
+        Latenz-Budget (self.timeout) begrenzt den Verbindungsaufbau und jede
+        Leseoperation bis zu den Headern; den Body liest die Abfrage in kleinen
+        Stücken und setzt vor jedem Stück das Socket-Timeout auf die Restzeit -
+        ab den Headern endet die Abfrage also spätestens mit dem Budget, auch
+        wenn der Server tröpfelt.
         
         Returns:
             dict: Sensor-Daten oder None bei Fehler
         """
-        try:
-            response = requests.get(self.base_url, timeout=2)
-            if response.status_code == 200:
-                return response.json()
+        if self.circuit_open:
             return None
-        except:
+        
+        headers = {}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+        if self._last_modified:
+            headers['If-Modified-Since'] = self._last_modified
+        
+        deadline = time.monotonic() + self.timeout
+        try:
+            with self.session.get(self.base_url, headers=headers, stream=True,
+                                  timeout=(self.timeout, self.timeout)) as response:
+                if response.status_code == 304 and self._last_data is not None:
+                    self._record_success()
+                    return self._last_data
+                if response.status_code != 200:
+                    self._record_failure()
+                    return None
+                
+                chunks = self._read_body(response, deadline)
+                if chunks is None:
+                    self._record_failure()
+                    return None
+                
+                data = json.loads(b''.join(chunks))
+                self._etag = response.headers.get('ETag')
+                self._last_modified = response.headers.get('Last-Modified')
+        except (requests.RequestException, Urllib3Error, OSError, ValueError):
+            self._record_failure()
             return None
+        
+        self._last_data = data
+        self._record_success()
+        return data
+    
+    @staticmethod
+    def _read_body(response, deadline):
+        """
+        Liest den Body bis zur Deadline (schützt vor tröpfelnden Antworten)
+        read1 kehrt nach dem ersten Empfang zurück, statt auf BODY_CHUNK Bytes
+        zu warten; das Socket-Timeout ist pro Empfang die verbleibende Zeit.
+        
+        Returns:
+            list: Body-Stücke oder None, falls die Deadline überschritten ist
+        
+        Raises:
+            urllib3.exceptions.HTTPError, OSError: Timeout oder Verbindungsfehler
+        """
+        raw = response.raw
+        connection = getattr(raw, 'connection', None)
+        sock = getattr(connection, 'sock', None)
+        read = getattr(raw, 'read1', None) or raw.read
+        chunks = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if sock is not None:
+                sock.settimeout(remaining)
+            chunk = read(BODY_CHUNK, decode_content=True)
+            if not chunk:
+                return chunks
+            chunks.append(chunk)
+    
+    def close(self):
+        """Schließt die HTTP-Session"""
+        self.session.close()
+    
+    def _update_index(self, data):
+        """
+        Flacht den Sensor-Baum in einem einzigen Durchlauf ab
+        Der Index wird nur neu aufgebaut, wenn sich das Hardware/Sensor-Layout
+        geändert hat - sonst werden nur die Sensor-Knoten aktualisiert.
+        
+        Args:
+            data: JSON-Daten von LibreHardwareMonitor
+        """
+        layout, nodes, owners = flatten_sensor_tree(data)
+        if layout != self._layout:
+            self._layout = layout
+            self._index = {}
+            self._lowered = []
+            for position, (hardware, group, sensor) in enumerate(layout):
+                key = (hardware.lower(), group.lower(), sensor.lower())
+                self._lowered.append(key)
+                self._index.setdefault(key, position)
+            self._lookup_cache = {}
+            self._owners = owners
+            self._gpu_plan = None
+            self._plan = None
+        self._nodes = nodes
+        self._reset_routes()
+        self._indexed_data = data
+        self._next_layout_check = time.monotonic() + self.layout_check_interval
+    
+    def _resolve(self, hardware_type, sensor_type, name_contains):
+        """
+        Löst eine Sensor-Anfrage gegen den Index auf (gecacht pro Layout)
+        
+        Returns:
+            int: Position im Index oder None
+        """
+        query = (hardware_type.lower(), sensor_type.lower(), name_contains.lower())
+        if query in self._lookup_cache:
+            return self._lookup_cache[query]
+        
+        position = self._index.get(query)
+        if position is None:
+            hardware_q, group_q, name_q = query
+            for i, (hardware, group, sensor) in enumerate(self._lowered):
+                if group == group_q and hardware_q in hardware and name_q in sensor:
+                    position = i
+                    break
+        
+        self._lookup_cache[query] = position
+        return position
     
     def find_sensor(self, data, hardware_type, sensor_type, name_contains):
         """
@@ -35,44 +316,178 @@ class LibreHardwareMonitorClient:
             hardware_type: z.B. 'CPU', 'GpuNvidia'
             sensor_type: z.B. 'Temperature', 'Load', 'Fan'
             name_contains: Teil des Sensor-Namens
-            
+        
         Returns:
             float: Sensor-Wert oder None
         """
         if not data or 'Children' not in data:
             return None
         
-        def search_children(items):
-            for item in items:
-                # Prüfe Hardware-Typ
-                if 'Text' in item and hardware_type.lower() in item.get('Text', '').lower():
-                    # Durchsuche Sensoren
-                    if 'Children' in item:
-                        for sensor_group in item['Children']:
-                            if sensor_group.get('Text', '').lower() == sensor_type.lower():
-                                if 'Children' in sensor_group:
-                                    for sensor in sensor_group['Children']:
-                                        if name_contains.lower() in sensor.get('Text', '').lower():
-                                            value_str = sensor.get('Value', '0')
-                                            # Entferne Einheiten (°C, %, RPM, etc.)
-                                            value_str = value_str.replace('°C', '').replace('%', '').replace('RPM', '').strip()
-                                            try:
-                                                return float(value_str)
-                                            except:
-                                                return None
-                
-                # Rekursiv durchsuchen
-                if 'Children' in item:
-                    result = search_children(item['Children'])
-                    if result is not None:
-                        return result
+        if data is not self._indexed_data:
+            self._update_index(data)
+        
+        position = self._resolve(hardware_type, sensor_type, name_contains)
+        if position is None:
             return None
+        return parse_sensor_value(self._nodes[position].get('Value', '0'))
+    
+    def _build_gpu_plan(self):
+        """
+        Ermittelt alle GPUs im Layout (Hardware-Knoten mit 'GPU Core'-Sensor)
+        
+        Returns:
+            list: Pro GPU ein dict Messwert -> Position im Index
+        """
+        gpus = {}
+        for position, (hardware, group, sensor) in enumerate(self._lowered):
+            if group == 'temperatures' and sensor == 'gpu core':
+                key = 'temperature'
+            elif group == 'load' and sensor == 'gpu core':
+                key = 'load'
+            elif group == 'fans' and 'gpu fan' in sensor:
+                key = 'fan'
+            else:
+                continue
+            plan = gpus.setdefault(self._owners[position], {'name': self._layout[position][0]})
+            plan.setdefault(key, position)
+        
+        # Nur Knoten mit Temperatur oder Last sind GPUs (nicht z.B. reine Lüfter-Controller)
+        return [plan for _, plan in sorted(gpus.items()) if 'temperature' in plan or 'load' in plan]
+    
+    def get_gpus(self, data=None):
+        """
+        Liest alle GPUs (NVIDIA, AMD, ...) aus einem Durchlauf des Sensor-Baums
         
-        return search_children(data['Children'])
+        Args:
+            data: JSON-Daten von LibreHardwareMonitor (default: Daten des letzten
+                  get_system_data)
+        
+        Returns:
+            list: GpuInfo pro GPU in Baum-Reihenfolge (leer ohne Daten)
+        """
+        if data is None:
+            data = self._frame_data or self._indexed_data
+        if not data or 'Children' not in data:
+            return []
+        
+        # Wie get_system_data: zwischen den Layout-Prüfungen nur die GPU-Sensoren lesen
+        nodes = None
+        if data is not self._indexed_data:
+            if self._gpu_plan is not None and time.monotonic() < self._next_layout_check:
+                nodes = self._direct_nodes(data)
+            if nodes is None:
+                self._update_index(data)
+        if self._gpu_plan is None:
+            self._gpu_plan = self._build_gpu_plan()
+            self._reset_routes()  # Routen auch für die GPU-Sensoren
+        if nodes is None:
+            nodes = self._nodes
+        
+        def value(plan, key):
+            position = plan.get(key)
+            if position is None:
+                return None
+            return parse_sensor_value(nodes[position].get('Value', '0'))
+        
+        gpus = []
+        for index, plan in enumerate(self._gpu_plan):
+            fan = value(plan, 'fan')
+            gpus.append(GpuInfo(
+                index=index,
+                name=plan['name'],
+                temperature=value(plan, 'temperature'),
+                load=value(plan, 'load'),
+                fan=int(fan) if fan is not None else None,
+                fan_percent=None,
+                power=None,
+                memory_used=None,
+                memory_total=None,
+            ))
+        return gpus
+    
+    def sensor_plan(self, data=None):
+        """
+        Zuordnung der Frame-Felder zu Sensoren für das aktuelle Layout
+        (einmal pro Layout aus self.sensor_map kompiliert)
+        
+        Args:
+            data: JSON-Daten von LibreHardwareMonitor (default: zuletzt indizierte Daten)
+        
+        Returns:
+            tuple: PlanEntry pro Feld (leer ohne Daten)
+        """
+        if data is None:
+            data = self._indexed_data
+        if not data or 'Children' not in data:
+            return ()
+        if data is not self._indexed_data:
+            self._update_index(data)
+        if self._plan is None:
+            ids = [node.get('SensorId') for node in self._nodes]
+            self._plan = self.sensor_map.compile(self._lowered, ids)
+            self._reset_routes()
+        return self._plan
+    
+    def _reset_routes(self):
+        """Verwirft Routen und direkt gelesene Knoten (neuer Index oder neuer Plan)"""
+        self._plan_routes = None
+        self._direct = (None, None)
+    
+    def _route_positions(self):
+        """Positionen, die direkt gelesen werden: Plan-Kandidaten und GPU-Sensoren"""
+        positions = set()
+        for entry in self._plan or ():
+            positions.update(position for position, _, _ in entry.candidates)
+        for plan in self._gpu_plan or ():
+            positions.update(position for key, position in plan.items() if key != 'name')
+        return positions
+    
+    def _direct_nodes(self, data):
+        """
+        Liest die Sensor-Knoten der Plan-Kandidaten und GPU-Sensoren direkt über
+        ihre Route im Baum (einmal pro Antwort, get_gpus nutzt das Ergebnis mit)
+        
+        Returns:
+            dict: Position -> Sensor-Knoten oder None, falls das Layout an einer
+                  Route nicht mehr stimmt (dann wird neu indiziert)
+        """
+        if self._direct[0] is data:
+            return self._direct[1]
+        if self._plan_routes is None:
+            positions = self._route_positions()
+            routes = node_routes(self._indexed_data, [self._nodes[position] for position in positions])
+            self._plan_routes = {position: (routes[id(self._nodes[position])], self._layout[position])
+                                 for position in positions}
+        nodes = {}
+        for position, (route, (hardware_text, group_text, sensor_text)) in self._plan_routes.items():
+            try:
+                hardware = data
+                for i in route[:-2]:
+                    hardware = hardware['Children'][i]
+                group = hardware['Children'][route[-2]]
+                sensor = group['Children'][route[-1]]
+            except (KeyError, IndexError, TypeError):
+                return None
+            if (sensor.get('Text', '') != sensor_text or group.get('Text', '') != group_text
+                    or hardware.get('Text', '') != hardware_text):
+                return None
+            nodes[position] = sensor
+        self._direct = (data, nodes)
+        return nodes
+    
+    def resolved_sensors(self):
+        """
+        Returns:
+            dict: Feld -> Pfad der Sensor-Kandidaten ('Hardware/Gruppe/Sensor') in
+                  Prioritätsreihenfolge, laut zuletzt kompiliertem Plan
+        """
+        return {entry.field: ['/'.join(self._layout[position]) for position, _, _ in entry.candidates]
+                for entry in self.sensor_plan()}
     
     def get_system_data(self):
         """
         Sammelt alle relevanten System-Daten
+        Liest pro Feld den ersten Sensor-Kandidaten mit gültigem Wert (siehe sensor_map).
         
         Returns:
             dict: System-Daten oder None bei Fehler
@@ -81,46 +496,124 @@ class LibreHardwareMonitorClient:
         if not data:
             return None
         
-        # CPU-Daten
-        cpu_temp = self.find_sensor(data, 'Intel', 'Temperatures', 'Core Average') or \
-                   self.find_sensor(data, 'Intel', 'Temperatures', 'CPU Package') or \
-                   self.find_sensor(data, 'Intel', 'Temperatures', 'Core Max') or \
-                   self.find_sensor(data, 'AMD', 'Temperatures', 'Core (Tctl/Tdie)') or 0.0
-        
-        cpu_usage = self.find_sensor(data, 'Intel', 'Load', 'CPU Total') or \
-                    self.find_sensor(data, 'AMD', 'Load', 'CPU Total') or 0.0
+        self._frame_data = data
         
-        # CPU-Lüfter (falls vorhanden, sonst 0)
-        cpu_fan = self.find_sensor(data, 'HP', 'Fans', 'Fan') or \
-                  self.find_sensor(data, 'Mainboard', 'Fans', 'Fan #1') or \
-                  self.find_sensor(data, 'Mainboard', 'Fans', 'CPU Fan') or 0
+        # Zwischen den Layout-Prüfungen nur die zugeordneten Sensoren lesen
+        nodes = None
+        if (self._plan is not None and data is not self._indexed_data
+                and time.monotonic() < self._next_layout_check):
+            nodes = self._direct_nodes(data)
+        if nodes is None:
+            plan = self.sensor_plan(data)  # Indiziert neu, kompiliert nur bei Layout-Änderung
+            nodes = self._nodes
+        else:
+            plan = self._plan
         
-        # GPU-Daten (NVIDIA)
-        gpu_temp = self.find_sensor(data, 'NVIDIA', 'Temperatures', 'GPU Core') or \
-                   self.find_sensor(data, 'AMD', 'Temperatures', 'GPU Core') or 0.0
+        frame = {}
+        for field, candidates, default, digits in plan:
+            value = None
+            for position, scale, offset in candidates:
+                value = parse_sensor_value(nodes[position].get('Value', ''))
+                if value is not None:
+                    value = value * scale + offset
+                    break
+            if value is None:
+                if default is None:
+                    continue  # Eigenes Feld ohne Sensor: nicht im Frame
+                value = default
+            frame[field] = int(value) if digits == 0 else round(value, digits)
+        return frame or None
+
+
+# Test-Funktion
+def _stub_server_checks(budget=0.3):
+    """
+    Prüft Latenz-Budget und Circuit Breaker gegen einen lokalen Stub-Server
+    (langsam, hängend, tröpfelnd, wechselnd erreichbar)
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    tree = json.dumps({'Text': 'Sensor', 'Children': []}).encode()
+    state = {'mode': 'ok', 'requests': 0}
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
         
-        gpu_usage = self.find_sensor(data, 'NVIDIA', 'Load', 'GPU Core') or \
-                    self.find_sensor(data, 'AMD', 'Load', 'GPU Core') or 0.0
+        def log_message(self, *args):
+            pass
         
-        gpu_fan = self.find_sensor(data, 'NVIDIA', 'Fans', 'GPU Fan') or \
-                  self.find_sensor(data, 'AMD', 'Fans', 'GPU Fan') or 0
+        def do_GET(self):
+            state['requests'] += 1
+            mode = state['mode']
+            if mode == 'flapping':
+                mode = 'error' if state['requests'] % 2 else 'ok'
+            if mode in ('slow', 'hung'):
+                time.sleep(2.0 if mode == 'slow' else 30.0)
+            if mode == 'error':
+                self.send_response(500)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(tree)))
+            self.end_headers()
+            if mode == 'trickle':
+                try:
+                    for i in range(len(tree)):
+                        self.wfile.write(tree[i:i + 1])
+                        self.wfile.flush()
+                        time.sleep(0.1)
+                except OSError:
+                    pass  # Client hat nach Ablauf des Budgets aufgelegt
+            else:
+                self.wfile.write(tree)
+    
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    limit = budget + 0.2  # Budget plus Spielraum für Thread-Wechsel
+    
+    try:
+        for mode in ('ok', 'slow', 'hung', 'trickle'):
+            state['mode'] = mode
+            client = LibreHardwareMonitorClient(host='127.0.0.1', port=port, timeout=budget)
+            start = time.monotonic()
+            data = client.get_sensor_data()
+            elapsed = time.monotonic() - start
+            assert (data is not None) == (mode == 'ok'), (mode, data)
+            assert elapsed < limit, f"{mode}: {elapsed:.2f} s bei {budget} s Budget"
+            client.close()
+            print(f"  ✓ {mode:<8} {'Daten' if data else 'abgebrochen'} nach {elapsed * 1000:.0f} ms "
+                  f"(Budget {budget * 1000:.0f} ms)")
         
-        # RAM
-        ram_usage = self.find_sensor(data, 'Memory', 'Load', 'Memory') or 0.0
+        # Wechselnd erreichbar: jeder Erfolg schließt den Breaker wieder
+        state.update(mode='flapping', requests=0)
+        client = LibreHardwareMonitorClient(host='127.0.0.1', port=port, timeout=budget)
+        results = [client.get_sensor_data() is not None for _ in range(6)]
+        assert results == [False, True] * 3 and not client.circuit_open, results
+        print(f"  ✓ flapping {results.count(True)}/6 Abfragen erfolgreich, Circuit Breaker bleibt zu")
         
-        return {
-            'cpu_temp': round(cpu_temp, 1),
-            'cpu_usage': round(cpu_usage, 1),
-            'cpu_fan': int(cpu_fan),
-            'gpu_temp': round(gpu_temp, 1),
-            'gpu_usage': round(gpu_usage, 1),
-            'gpu_fan': int(gpu_fan),
-            'ram_usage': round(ram_usage, 1)
-        }
+        # Dauerhaft gestört: Breaker öffnet, weitere Abfragen erreichen den Server nicht
+        state.update(mode='error', requests=0)
+        for _ in range(client.failure_threshold + 5):
+            client.get_sensor_data()
+        assert client.circuit_open and state['requests'] == client.failure_threshold, state
+        print(f"  ✓ error    Circuit Breaker offen nach {state['requests']} Fehlern, "
+              f"weitere Abfragen ohne Request")
+        client.close()
+    finally:
+        server.shutdown()
+        server.server_close()
 
 
-# Test-Funktion
 if __name__ == '__main__':
+    print("Teste Latenz-Budget gegen Stub-Server...")
+    _stub_server_checks()
+    print()
+    
     client = LibreHardwareMonitorClient()
     print("Teste LibreHardwareMonitor-Verbindung...")
     print("(LibreHardwareMonitor muss als Admin laufen mit 'Remote Web Server' aktiviert)")
@@ -132,6 +625,9 @@ if __name__ == '__main__':
         print(f"CPU: {data['cpu_temp']}°C | {data['cpu_usage']}% | {data['cpu_fan']} RPM")
         print(f"GPU: {data['gpu_temp']}°C | {data['gpu_usage']}% | {data['gpu_fan']} RPM")
         print(f"RAM: {data['ram_usage']}%")
+        print()
+        for field, paths in client.resolved_sensors().items():
+            print(f"  {field:<10} ← {paths[0] if paths else '(kein Sensor, 0)'}")
     else:
         print("✗ Keine Verbindung zu LibreHardwareMonitor")
         print("  1. LibreHardwareMonitor als Administrator starten")
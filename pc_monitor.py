@@ -3,73 +3,254 @@ PC System Monitor für ESP32 USB Display
 Sendet CPU/GPU Temperaturen, Lüftergeschwindigkeiten und Auslastung über Serial
 """
 
-import serial
+import importlib.util
 import json
 import time
-import psutil
 import os
 import sys
+import threading
+from collections import namedtuple
+from operator import methodcaller
 
-# LibreHardwareMonitor Support (optional)
-try:
-    from librehardwaremonitor_client import LibreHardwareMonitorClient
-    LHM_AVAILABLE = True
-except ImportError:
-    LHM_AVAILABLE = False
+# Schwere Module (psutil, requests, pyserial, concurrent.futures, pynvml, fleet) werden
+# erst dort importiert, wo sie gebraucht werden - --help und --list starten so
+# ohne sie, GPU-Backend und LibreHardwareMonitor laden im Hintergrund
+from gpu_backends import GPU_MODES, GpuBackend, create_gpu_backend, gpu_frame_fields
+from history import RESOLUTIONS, MetricHistory
+from hwmon import open_hwmon
+from pipeline import Pipeline
+from profiler import Profiler
+from recording import TraceReplay, TraceWriter
+from sampling import CpuLoadSampler, SamplingEngine
+from scheduler import AdaptiveRate
+from serial_protocol import parse_epsilon
+from sources import (MetricSource, load_plugin, register_source, registered_sources, source_cost, source_period,
+                     source_ttl)
+from telemetry import Telemetry
+
+# LibreHardwareMonitor Support (optional, der Client braucht requests)
+LHM_AVAILABLE = importlib.util.find_spec('requests') is not None
+
+# Ergebnis einer Port-Identifikation (latency in Sekunden)
+ProbeResult = namedtuple('ProbeResult', ['port', 'verified', 'latency', 'detail', 'cancelled'])
 
-# GPU und erweiterte Sensor-Unterstützung
-try:
-    import GPUtil
-    GPU_AVAILABLE = True
-except ImportError:
-    GPU_AVAILABLE = False
-    print("Info: GPUtil nicht installiert. GPU-Daten eingeschränkt.")
-    print("      Installiere mit: pip install gputil")
 
 class SystemMonitor:
-    def __init__(self, port=None, baudrate=115200):
+    def __init__(self, port=None, baudrate=115200, lhm_timeout=0.5, protocol='json',
+                 delta=False, delta_epsilon=None, keyframe_interval=30, sample_rate=0,
+                 per_core=False, gpu_backend='auto', gpu_mode='first', sinks=None, no_reset=False,
+                 ack=False, collect=True, agent=None, lhm_map=None):
         """
         Initialisiert System-Monitor
         
         Args:
             port: COM-Port des ESP32 (z.B. 'COM3') oder None für Auto-Detection
             baudrate: Baudrate (Standard: 115200)
+            lhm_timeout: Latenz-Budget pro LibreHardwareMonitor-Abfrage in Sekunden
+            protocol: 'json' oder 'binary' (binär nur, wenn das Display es anbietet)
+            delta: Nur geänderte Felder senden (nur, wenn das Display es anbietet)
+            delta_epsilon: Schwellwert pro Feld (dict) oder None für Standardwerte
+            keyframe_interval: Im Delta-Modus alle N Ticks einen vollständigen Frame senden
+            sample_rate: Interne Sample-Rate der CPU-Last in Hz (0 = aus); jeder Frame
+                         enthält dann min/max/mean seit dem letzten Frame
+            per_core: CPU-Last pro Kern als 'cpu_cores' im Frame mitsenden
+            gpu_backend: 'auto', 'nvml', 'gputil', 'fake' oder 'none'
+            gpu_mode: Frame-Schema bei mehreren GPUs: 'first', 'reduce' oder 'array'
+            sinks: Weitere Displays als Liste von dicts (siehe parse_sink_spec); ohne
+                   port wird dann nur an diese Displays gesendet
+            no_reset: ESP32-Reset (DTR/RTS) beim Öffnen vermeiden - das Display
+                      läuft weiter und antwortet sofort auf IDENTIFY
+            ack: Flow Control - nur senden, wenn das Display den letzten Frame
+                 bestätigt hat (nur, wenn das Display es anbietet)
+            collect: False = keine Datenquellen initialisieren (Wiedergabe, Aggregator)
+            agent: FleetAgent - jeden Frame zusätzlich an einen Aggregator senden;
+                   ohne port und sinks dann ohne lokales Display
+            lhm_map: SensorMap - eigene Zuordnung Frame-Feld -> LHM-Sensoren
+                     (None = eingebaute, siehe sensor_map)
         """
         self.port = port
         self.baudrate = baudrate
-        self.ser = None
+        self.protocol = protocol
+        self.delta = delta
+        self.delta_epsilon = delta_epsilon
+        self.keyframe_interval = keyframe_interval
+        self.sample_rate = sample_rate
+        self.sampler = None
+        self.per_core = per_core
+        self.gpu_mode = gpu_mode
+        self.no_reset = no_reset
+        self.ack = ack
+        self.sink_specs = list(sinks or [])
+        self.sinks = []
+        self.auto_detected = False
+        self.pipeline = None
+        self.scheduler = None
+        self.sources = []            # Aktive Datenquellen der Pipeline (MetricSource)
+        self.source_interval = 1.0   # Sende-Intervall, auf das sich Perioden/TTLs beziehen
+        self._source_fields = {}     # Quelle -> zuletzt gelieferte Felder (für defer_to)
+        self.agent = agent
+        self.fleet = None            # FleetAggregator im Aggregator-Modus (siehe run)
+        self.history = MetricHistory()  # Verlauf aller gesendeten Frames (Backfill, CSV-Export)
+        
+        # GPU-Backend (NVML in-process, sonst GPUtil) und LibreHardwareMonitor
+        # werden parallel zum Verbinden im Hintergrund initialisiert. Bis dahin
+        # gehen die Frames mit psutil-Werten bzw. ohne GPU-Daten raus.
+        self.gpu_backend = GpuBackend()
         self.lhm_client = None
+        self._init_threads = {}
+        self._init_lock = threading.Lock()  # Schützt Backends, _closed und die Meldungen
+        self._closed = False                 # run() hat die Backends geschlossen
+        self._status_active = False          # Statusanzeige wird gerade neu gezeichnet
+        self._notices = []                   # Meldungen der Init-Threads für die Statusanzeige
+        if collect and gpu_backend != 'none':
+            self._init_in_background('gpu', self._init_gpu, gpu_backend)
+        if collect and LHM_AVAILABLE:
+            self._init_in_background('lhm', self._init_lhm, lhm_timeout, lhm_map)
         
-        # LibreHardwareMonitor initialisieren falls verfügbar
-        if LHM_AVAILABLE:
-            self.lhm_client = LibreHardwareMonitorClient()
-            test_data = self.lhm_client.get_system_data()
-            if test_data:
-                print("✓ LibreHardwareMonitor verbunden (vollständige Sensor-Daten)")
-            else:
-                print("ℹ LibreHardwareMonitor nicht verfügbar (psutil-Fallback)")
-                self.lhm_client = None
+        # Linux: hwmon-Sensordateien einmal öffnen statt psutil-Scan pro Tick
+        self.hwmon = open_hwmon() if collect else None
         
-        # Auto-Detection wenn kein Port angegeben
-        if self.port is None or self.port.lower() == 'auto':
-            self.port = self.auto_detect_port()
+        # Nicht-blockierende CPU-Last (je Thread ein eigener Sampler)
+        self.cpu_sampler = CpuLoadSampler()
+        self.core_sampler = CpuLoadSampler() if per_core else None
+        
+        # Auto-Detection wenn kein Port angegeben (und keine weiteren Displays, kein Agent)
+        no_display = self.port is None and not self.sink_specs and agent is None
+        if no_display or (self.port and self.port.lower() == 'auto'):
+            self.port = self.auto_detect_port(self.baudrate, self.no_reset)
+            self.auto_detected = True
             if self.port is None:
                 print("\nKein ESP32 gefunden!")
                 print("Verfügbare Ports:")
                 self.list_ports()
                 sys.exit(1)
         
-        self.connect()
+        if self.port or self.sink_specs:
+            self.connect()
+    
+    def _init_in_background(self, name, target, *args):
+        thread = threading.Thread(target=target, args=args, name=f"init-{name}", daemon=True)
+        self._init_threads[name] = thread
+        thread.start()
+    
+    def _notice(self, message):
+        """
+        Gibt eine Meldung eines Init-Threads aus
+        Während run() die Statusanzeige neu zeichnet, wird sie vorgemerkt und
+        beim nächsten Neuzeichnen oberhalb der Statuszeilen ausgegeben.
+        """
+        with self._init_lock:
+            if self._status_active:
+                self._notices.append(message)
+            else:
+                print(message)
+    
+    def _take_notices(self):
+        """Holt die vorgemerkten Meldungen der Init-Threads"""
+        with self._init_lock:
+            notices, self._notices = self._notices, []
+        return notices
+    
+    def _publish_backend(self, attribute, backend):
+        """
+        Übernimmt ein im Hintergrund erzeugtes Backend
+        Hat run() die Backends schon geschlossen, wird es stattdessen sofort
+        geschlossen - sonst bliebe es offen.
+        
+        Returns:
+            bool: True, falls das Backend übernommen wurde
+        """
+        with self._init_lock:
+            if not self._closed:
+                setattr(self, attribute, backend)
+                return True
+        backend.close()
+        return False
+    
+    def _init_gpu(self, preferred):
+        """Erzeugt das GPU-Backend (Import von pynvml und nvmlInit)"""
+        backend = create_gpu_backend(preferred)
+        if self._publish_backend('gpu_backend', backend) and backend.name == 'none':
+            self._notice("Info: Kein GPU-Backend verfügbar. GPU-Daten eingeschränkt.\n"
+                         "      Installiere mit: pip install nvidia-ml-py")
+    
+    def _init_lhm(self, timeout, sensor_map=None):
+        """Importiert den LHM-Client (requests) und prüft, ob LibreHardwareMonitor antwortet"""
+        try:
+            from librehardwaremonitor_client import LibreHardwareMonitorClient
+        except ImportError:
+            return
+        client = LibreHardwareMonitorClient(timeout=timeout, sensor_map=sensor_map)
+        if client.get_system_data():
+            if self._publish_backend('lhm_client', client):
+                self._notice("✓ LibreHardwareMonitor verbunden (vollständige Sensor-Daten)")
+        else:
+            client.close()
+            if not self._closed:
+                self._notice("ℹ LibreHardwareMonitor nicht verfügbar (psutil-Fallback)")
+    
+    def wait_sources(self, timeout=None):
+        """
+        Wartet, bis GPU-Backend und LibreHardwareMonitor initialisiert sind
+        
+        Args:
+            timeout: Maximale Wartezeit in Sekunden (None = unbegrenzt)
+        
+        Returns:
+            bool: True, falls alle Datenquellen bereit sind
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._init_threads.values():
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in self._init_threads.values())
     
     @staticmethod
-    def auto_detect_port():
+    def auto_detect_port(baudrate=115200, no_reset=False):
         """
         Automatische Erkennung des ESP32-Ports
         Sucht nach bekannten USB-Serial-Chips (CH340, CP2102, CP2104, FTDI, etc.)
         
+        Args:
+            baudrate: Baudrate für die Identifikation
+            no_reset: ESP32-Reset (DTR/RTS) beim Öffnen vermeiden
+        
         Returns:
             str: Erkannter Port oder None
         """
+        candidates = SystemMonitor.find_display_candidates()
+        
+        if candidates:
+            # IMMER Identifikation via Magic-Request versuchen
+            print(f"\n🔍 {len(candidates)} mögliche ESP32-Geräte gefunden:")
+            for i, (port, desc, _) in enumerate(candidates, 1):
+                print(f"  {i}. {port} - {desc}")
+            print("\n→ Versuche Identifikation via Magic-Request...")
+            
+            verified_port = SystemMonitor.verify_usb_display(candidates, baudrate, no_reset=no_reset)
+            if verified_port:
+                return verified_port
+            
+            # Fallback: Verwende ersten Kandidaten
+            print("⚠ Keine eindeutige Identifikation möglich.")
+            print(f"  Verwende ersten Kandidaten: {candidates[0][0]}")
+            print(f"  Falls falsch, starte mit: python pc_monitor.py --port COMx")
+            
+            detected_port = candidates[0][0]
+            print(f"✓ ESP32 automatisch erkannt: {detected_port}")
+            print(f"  → {candidates[0][1]}")
+            
+            return detected_port
+        
+        return None
+    
+    @staticmethod
+    def find_display_candidates():
+        """
+        Sucht Ports mit bekannten USB-Serial-Chips (CH340, CP2102, CP2104, FTDI, etc.)
+        
+        Returns:
+            list: (port, description, priority) Tupel, höchste Priorität zuerst
+        """
         import serial.tools.list_ports
         
         # Bekannte ESP32 USB-Serial-Chip-IDs und Namen
@@ -115,104 +296,184 @@ class SystemMonitor:
                         candidates.append((port.device, port.description, 50))
                         break
         
-        if candidates:
-            # Sortiere nach Priorität (höchste zuerst)
-            candidates.sort(key=lambda x: x[2], reverse=True)
-            
-            # IMMER Identifikation via Magic-Request versuchen
-            print(f"\n🔍 {len(candidates)} mögliche ESP32-Geräte gefunden:")
-            for i, (port, desc, _) in enumerate(candidates, 1):
-                print(f"  {i}. {port} - {desc}")
-            print("\n→ Versuche Identifikation via Magic-Request...")
-            
-            verified_port = SystemMonitor.verify_usb_display(candidates)
-            if verified_port:
-                return verified_port
-            
-            # Fallback: Verwende ersten Kandidaten
-            print("⚠ Keine eindeutige Identifikation möglich.")
-            print(f"  Verwende ersten Kandidaten: {candidates[0][0]}")
-            print(f"  Falls falsch, starte mit: python pc_monitor.py --port COMx")
-            
-            detected_port = candidates[0][0]
-            print(f"✓ ESP32 automatisch erkannt: {detected_port}")
-            print(f"  → {candidates[0][1]}")
-            
-            return detected_port
+        # Sortiere nach Priorität (höchste zuerst)
+        candidates.sort(key=lambda x: x[2], reverse=True)
+        return candidates
+    
+    def rediscover_display(self, sink):
+        """
+        Sucht das automatisch erkannte Display nach dem Abziehen erneut
+        Läuft still im Writer-Thread des Sinks: nur ein per IDENTIFY
+        verifizierter Port zählt (kein Fallback auf den ersten Kandidaten), und
+        die Ports der anderen Sinks werden weder geöffnet noch zurückgesetzt.
         
-        return None
+        Args:
+            sink: DisplaySink, dessen Display gesucht wird
         
+        Returns:
+            str: Verifizierter Port oder None
+        """
+        owned = {other.port for other in self.sinks if other is not sink}
+        candidates = [candidate for candidate in self.find_display_candidates() if candidate[0] not in owned]
+        return self.verify_usb_display(candidates, self.baudrate, timeout=sink.ready_timeout,
+                                       no_reset=self.no_reset, quiet=True)
+    
     def connect(self):
-        """Verbindet mit ESP32 über Serial"""
-        try:
-            self.ser = serial.Serial(self.port, self.baudrate, timeout=1)
-            print(f"✓ Verbunden mit {self.port} @ {self.baudrate} baud")
-            time.sleep(2)  # ESP32 Reset nach Serial-Verbindung
-        except serial.SerialException as e:
-            print(f"✗ Fehler beim Verbinden mit {self.port}: {e}")
+        """
+        Verbindet mit allen Displays über Serial (parallel, jeweils bis zur IDENTIFY-Antwort)
+        Nicht erreichbare Displays werden im Hintergrund mit Backoff erneut
+        verbunden, sobald run() läuft (Hot-Plug).
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from display_sink import DisplaySink
+        
+        options = dict(baudrate=self.baudrate, protocol=self.protocol, delta=self.delta,
+                       delta_epsilon=self.delta_epsilon, keyframe_interval=self.keyframe_interval,
+                       no_reset=self.no_reset, ack=self.ack, backfill=self.history.backfill)
+        sinks = []
+        if self.port:
+            # Automatisch erkannte Displays dürfen nach dem Abziehen an neuem Port auftauchen
+            primary = DisplaySink(self.port, **options)
+            if self.auto_detected:
+                primary.rediscover = lambda: self.rediscover_display(primary)
+            sinks.append(primary)
+        for spec in self.sink_specs:
+            sinks.append(DisplaySink(**{**options, **spec}))
+        
+        def connect_sink(sink):
+            try:
+                return sink, sink.connect(), None
+            except Exception as e:  # SerialException, OSError, termios.error
+                return sink, [], e
+        
+        with ThreadPoolExecutor(max_workers=len(sinks)) as pool:
+            results = list(pool.map(connect_sink, sinks))
+        
+        failed = False
+        for sink, messages, error in results:
+            self.sinks.append(sink)
+            if error is not None:
+                failed = True
+                print(f"✗ Fehler beim Verbinden mit {sink.port}: {error}")
+                print("  → Versuche es im Hintergrund erneut")
+                continue
+            ready_ms = sink.ready_stats.snapshot()['last_ms']
+            print(f"✓ Verbunden mit {sink.port} @ {sink.baudrate} baud (bereit nach {ready_ms:.0f} ms)")
+            for message in messages:
+                print(f"  {message}" if len(sinks) > 1 else message)
+        
+        if failed:
             print("\nVerfügbare Ports:")
             self.list_ports()
-            sys.exit(1)
     
     @staticmethod
-    def verify_usb_display(candidates):
+    def verify_usb_display(candidates, baudrate=115200, timeout=3.0, results=None, no_reset=False, quiet=False):
         """
         Verifiziert USB Display über Magic-Request
-        Sendet Identifikations-Anfrage und wartet auf korrekte Antwort
+        Alle Kandidaten werden parallel geprüft. Der erste Port mit korrekter
+        Antwort gewinnt, alle anderen Proben werden abgebrochen.
         
         Args:
             candidates: Liste von (port, description, priority) Tupeln
-            
+            baudrate: Baudrate für die Identifikation
+            timeout: Maximale Wartezeit auf die Antwort pro Port inkl. Boot-Zeit (Sekunden)
+            results: Optionale Liste, die mit ProbeResult-Einträgen gefüllt wird
+            no_reset: ESP32-Reset (DTR/RTS) beim Öffnen vermeiden
+            quiet: Keine Ausgabe (Suche im Hintergrund während der Statusanzeige)
+        
         Returns:
             str: Verifizierter Port oder None
         """
-        MAGIC_REQUEST = "IDENTIFY\n"
-        MAGIC_RESPONSE = "USB_DISPLAY"
-        TIMEOUT = 3.0
+        if not candidates:
+            return None
+        log = (lambda *args, **kwargs: None) if quiet else print
         
-        for port_device, port_desc, _ in candidates:
-            print(f"  Teste {port_device}...", end=" ")
-            try:
-                # Verbinde mit Port
-                ser = serial.Serial(port_device, 115200, timeout=1)
-                time.sleep(1.0)  # ESP32 Boot-Zeit nach Serial-Connect (erhöht)
-                
-                # Leere Buffer
-                ser.reset_input_buffer()
-                ser.reset_output_buffer()
-                
-                # Sende Magic-Request
-                ser.write(MAGIC_REQUEST.encode('utf-8'))
-                ser.flush()
-                
-                # Warte auf Antwort
-                start_time = time.time()
-                response_buffer = ""
-                
-                while time.time() - start_time < TIMEOUT:
-                    if ser.in_waiting > 0:
-                        chunk = ser.read(ser.in_waiting).decode('utf-8', errors='ignore')
-                        response_buffer += chunk
-                        
-                        # Prüfe ob Magic-Response enthalten
-                        if MAGIC_RESPONSE in response_buffer:
-                            ser.close()
-                            print(f"✓ USB_DISPLAY gefunden!")
-                            print(f"  ✓ USB Display identifiziert: {port_device}")
-                            print(f"    → {port_desc}")
-                            return port_device
-                    
-                    time.sleep(0.05)
-                
-                # Timeout - keine korrekte Antwort
-                ser.close()
-                print(f"✗ Keine Antwort (empfangen: {repr(response_buffer[:50])})")
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        cancel_event = threading.Event()
+        descriptions = {port_device: port_desc for port_device, port_desc, _ in candidates}
+        verified_port = None
+        
+        for port_device, _, _ in candidates:
+            log(f"  Teste {port_device}...")
+        
+        with ThreadPoolExecutor(max_workers=len(candidates)) as pool:
+            futures = [
+                pool.submit(SystemMonitor._probe_port, port_device, baudrate, timeout, cancel_event, no_reset)
+                for port_device, _, _ in candidates
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if results is not None:
+                    results.append(result)
                 
-            except (serial.SerialException, Exception) as e:
-                # Port nicht verfügbar oder Fehler - weiter zum nächsten
-                print(f"✗ Fehler ({str(e)[:30]})")
+                latency_ms = result.latency * 1000
+                if result.verified and verified_port is None:
+                    verified_port = result.port
+                    # Restliche Proben abbrechen
+                    cancel_event.set()
+                    log(f"  ✓ {result.port}: USB_DISPLAY gefunden ({latency_ms:.0f} ms)")
+                elif result.verified:
+                    # Weiteres Display, das vor dem Abbruch geantwortet hat
+                    log(f"  ✓ {result.port}: USB_DISPLAY gefunden, nicht gewählt ({latency_ms:.0f} ms)")
+                elif result.cancelled:
+                    log(f"  - {result.port}: abgebrochen ({latency_ms:.0f} ms)")
+                else:
+                    log(f"  ✗ {result.port}: {result.detail} ({latency_ms:.0f} ms)")
         
-        return None
+        if verified_port:
+            log(f"  ✓ USB Display identifiziert: {verified_port}")
+            log(f"    → {descriptions[verified_port]}")
+        return verified_port
+    
+    @staticmethod
+    def _probe_port(port_device, baudrate, timeout, cancel_event, no_reset=False):
+        """
+        Prüft einen einzelnen Port via Magic-Request
+        IDENTIFY wird in kurzen Abständen wiederholt, bis das Board nach dem
+        Reset antwortet - keine feste Boot-Wartezeit.
+        
+        Args:
+            port_device: Port-Name (z.B. 'COM3' oder '/dev/pts/4')
+            baudrate: Baudrate
+            timeout: Maximale Wartezeit auf die Antwort inkl. Boot-Zeit (Sekunden)
+            cancel_event: threading.Event zum vorzeitigen Abbruch
+            no_reset: ESP32-Reset (DTR/RTS) beim Öffnen vermeiden
+        
+        Returns:
+            ProbeResult: Ergebnis inkl. Latenz
+        """
+        from display_sink import IDENTIFY_RESPONSE, open_serial, wait_ready
+        
+        start_time = time.monotonic()
+        
+        def result(verified, detail, cancelled=False):
+            return ProbeResult(port_device, verified, time.monotonic() - start_time, detail, cancelled)
+        
+        ser = None
+        try:
+            # Verbinde mit Port
+            ser = open_serial(port_device, baudrate, no_reset=no_reset, timeout=0)
+            
+            # Magic-Request wiederholen, bis das Board antwortet
+            response = wait_ready(ser, timeout, cancel_event=cancel_event)
+            if response is not None:
+                return result(True, response)
+            if cancel_event.is_set():
+                return result(False, "abgebrochen", cancelled=True)
+            
+            # Timeout - keine korrekte Antwort
+            return result(False, f"Keine {IDENTIFY_RESPONSE}-Antwort")
+        
+        except Exception as e:
+            # Port nicht verfügbar oder Fehler
+            return result(False, f"Fehler ({str(e)[:30]})")
+        finally:
+            if ser is not None:
+                try:
+                    ser.close()
+                except Exception:
+                    pass
     
     @staticmethod
     def list_ports():
@@ -230,8 +491,14 @@ class SystemMonitor:
     def get_cpu_temp(self):
         """
         Liest CPU-Temperatur
-        Nutzt psutil falls verfügbar, sonst Dummy-Wert
+        Nutzt hwmon (Linux) bzw. psutil falls verfügbar, sonst Dummy-Wert
         """
+        if self.hwmon:
+            temp = self.hwmon.cpu_temp()
+            return temp if temp is not None else 0.0
+        
+        import psutil
+        
         try:
             # Windows: Temperaturen oft nur über WMI/LibreHardwareMonitor verfügbar
             temps = psutil.sensors_temperatures()
@@ -248,8 +515,14 @@ class SystemMonitor:
     def get_cpu_fan_speed(self):
         """
         Liest CPU-Lüftergeschwindigkeit
-        Benötigt erweiterte Tools wie OpenHardwareMonitor
+        Benötigt erweiterte Tools wie OpenHardwareMonitor (Linux: hwmon)
         """
+        if self.hwmon:
+            rpm = self.hwmon.cpu_fan()
+            return rpm if rpm is not None else 0
+        
+        import psutil
+        
         try:
             fans = psutil.sensors_fans()
             if fans:
@@ -262,109 +535,425 @@ class SystemMonitor:
     
     def get_gpu_info(self):
         """
-        Liest GPU-Informationen (Temperatur, Auslastung, Lüfter)
+        Liest GPU-Informationen (Temperatur, Auslastung, Lüfter) der ersten GPU
         """
-        if not GPU_AVAILABLE:
-            return 0.0, 0.0, 0
-        
         try:
-            gpus = GPUtil.getGPUs()
+            gpus = self.gpu_backend.get_gpus()
             if gpus:
                 gpu = gpus[0]  # Erste GPU
-                return gpu.temperature, gpu.load * 100, 0  # Fan-Speed nicht von GPUtil unterstützt
+                return gpu.temperature or 0.0, gpu.load or 0.0, gpu.fan or 0
             return 0.0, 0.0, 0
         except:
             return 0.0, 0.0, 0
     
     def get_system_data(self):
         """
-        Sammelt alle System-Daten
+        Sammelt alle System-Daten einmalig (ohne Pipeline und Cache)
+        Quellen, deren defer_to-Quelle (LibreHardwareMonitor) geliefert hat,
+        werden übersprungen.
         
         Returns:
             dict: System-Daten im JSON-Format
         """
-        # Versuche zuerst LibreHardwareMonitor
-        if self.lhm_client:
-            lhm_data = self.lhm_client.get_system_data()
-            if lhm_data:
-                return lhm_data
-        
-        # Fallback: psutil
-        # CPU-Daten
-        cpu_temp = self.get_cpu_temp()
-        cpu_usage = psutil.cpu_percent(interval=0.1)
-        cpu_fan = self.get_cpu_fan_speed()
+        data = {}
+        delivered = {}
+        for source in self.enabled_sources():
+            primary = delivered.get(source.defer_to)
+            if self._deferred(source, primary):
+                continue
+            try:
+                value = self._collect_source(source)
+            except Exception:
+                value = None
+            if value:
+                delivered[source.name] = value
+                data.update(self._missing_fields(value, primary))
+        return data
+    
+    def _collect_source(self, source):
+        """Fragt eine Quelle ab und merkt sich ihre Felder (siehe _deferred)"""
+        value = source.collect(self)
+        if value:
+            self._source_fields[source.name] = frozenset(value)
+        return value
+    
+    def _deferred(self, source, primary):
+        """
+        True, solange die defer_to-Quelle alle Felder dieser Quelle liefert
+        Eine eigene Zuordnung (--lhm-map) oder ein LHM ohne Lüfter-Sensoren lässt
+        Felder aus; die Quelle liefert dann weiter, aber nur die fehlenden Felder.
+        Felder noch unbekannt: einmal abfragen.
         
-        # GPU-Daten
-        gpu_temp, gpu_usage, gpu_fan = self.get_gpu_info()
+        Args:
+            source: MetricSource mit defer_to
+            primary: Gültiger Wert der defer_to-Quelle oder None
+        """
+        fields = self._source_fields.get(source.name)
+        return primary is not None and fields is not None and fields.issubset(primary)
+    
+    @staticmethod
+    def _missing_fields(value, primary):
+        """Felder aus value, die die defer_to-Quelle nicht liefert (vorhandene gewinnen)"""
+        if primary is None:
+            return value
+        return {key: field for key, field in value.items() if key not in primary}
+    
+    def enabled_sources(self):
+        """
+        Returns:
+            list: Registrierte Datenquellen (MetricSource), die auf diesem System laufen
+        """
+        return [source for source in registered_sources() if source.enabled is None or source.enabled(self)]
+    
+    def source_settings(self):
+        """
+        Returns:
+            dict: Kosten, Periode und TTL (Sekunden) pro aktiver Datenquelle
+        """
+        return {
+            source.name: {
+                'cost': source_cost(source, self),
+                'period_s': round(source_period(source, self.source_interval, self), 3),
+                'ttl_s': round(source_ttl(source, self.source_interval, self), 3),
+            }
+            for source in self.sources
+        }
+    
+    def lhm_enabled(self):
+        """True, solange LibreHardwareMonitor verbunden ist oder die Probe noch läuft"""
+        probe = self._init_threads.get('lhm')
+        return self.lhm_client is not None or (probe is not None and probe.is_alive())
+    
+    def collect_lhm(self):
+        """
+        Sammelt alle Daten über LibreHardwareMonitor
+        Außer im 'first'-Modus werden die GPU-Felder aus allen GPUs desselben
+        Sensor-Baums gebildet.
+        """
+        client = self.lhm_client
+        if client is None:
+            return None  # Probe läuft noch bzw. LHM nicht erreichbar
+        data = client.get_system_data()
+        if data and self.gpu_mode != 'first':
+            gpus = client.get_gpus()
+            if gpus:
+                data.update(gpu_frame_fields(gpus, self.gpu_mode))
+        return data
+    
+    def collect_temps(self):
+        """Sammelt die CPU-Temperatur (hwmon bzw. psutil)"""
+        return {'cpu_temp': round(self.get_cpu_temp(), 1)}
+    
+    def collect_cpu(self):
+        """Sammelt die CPU-Auslastung (cpu_times-Delta seit dem letzten Aufruf)"""
+        cpu_usage, _ = self.cpu_sampler.sample()
+        return {'cpu_usage': round(cpu_usage, 1)}
+    
+    def collect_fans(self):
+        """Sammelt die Drehzahl des CPU-Lüfters (hwmon bzw. psutil)"""
+        return {'cpu_fan': self.get_cpu_fan_speed()}
+    
+    def collect_gpu(self):
+        """Sammelt GPU-Daten aller GPUs in einem Durchlauf über das GPU-Backend"""
+        try:
+            gpus = self.gpu_backend.get_gpus()
+        except Exception:
+            gpus = []
+        return gpu_frame_fields(gpus, self.gpu_mode)
+    
+    def collect_ram(self):
+        """Sammelt RAM-Auslastung über psutil"""
+        import psutil
         
-        # RAM
         ram = psutil.virtual_memory()
-        ram_usage = ram.percent
-        
-        data = {
-            'cpu_temp': round(cpu_temp, 1),
-            'cpu_usage': round(cpu_usage, 1),
-            'cpu_fan': cpu_fan,
-            'gpu_temp': round(gpu_temp, 1),
-            'gpu_usage': round(gpu_usage, 1),
-            'gpu_fan': gpu_fan,
-            'ram_usage': round(ram_usage, 1)
-        }
+        return {'ram_usage': round(ram.percent, 1)}
+    
+    def build_pipeline(self, interval, sources=None):
+        """
+        Baut die Collector/Sender-Pipeline auf
+        Pro registrierter Datenquelle läuft ein eigener Collector-Thread mit
+        der Periode der Quelle. Solange LibreHardwareMonitor frische Daten
+        liefert, pausieren die Quellen mit defer_to='lhm', deren Felder es
+        vollständig enthält. Läuft die LHM-Probe noch, liefern bis zu ihrem Ende
+        die psutil-Quellen.
+        
+        Args:
+            interval: Sende-Intervall in Sekunden
+            sources: Liste von MetricSource statt der registrierten Quellen
         
+        Returns:
+            Pipeline: Noch nicht gestartete Pipeline
+        """
+        pipeline = Pipeline(interval)
+        self.sources = self.enabled_sources() if sources is None else sources
+        self.source_interval = interval
+        primaries = {source.name: source for source in self.sources}
+        
+        def collector(source):
+            primary = primaries.get(source.defer_to)
+            
+            def collect():
+                if primary is not None and self._deferred(
+                        source, pipeline.store.get(primary.name, source_ttl(primary, interval, self))):
+                    return None
+                return self._collect_source(source)
+            return collect
+        
+        for source in self.sources:
+            pipeline.add_source(source.name, collector(source),
+                                period=lambda source=source: source_period(source, interval, self))
+        return pipeline
+    
+    def assemble_frame(self, store):
+        """
+        Setzt einen Frame aus den gültigen (nicht älter als ttl) Werten im Store zusammen
+        
+        Args:
+            store: LatestValueStore der Pipeline
+        
+        Returns:
+            dict: System-Daten oder None, solange eine benötigte Quelle keinen gültigen Wert hat
+        """
+        data = {}
+        fresh = {}
+        for source in self.sources:
+            value = store.get(source.name, source_ttl(source, self.source_interval, self))
+            if value is not None:
+                fresh[source.name] = value
+            primary = fresh.get(source.defer_to)
+            if self._deferred(source, primary):
+                continue  # Felder kommen aus der vollständigeren Quelle
+            if value is None:
+                if source.required:
+                    return None
+                continue
+            data.update(self._missing_fields(value, primary))
+        
+        # Adaptive Rate: Tick auslassen, solange sich nichts Wesentliches ändert
+        # (vor den Samplern, damit min/max den ganzen Zeitraum bis zum Senden abdecken)
+        if self.scheduler and not self.scheduler.should_send(data, self.frame_size(data)):
+            return None
+        
+        # High-Rate Samples: Mittelwert und min/max seit dem letzten Frame
+        if self.sampler:
+            data.update(self.sampler.frame_fields())
+        
+        # Last pro Kern seit dem letzten Frame (nicht-blockierend, ohne Zusatzkosten)
+        if self.core_sampler:
+            _, per_core = self.core_sampler.sample()
+            data['cpu_cores'] = [round(load, 1) for load in per_core]
         return data
     
+    def frame_size(self, data):
+        """
+        Schätzt die Größe eines kodierten Frames für die Link-Auslastung
+        
+        Returns:
+            int: Mittlere Bytes pro Frame des größten Displays (vor dem
+                 ersten Frame: Länge der JSON-Zeile)
+        """
+        sizes = [sink.bytes_sent / sink.frames for sink in self.sinks if sink.frames]
+        if sizes:
+            return max(sizes)
+        return len(json.dumps(data, separators=(',', ':'))) + 1
+    
     def send_data(self, data):
-        """Sendet Daten als JSON über Serial"""
-        try:
-            if self.ser is None or not self.ser.is_open:
-                print("⚠ Serial-Verbindung nicht aktiv!")
-                return
-                
-            json_str = json.dumps(data) + '\n'
-            self.ser.write(json_str.encode('utf-8'))
-            self.ser.flush()
-        except Exception as e:
-            print(f"✗ Fehler beim Senden: {e}")
+        """
+        Reiht einen Frame bei allen Displays ein (JSON-Zeile oder Binär-Frame)
+        Geschrieben wird im Writer-Thread des jeweiligen Sinks, der Sender
+        blockiert also nie auf einen einzelnen Port.
+        """
+        for sink in self.sinks:
+            sink.offer(data)
     
-    def run(self, interval=1.0):
+    def run(self, interval=1.0, scheduler=None, rate_log=None, telemetry=None, recorder=None, replay=None,
+            fleet=None, history_csv=None, history_resolution=1):
         """
         Hauptschleife: Sammelt und sendet Daten in regelmäßigen Abständen
         
         Args:
-            interval: Update-Intervall in Sekunden
+            interval: Update-Intervall in Sekunden (ohne scheduler)
+            scheduler: AdaptiveRate - Update-Rate folgt der Änderung der Messwerte,
+                       getickt wird dann mit dessen Maximalrate
+            rate_log: CSV-Datei für die gewählte Rate über die Zeit (nur mit scheduler)
+            telemetry: Telemetry - Messwerte periodisch loggen bzw. lokal bereitstellen
+            recorder: TraceWriter - jeden gesendeten Frame aufzeichnen
+            replay: TraceReplay - Aufnahme abspielen statt Sensoren abzufragen
+            fleet: FleetAggregator (gestartet) - Flotten-Frames der Agents senden
+                   statt Sensoren abzufragen
+            history_csv: CSV-Datei, in die beim Beenden der Verlauf exportiert wird
+            history_resolution: Auflösung des CSV-Exports in Sekunden (1, 10 oder 60)
         """
+        self.scheduler = scheduler
+        self.fleet = fleet
         print(f"\n{'='*50}")
-        print(f"Starte Monitoring (Update alle {interval}s)")
-        print(f"Port: {self.port} @ {self.baudrate} baud")
-        print(f"Serial Status: {'✓ OFFEN' if self.ser and self.ser.is_open else '✗ GESCHLOSSEN'}")
+        if replay:
+            speed = f"{replay.speed:g}x" if replay.speed > 0 else "max. Geschwindigkeit"
+            print(f"Wiedergabe: {replay.path} ({speed}{', Schleife' if replay.loop else ''})")
+        elif scheduler:
+            interval = 1.0 / scheduler.max_rate
+            print(f"Starte Monitoring (adaptiv {scheduler.min_rate:g}-{scheduler.max_rate:g} Hz, "
+                  f"max. {scheduler.utilization:.0%} Link-Auslastung)")
+        else:
+            print(f"Starte Monitoring (Update alle {interval}s)")
+        for sink in self.sinks:
+            rate = f" | alle {sink.interval}s" if sink.interval else ""
+            fields = f" | Felder: {', '.join(sink.fields)}" if sink.fields else ""
+            print(f"Port: {sink.port} @ {sink.baudrate} baud{rate}{fields}")
+        if fleet:
+            host, port = fleet.address
+            print(f"Aggregator: {host}:{port} (UDP{'/TCP' if fleet.tcp else ''}) | Hosts aktiv "
+                  f"bis {fleet.ttl:g}s nach dem letzten Frame | Top {fleet.top_n}")
+        if self.agent:
+            print(f"Agent: {self.agent.name} → {self.agent.target}")
         print(f"{'='*50}")
         print("Drücke Ctrl+C zum Beenden\n")
         
+        if replay:
+            self.pipeline = Pipeline(interval)
+        elif fleet:
+            # Der Flotten-Frame ist die einzige Quelle (Reduktion einmal pro Takt im Collector)
+            self.pipeline = self.build_pipeline(interval, [MetricSource('fleet', lambda monitor: fleet.frame(),
+                                                                        required=True)])
+        else:
+            self.pipeline = self.build_pipeline(interval)
+        if self.sample_rate > 0:
+            self.sampler = SamplingEngine({'cpu_usage': CpuLoadSampler().total},
+                                          rate=self.sample_rate, window=max(5.0, 2 * interval))
+        packet_count = 0
+        ports = ', '.join([sink.port for sink in self.sinks] + ([self.agent.target] if self.agent else []))
+        console_lines = (4 + (1 if scheduler else 0) + (1 if fleet else 0)
+                         + (len(self.sinks) if len(self.sinks) > 1 else 0))
+        start_time = time.monotonic()
+        rate_file = None
+        if scheduler and rate_log:
+            rate_file = open(rate_log, 'w', encoding='utf-8')
+            rate_file.write("zeit_s,rate_hz,link_max_hz,grund\n")
+        
+        def send(data):
+            nonlocal packet_count
+            packet_count += 1
+            stats = self.pipeline.timing_stats()
+            collect_ms = max((v['mean_ms'] for k, v in stats.items() if k.startswith('collect.')), default=0.0)
+            send_ms = max((sink.write_stats.snapshot()['last_ms'] for sink in self.sinks), default=0.0)
+            
+            # Ausgabe in Konsole - überschreibe vorherige Zeilen
+            # Cursor nach oben und lösche bis Ende
+            print(f"\033[{console_lines}A\033[J", end='')
+            for notice in self._take_notices():
+                print(notice)  # Bleibt oberhalb der Statuszeilen stehen
+            print(f"[#{packet_count:04d}] CPU: {data.get('cpu_temp', 0):5.1f}°C | {data.get('cpu_usage', 0):5.1f}% "
+                  f"| {data.get('cpu_fan', 0):4d} RPM")
+            gpu_note = f" | heißeste #{data['gpu_hottest']} von {data['gpu_count']}" if 'gpu_count' in data else ""
+            print(f"         GPU: {data.get('gpu_temp', 0):5.1f}°C | {data.get('gpu_usage', 0):5.1f}% "
+                  f"| {data.get('gpu_fan', 0):4d} RPM{gpu_note}")
+            offline = [sink.port for sink in self.sinks if not sink.connected]
+            link = f"⚠ getrennt: {', '.join(offline)}" if offline else f"✓ Gesendet an {ports}"
+            print(f"         RAM: {data.get('ram_usage', 0):5.1f}% | {link}")
+            reconnect_ms = max((sink.reconnect_stats.snapshot()['last_ms'] for sink in self.sinks), default=0.0)
+            reconnect = f" | Reconnect {reconnect_ms:.0f} ms" if reconnect_ms else ""
+            ack_ms = max((sink.ack_stats.snapshot()['mean_ms'] for sink in self.sinks if sink.flow_control), default=None)
+            ack = f" | ACK {ack_ms:.1f} ms" if ack_ms is not None else ""
+            render_ms = max((sink.render_stats.snapshot()['p95_ms'] for sink in self.sinks
+                             if sink.render_stats.count), default=None)
+            ack += f" | Render p95 {render_ms:.1f} ms" if render_ms is not None else ""
+            if fleet:
+                top = ', '.join(f"{host} {temp:.1f}°C" for host, temp, _ in data['fleet_top'])
+                print(f"         Flotte: {data['fleet_hosts']} Hosts | heißeste: {top}")
+            print(f"         Zeit: Sammeln {collect_ms:6.1f} ms | Senden {send_ms:5.1f} ms | übersprungen {stats['skipped_ticks']}{ack}{reconnect}")
+            if scheduler:
+                rate = scheduler.snapshot()
+                _, _, reason = scheduler.history[-1]
+                print(f"         Rate: {rate['rate_hz']:5.2f} Hz ({'Änderung' if reason == 'change' else 'ruhig'}) "
+                      f"| Link max. {rate['link_max_hz']:.1f} Hz | ausgelassen {rate['skipped']}")
+                if rate_file:
+                    rate_file.write(f"{time.monotonic() - start_time:.3f},{rate['rate_hz']},"
+                                    f"{rate['link_max_hz']},{reason}\n")
+                    rate_file.flush()
+            if len(self.sinks) > 1:
+                for sink in self.sinks:
+                    status = sink.status()
+                    print(f"         {sink.port}: {status['frames']} Frames | {status['bytes']} Bytes "
+                          f"| überholt {status['dropped']} | Fehler {status['errors']} "
+                          f"| Reconnects {status['reconnects']}")
+            
+            # An ESP32 senden
+            if recorder:
+                recorder.write(data)
+            if self.agent:
+                self.agent.publish(data)
+            self.history.add(data)
+            self.send_data(data)
+        
         try:
-            packet_count = 0
-            while True:
-                # Daten sammeln
-                data = self.get_system_data()
-                packet_count += 1
-                
-                # Ausgabe in Konsole - überschreibe vorherige Zeilen
-                # Cursor 3 Zeilen nach oben und lösche bis Ende
-                print(f"\033[3A\033[J", end='')
-                print(f"[#{packet_count:04d}] CPU: {data['cpu_temp']:5.1f}°C | {data['cpu_usage']:5.1f}% | {data['cpu_fan']:4d} RPM")
-                print(f"         GPU: {data['gpu_temp']:5.1f}°C | {data['gpu_usage']:5.1f}% | {data['gpu_fan']:4d} RPM")
-                print(f"         RAM: {data['ram_usage']:5.1f}% | ✓ Gesendet an {self.port}")
-                
-                # An ESP32 senden
-                self.send_data(data)
-                
-                time.sleep(interval)
-                
+            with self._init_lock:
+                self._status_active = True
+            for sink in self.sinks:
+                sink.start()
+            self.pipeline.start()
+            if self.sampler:
+                self.sampler.start()
+            if telemetry:
+                telemetry.start()
+            if replay:
+                for frame in replay.frames(self.pipeline.stop_event):
+                    send(frame)
+                print(f"\nWiedergabe beendet ({replay.frames_played} Frames)")
+            else:
+                self.pipeline.run_sender(self.assemble_frame, send)
+        
         except KeyboardInterrupt:
             print("\n\nMonitoring beendet")
         finally:
-            if self.ser:
-                self.ser.close()
+            self.pipeline.stop()
+            with self._init_lock:
+                self._status_active = False
+            for notice in self._take_notices():
+                print(notice)
+            if telemetry:
+                telemetry.stop()
+            if self.sampler:
+                self.sampler.stop()
+            for sink in self.sinks:
+                sink.close()
+            if rate_file:
+                rate_file.close()
+            if recorder:
+                recorder.close()
+                print(f"✓ Aufnahme gespeichert: {recorder.path} ({recorder.frames} Frames)")
+            if history_csv:
+                try:
+                    rows = self.history.write_csv(history_csv, resolution=history_resolution)
+                    print(f"✓ Verlauf exportiert: {history_csv} ({rows} Zeilen à {history_resolution}s)")
+                except OSError as e:
+                    print(f"✗ Verlauf konnte nicht exportiert werden: {e}")
+            if fleet:
+                fleet.stop()
+            if self.agent:
+                self.agent.close()
+            # Noch laufende Init-Threads schließen ihr Backend danach selbst (_publish_backend)
+            self.wait_sources(timeout=1.0)
+            with self._init_lock:
+                self._closed = True
+                lhm_client, gpu_backend = self.lhm_client, self.gpu_backend
+            if lhm_client:
+                lhm_client.close()
+            gpu_backend.close()
+            if self.hwmon:
+                self.hwmon.close()
+
+
+# Eingebaute Datenquellen. Die Reihenfolge bestimmt die Reihenfolge der Felder
+# im Frame; LHM steht vorn, die übrigen pausieren, solange es frische Werte
+# liefert. Plugins (--plugin) registrieren weitere Quellen über sources.
+register_source('lhm', methodcaller('collect_lhm'), enabled=methodcaller('lhm_enabled'))
+register_source('temps', methodcaller('collect_temps'), cost=lambda monitor: 'low' if monitor.hwmon else 'medium',
+                required=True, defer_to='lhm')
+register_source('cpu', methodcaller('collect_cpu'), required=True, defer_to='lhm')
+register_source('fans', methodcaller('collect_fans'), cost='medium', required=True, defer_to='lhm')
+register_source('gpu', methodcaller('collect_gpu'), cost=lambda monitor: monitor.gpu_backend.cost,
+                required=True, defer_to='lhm')
+register_source('ram', methodcaller('collect_ram'), required=True, defer_to='lhm')
 
 
 def main():
@@ -376,6 +965,87 @@ def main():
     parser.add_argument('--baud', '-b', type=int, default=115200, help='Baudrate (default: 115200)')
     parser.add_argument('--interval', '-i', type=float, default=1.0, help='Update-Intervall in Sekunden (default: 1.0)')
     parser.add_argument('--list', '-l', action='store_true', help='Liste verfügbare Serial-Ports')
+    parser.add_argument('--protocol', choices=['json', 'binary'], default='json',
+                        help='Wire-Protokoll (default: json, binary nur wenn vom Display unterstützt)')
+    parser.add_argument('--delta', action='store_true',
+                        help='Nur geänderte Felder senden (falls vom Display unterstützt)')
+    parser.add_argument('--delta-epsilon', default=None,
+                        help="Delta-Schwellwert: Zahl für alle Felder oder z.B. 'cpu_temp=0.5,cpu_fan=100'")
+    parser.add_argument('--keyframe-interval', type=int, default=30,
+                        help='Im Delta-Modus alle N Ticks einen vollständigen Frame senden (default: 30)')
+    parser.add_argument('--sample-rate', type=float, default=0,
+                        help='Interne Sample-Rate der CPU-Last in Hz, sendet min/max pro Frame (default: 0 = aus)')
+    parser.add_argument('--per-core', action='store_true',
+                        help="CPU-Last pro Kern als 'cpu_cores' mitsenden")
+    parser.add_argument('--gpu-backend', choices=['auto', 'nvml', 'gputil', 'fake', 'none'], default='auto',
+                        help='GPU-Backend (default: auto = NVML, sonst GPUtil)')
+    parser.add_argument('--gpu-mode', choices=GPU_MODES, default='first',
+                        help='Mehrere GPUs: first = erste GPU, reduce = max. Temp/mittlere Last/heißeste GPU, '
+                             'array = zusätzlich Werte pro GPU (default: first)')
+    parser.add_argument('--no-reset', action='store_true',
+                        help='ESP32 beim Öffnen des Ports nicht neu starten (DTR/RTS aus)')
+    parser.add_argument('--ack', action='store_true',
+                        help='Flow Control: auf ACK des Displays warten, bevor der nächste Frame gesendet wird')
+    parser.add_argument('--sink', action='append', default=[], metavar='PORT[:OPTION=WERT...]',
+                        help="Weiteres Display, z.B. 'COM5:interval=5:fields=cpu_temp,gpu_temp' "
+                             "(mehrfach möglich; Optionen: interval, fields, protocol)")
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Adaptive Update-Rate: schneller bei Laständerungen, Heartbeat im Leerlauf '
+                             '(ersetzt --interval)')
+    parser.add_argument('--min-rate', type=float, default=0.5,
+                        help='Adaptiv: minimale Rate in Hz, Heartbeat im Leerlauf (default: 0.5)')
+    parser.add_argument('--max-rate', type=float, default=10.0,
+                        help='Adaptiv: maximale Rate in Hz (default: 10)')
+    parser.add_argument('--link-utilization', type=float, default=0.5,
+                        help='Adaptiv: maximale Auslastung der Serial-Verbindung, 0..1 (default: 0.5)')
+    parser.add_argument('--rate-log', default=None, metavar='DATEI',
+                        help='Adaptiv: gewählte Rate über die Zeit als CSV protokollieren')
+    parser.add_argument('--metrics-log', default=None, metavar='DATEI',
+                        help='Telemetrie (Laufzeiten, Bytes/s, Latenzen mit p50/p95/p99) als JSON-Zeilen anhängen')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Telemetrie unter http://127.0.0.1:PORT/metrics bereitstellen')
+    parser.add_argument('--metrics-interval', type=float, default=10.0,
+                        help='Abstand der Telemetrie-Zeilen in Sekunden (default: 10)')
+    parser.add_argument('--record', default=None, metavar='DATEI',
+                        help='Gesendete Frames mit Zeitstempel aufzeichnen (.jsonl, mit .gz komprimiert)')
+    parser.add_argument('--history-csv', default=None, metavar='DATEI',
+                        help='Verlauf (Mittelwert und Maximum pro Feld) beim Beenden als CSV exportieren')
+    parser.add_argument('--history-resolution', type=int, choices=[res for res, _ in RESOLUTIONS], default=1,
+                        help='Auflösung des CSV-Exports in Sekunden (default: 1 = letzte Stunde, '
+                             '10 = 6 Stunden, 60 = 24 Stunden)')
+    parser.add_argument('--replay', default=None, metavar='DATEI',
+                        help='Aufnahme abspielen statt Sensoren abzufragen')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='Wiedergabe-Geschwindigkeit (default: 1 = Originaltakt, 0 = so schnell wie möglich)')
+    parser.add_argument('--replay-loop', action='store_true', help='Aufnahme in Schleife abspielen (Demo)')
+    parser.add_argument('--profile', default=None, metavar='DATEI',
+                        help='Eigene Hot Paths sampeln und als Collapsed Stacks (Flame-Graph) schreiben, '
+                             'CPU/RSS-Zusammenfassung in DATEI.summary.jsonl')
+    parser.add_argument('--profile-rate', type=float, default=20.0,
+                        help='Profiling: Samples pro Sekunde (default: 20)')
+    parser.add_argument('--profile-summary-interval', type=float, default=3600.0,
+                        help='Profiling: Abstand der CPU/RSS-Zusammenfassungen in Sekunden (default: 3600)')
+    parser.add_argument('--cpu-budget', type=float, default=0.5,
+                        help='Profiling: CPU-Budget des Monitors in %% eines Kerns (default: 0.5)')
+    parser.add_argument('--agent', default=None, metavar='ZIEL',
+                        help="Jeden Frame an einen Aggregator senden, z.B. 'udp://192.168.1.10:9109' oder "
+                             "'tcp://rack-display:9109' (ohne --port/--sink ohne lokales Display)")
+    parser.add_argument('--agent-name', default=None, metavar='NAME',
+                        help='Host-Name in den Agent-Nachrichten (default: Rechnername)')
+    parser.add_argument('--aggregate', nargs='?', const='0.0.0.0', default=None, metavar='ADRESSE',
+                        help='Aggregator: Frames vieler Agents per UDP/TCP empfangen und Flotten-Werte '
+                             '(max. Temperatur, mittlere Last, heißeste Hosts) anzeigen (default: 0.0.0.0:9109)')
+    parser.add_argument('--fleet-ttl', type=float, default=5.0,
+                        help='Aggregator: Hosts ohne Frame seit N Sekunden ausblenden (default: 5)')
+    parser.add_argument('--fleet-top', type=int, default=3,
+                        help='Aggregator: Anzahl der heißesten Hosts im Frame, höchstens 5 (default: 3)')
+    parser.add_argument('--plugin', action='append', default=[], metavar='MODUL',
+                        help='Modul oder .py-Datei laden, das eigene Datenquellen registriert (mehrfach möglich)')
+    parser.add_argument('--lhm-timeout', type=float, default=0.5,
+                        help='Latenz-Budget pro LibreHardwareMonitor-Abfrage in Sekunden (default: 0.5)')
+    parser.add_argument('--lhm-map', default=None, metavar='DATEI',
+                        help='Eigene Zuordnung Frame-Feld -> LibreHardwareMonitor-Sensoren (JSON, '
+                             'erzeugen mit debug_sensors.py --write-map)')
     
     args = parser.parse_args()
     
@@ -385,8 +1055,113 @@ def main():
         return
     
     # Monitor starten
-    monitor = SystemMonitor(port=args.port, baudrate=args.baud)
-    monitor.run(interval=args.interval)
+    from display_sink import parse_sink_spec
+    
+    for plugin in args.plugin:
+        try:
+            load_plugin(plugin)
+        except Exception as e:
+            parser.error(f"--plugin {plugin}: {e}")
+        print(f"✓ Plugin geladen: {plugin}")
+    
+    lhm_map = None
+    if args.lhm_map:
+        from sensor_map import load_sensor_map
+        try:
+            lhm_map = load_sensor_map(args.lhm_map)
+        except (OSError, ValueError) as e:
+            parser.error(f"--lhm-map {args.lhm_map}: {e}")
+        print(f"✓ Sensor-Zuordnung geladen: {args.lhm_map} ({len(lhm_map.fields)} Felder)")
+    
+    try:
+        delta_epsilon = parse_epsilon(args.delta_epsilon)
+    except ValueError as e:
+        parser.error(f"--delta-epsilon: {e}")
+    
+    scheduler = None
+    if args.adaptive:
+        if not 0 < args.min_rate <= args.max_rate:
+            parser.error("--min-rate muss größer 0 und höchstens --max-rate sein")
+        if not 0 < args.link_utilization <= 1:
+            parser.error("--link-utilization muss zwischen 0 und 1 liegen")
+        if args.min_rate < 0.2:
+            print("⚠ --min-rate unter 0.2 Hz: Display meldet im Leerlauf 'CONNECTION LOST'")
+        scheduler = AdaptiveRate(min_rate=args.min_rate, max_rate=args.max_rate,
+                                 baudrate=args.baud, utilization=args.link_utilization)
+    
+    if args.replay and not os.path.exists(args.replay):
+        parser.error(f"--replay: Datei nicht gefunden: {args.replay}")
+    if args.replay and args.adaptive:
+        parser.error("--replay spielt im aufgezeichneten Takt ab, --adaptive ist nicht möglich")
+    
+    if args.aggregate and (args.agent or args.replay):
+        parser.error("--aggregate zeigt die Frames der Agents an, --agent/--replay sind nicht möglich")
+    if args.aggregate and args.fleet_ttl <= 0:
+        parser.error("--fleet-ttl muss größer 0 sein")
+    if args.agent or args.aggregate:
+        from fleet import FLEET_TOP_MAX, FleetAgent, FleetAggregator, parse_address
+        if not 0 <= args.fleet_top <= FLEET_TOP_MAX:
+            parser.error(f"--fleet-top muss zwischen 0 und {FLEET_TOP_MAX} liegen (Zeilenpuffer des Displays)")
+    agent = None
+    if args.agent:
+        try:
+            agent = FleetAgent(args.agent, name=args.agent_name)
+        except ValueError as e:
+            parser.error(f"--agent {args.agent}: {e}")
+    fleet = None
+    if args.aggregate:
+        try:
+            _, host, port = parse_address(args.aggregate, default_host='0.0.0.0')
+        except ValueError as e:
+            parser.error(f"--aggregate {args.aggregate}: {e}")
+        fleet = FleetAggregator(host, port, ttl=args.fleet_ttl, top_n=args.fleet_top)
+    
+    sinks = []
+    for spec in args.sink:
+        try:
+            sinks.append(parse_sink_spec(spec))
+        except ValueError as e:
+            parser.error(f"--sink {spec}: {e}")
+    
+    profiler = None
+    if args.profile:
+        profiler = Profiler(args.profile, rate=args.profile_rate, summary_interval=args.profile_summary_interval,
+                            cpu_budget=args.cpu_budget)
+        profiler.start()
+    
+    try:
+        run_monitor(args, sinks, delta_epsilon, scheduler, agent, fleet, lhm_map)
+    finally:
+        if profiler:
+            summary = profiler.stop()
+            budget = "✓ im Budget" if summary['within_budget'] else "⚠ über Budget"
+            print(f"Profil: {args.profile} ({profiler.samples} Samples) | CPU {summary['cpu_percent']:.2f}% "
+                  f"({budget} {args.cpu_budget}%) | RSS max. {summary['rss_max_mb']} MB")
+
+
+def run_monitor(args, sinks, delta_epsilon, scheduler, agent=None, fleet=None, lhm_map=None):
+    """Erzeugt den SystemMonitor aus den Kommandozeilen-Argumenten und startet ihn"""
+    if fleet:
+        try:
+            fleet.start()
+        except OSError as e:
+            print(f"✗ Aggregator kann nicht auf {fleet.host}:{fleet.port} lauschen: {e}")
+            sys.exit(1)
+    monitor = SystemMonitor(port=args.port, baudrate=args.baud, lhm_timeout=args.lhm_timeout,
+                            protocol=args.protocol, delta=args.delta, delta_epsilon=delta_epsilon,
+                            keyframe_interval=args.keyframe_interval, sample_rate=args.sample_rate,
+                            per_core=args.per_core, gpu_backend=args.gpu_backend, gpu_mode=args.gpu_mode,
+                            sinks=sinks, no_reset=args.no_reset, ack=args.ack,
+                            collect=args.replay is None and fleet is None, agent=agent, lhm_map=lhm_map)
+    telemetry = None
+    if args.metrics_log or args.metrics_port is not None:
+        telemetry = Telemetry(monitor, interval=args.metrics_interval, log_path=args.metrics_log,
+                              http_port=args.metrics_port)
+    recorder = TraceWriter(args.record) if args.record else None
+    replay = TraceReplay(args.replay, speed=args.replay_speed, loop=args.replay_loop) if args.replay else None
+    monitor.run(interval=args.interval, scheduler=scheduler, rate_log=args.rate_log, telemetry=telemetry,
+                recorder=recorder, replay=replay, fleet=fleet, history_csv=args.history_csv,
+                history_resolution=args.history_resolution)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,301 @@
+"""
+Producer/Consumer-Pipeline für den PC System Monitor
+Collector-Threads (einer pro Datenquelle) schreiben in einen Latest-Value-Store,
+ein Sender liest daraus mit festem, driftfreiem Takt.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class StageStats:
+    """
+    Laufzeit-Statistik einer Pipeline-Stufe (thread-safe)
+    Perzentile beziehen sich auf die letzten window Messungen.
+    """
+    
+    def __init__(self, window=1024):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+        self._recent = deque(maxlen=window)
+    
+    def record(self, duration):
+        """
+        Erfasst eine Laufzeit
+        
+        Args:
+            duration: Dauer in Sekunden
+        """
+        with self._lock:
+            self.count += 1
+            self.total += duration
+            self.last = duration
+            self._recent.append(duration)
+            if duration > self.max:
+                self.max = duration
+    
+    def snapshot(self):
+        """
+        Returns:
+            dict: count, last/mean/max und p50/p95/p99 in Millisekunden
+        """
+        with self._lock:
+            mean = self.total / self.count if self.count else 0.0
+            recent = sorted(self._recent)
+            snapshot = {
+                'count': self.count,
+                'last_ms': round(self.last * 1000, 2),
+                'mean_ms': round(mean * 1000, 2),
+                'max_ms': round(self.max * 1000, 2),
+            }
+        for p in (50, 95, 99):
+            # Nearest-Rank: kleinster Wert, unter dem p % der Messungen liegen
+            value = recent[max(0, -(-len(recent) * p // 100) - 1)] if recent else 0.0
+            snapshot[f'p{p}_ms'] = round(value * 1000, 2)
+        return snapshot
+
+
+class LatestValueStore:
+    """Hält pro Quelle nur den neuesten Wert samt Zeitstempel"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._values = {}
+        self.version = 0  # Zählt Aktualisierungen
+    
+    def update(self, name, value):
+        """Speichert den neuesten Wert einer Quelle (None wird ignoriert)"""
+        if value is None:
+            return
+        with self._lock:
+            self._values[name] = (time.monotonic(), value)
+            self.version += 1
+            self._changed.notify_all()
+    
+    def wait_update(self, version, timeout):
+        """
+        Wartet auf eine Aktualisierung nach version
+        
+        Args:
+            version: Zuvor gelesener Wert von version
+            timeout: Maximale Wartezeit in Sekunden
+        
+        Returns:
+            bool: True, falls der Store inzwischen aktualisiert wurde
+        """
+        with self._lock:
+            return self._changed.wait_for(lambda: self.version != version, timeout)
+    
+    def get(self, name, max_age=None):
+        """
+        Liefert den neuesten Wert einer Quelle
+        
+        Args:
+            name: Name der Quelle
+            max_age: Maximales Alter in Sekunden (None = beliebig alt)
+        
+        Returns:
+            Wert oder None, falls nicht vorhanden/zu alt
+        """
+        with self._lock:
+            entry = self._values.get(name)
+        if entry is None:
+            return None
+        timestamp, value = entry
+        if max_age is not None and time.monotonic() - timestamp > max_age:
+            return None
+        return value
+    
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._values
+
+
+class FixedRateClock:
+    """
+    Driftfreier Taktgeber
+    Die Tick-Zeitpunkte liegen auf einem festen Raster (start + n * period),
+    Verarbeitungszeit verschiebt also nicht den nächsten Tick. Verpasste Ticks
+    werden übersprungen statt nachgeholt.
+    """
+    
+    def __init__(self, period):
+        self.period = period
+        self.skipped = 0
+        self.deadline = None
+    
+    def wait(self, stop_event=None):
+        """
+        Wartet bis zum nächsten Tick
+        
+        Args:
+            stop_event: Optionales threading.Event zum vorzeitigen Abbruch
+        
+        Returns:
+            bool: False, falls stop_event gesetzt wurde
+        """
+        now = time.monotonic()
+        if self.deadline is None:
+            self.deadline = now
+            return True
+        
+        self.deadline += self.period
+        delay = self.deadline - now
+        if delay < 0:
+            # Zu spät - verpasste Ticks überspringen und auf dem Raster bleiben
+            missed = int(-delay // self.period) + 1
+            self.skipped += missed
+            self.deadline += missed * self.period
+            delay = self.deadline - now
+        
+        if stop_event is not None:
+            return not stop_event.wait(delay)
+        time.sleep(delay)
+        return True
+
+
+class Collector(threading.Thread):
+    """Pollt eine Datenquelle in eigenem Takt und schreibt in den Store"""
+    
+    def __init__(self, name, func, period, store, stats, stop_event):
+        super().__init__(name=f"collector-{name}", daemon=True)
+        self.source = name
+        self.func = func
+        self.period = period
+        self.store = store
+        self.stats = stats
+        self.stop_event = stop_event
+        self.errors = 0
+    
+    def _period(self):
+        return self.period() if callable(self.period) else self.period
+    
+    def run(self):
+        clock = FixedRateClock(self._period())
+        while clock.wait(self.stop_event):
+            start = time.perf_counter()
+            try:
+                value = self.func()
+            except Exception:
+                self.errors += 1
+                value = None
+            self.stats.record(time.perf_counter() - start)
+            self.store.update(self.source, value)
+            clock.period = self._period()
+
+
+class Pipeline:
+    """
+    Verbindet Collector-Threads und Sender
+    
+    Beispiel:
+        pipeline = Pipeline(interval=1.0)
+        pipeline.add_source('cpu', collect_cpu)
+        pipeline.start()
+        pipeline.run_sender(assemble, send)
+    """
+    
+    def __init__(self, interval):
+        self.interval = interval
+        self.store = LatestValueStore()
+        self.stop_event = threading.Event()
+        self.collectors = []
+        self.stats = {}
+        self.clock = FixedRateClock(interval)
+    
+    def _stats(self, stage):
+        if stage not in self.stats:
+            self.stats[stage] = StageStats()
+        return self.stats[stage]
+    
+    def add_source(self, name, func, period=None):
+        """
+        Registriert eine Datenquelle
+        
+        Args:
+            name: Name der Quelle (Schlüssel im Store)
+            func: Callable ohne Argumente, liefert Wert oder None
+            period: Poll-Intervall in Sekunden (default: Sender-Intervall) oder
+                    Callable ohne Argumente, nach jeder Abfrage neu ausgewertet
+        """
+        collector = Collector(name, func, period or self.interval, self.store,
+                              self._stats(f"collect.{name}"), self.stop_event)
+        self.collectors.append(collector)
+    
+    def start(self):
+        """Startet alle Collector-Threads"""
+        for collector in self.collectors:
+            collector.start()
+    
+    def stop(self):
+        """Stoppt alle Collector-Threads"""
+        self.stop_event.set()
+        for collector in self.collectors:
+            collector.join(timeout=1.0)
+    
+    def run_sender(self, assemble, send):
+        """
+        Sender-Schleife mit festem Takt (blockiert bis stop())
+        Läuft im aufrufenden Thread und schläft mit time.sleep, damit
+        Ctrl+C auch unter Windows sofort greift. Der erste Frame geht raus,
+        sobald die Quellen geliefert haben, nicht erst einen Takt später.
+        
+        Args:
+            assemble: Callable(store) -> Frame oder None (None = Tick auslassen)
+            send: Callable(frame)
+        """
+        assemble_stats = self._stats('assemble')
+        send_stats = self._stats('send')
+        lateness_stats = self._stats('tick_lateness')
+        first = True
+        
+        while not self.stop_event.is_set():
+            self.clock.wait()
+            lateness_stats.record(max(0.0, time.monotonic() - self.clock.deadline))
+            
+            if first:
+                frame = self._first_frame(assemble)
+            else:
+                start = time.perf_counter()
+                frame = assemble(self.store)
+                assemble_stats.record(time.perf_counter() - start)
+            if frame is None:
+                continue
+            first = False
+            
+            start = time.perf_counter()
+            send(frame)
+            send_stats.record(time.perf_counter() - start)
+    
+    def _first_frame(self, assemble):
+        """
+        Setzt bis zum nächsten Tick bei jeder Aktualisierung des Stores erneut
+        einen Frame zusammen (die Collector-Threads starten gerade erst)
+        
+        Returns:
+            Frame oder None, falls bis zum nächsten Tick keiner zustande kam
+        """
+        deadline = self.clock.deadline + self.interval
+        while not self.stop_event.is_set():
+            version = self.store.version
+            frame = assemble(self.store)
+            if frame is not None:
+                return frame
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.store.wait_update(version, remaining):
+                return None
+        return None
+    
+    def timing_stats(self):
+        """
+        Returns:
+            dict: Statistik pro Stufe ('collect.<quelle>', 'assemble', 'send', 'tick_lateness')
+        """
+        stats = {stage: stage_stats.snapshot() for stage, stage_stats in self.stats.items()}
+        stats['skipped_ticks'] = self.clock.skipped
+        return stats
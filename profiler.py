@@ -0,0 +1,258 @@
+"""
+Selbst-Profiling des PC System Monitors
+Ein Sampler-Thread liest mit niedriger Rate (default 20 Hz) die Stacks aller
+Threads über sys._current_frames() und zählt sie als "Collapsed Stacks" - direkt
+nutzbar mit flamegraph.pl, speedscope oder inferno. Threads, die gerade in einer
+bekannten Warte-Funktion stehen (Event.wait, sleep im Takt, select, Serial-Read),
+zählen nicht; wo das Betriebssystem CPU-Zeit pro Thread liefert (Linux/macOS),
+zusätzlich nur Threads, die seit dem letzten Sample gerechnet haben. Der
+Flame-Graph zeigt so die CPU-Zeit statt der Wartezeit. Da der Sampler selbst
+das GIL braucht, sieht er kurze Rechenphasen anderer Threads selten - der
+Flame-Graph füllt sich über Stunden; exakt ist die CPU-Zeit pro Thread in der
+Zusammenfassung (Collector = Datenquelle, sink-* = Serial-Writer).
+
+Zusätzlich schreibt der Profiler pro Intervall (default: stündlich) eine
+Zusammenfassung mit CPU-Last und RSS des Prozesses als JSON-Zeile, inklusive
+Vergleich mit einem CPU-Budget.
+
+Beispiel:
+    profiler = Profiler('monitor.folded', rate=20, cpu_budget=0.5)
+    profiler.start()
+    ...
+    profiler.stop()
+    # flamegraph.pl monitor.folded > monitor.svg
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# CPU-Zeit pro Thread (nur Unix)
+THREAD_CPU_AVAILABLE = hasattr(time, 'pthread_getcpuclockid')
+
+# Innerste Python-Frames, in denen ein Thread blockiert statt rechnet: (datei, funktion)
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('socket.py', 'readinto'),
+    ('socketserver.py', 'serve_forever'),
+    ('serialposix.py', 'read'),
+    ('serialwin32.py', 'read'),
+    ('pipeline.py', 'wait'),  # FixedRateClock.wait (time.sleep bis zum nächsten Tick)
+}
+
+
+class Profiler:
+    def __init__(self, path, rate=20.0, summary_interval=3600.0, cpu_budget=0.5, summary_path=None):
+        """
+        Args:
+            path: Ausgabedatei für Collapsed Stacks (wird bei jeder Zusammenfassung aktualisiert)
+            rate: Samples pro Sekunde
+            summary_interval: Abstand der CPU/RSS-Zusammenfassungen in Sekunden
+            cpu_budget: CPU-Budget des Monitors in Prozent eines Kerns
+            summary_path: JSON-Zeilen der Zusammenfassungen (default: path + '.summary.jsonl')
+        """
+        import psutil
+        
+        self.path = path
+        self.rate = rate
+        self.summary_interval = summary_interval
+        self.cpu_budget = cpu_budget
+        self.summary_path = summary_path or f"{path}.summary.jsonl"
+        
+        self.stacks = Counter()
+        self.samples = 0
+        self.summaries = []
+        self.on_cpu_only = THREAD_CPU_AVAILABLE
+        self.stop_event = threading.Event()
+        self.thread = None
+        
+        self._process = psutil.Process()
+        self._labels = {}       # code-Objekt -> "funktion (datei)"
+        self._idle = {}         # code-Objekt -> True, falls Warte-Funktion
+        self._thread_cpu = {}   # Thread-ident -> letzte CPU-Zeit
+        self._own_cpu = 0.0     # CPU-Zeit des Sampler-Threads
+        self._window = None     # (zeitpunkt, prozess-cpu, sampler-cpu, max. rss) seit letzter Zusammenfassung
+        self._threads_cpu = {}  # native Thread-ID -> CPU-Zeit bei letzter Zusammenfassung
+        self._threads_seen = {}  # native Thread-ID -> (name, zuletzt gesehene CPU-Zeit)
+    
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)})"
+            self._labels[code] = label
+        return label
+    
+    def _waiting(self, code):
+        idle = self._idle.get(code)
+        if idle is None:
+            idle = (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+            self._idle[code] = idle
+        return idle
+    
+    def _busy(self, ident):
+        """True, falls der Thread seit dem letzten Sample CPU-Zeit verbraucht hat"""
+        if not self.on_cpu_only:
+            return True
+        try:
+            cpu = time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (OSError, OverflowError):
+            return True
+        last = self._thread_cpu.get(ident)
+        self._thread_cpu[ident] = cpu
+        return last is not None and cpu > last
+    
+    def sample(self):
+        """Nimmt ein Sample aller Threads (außer dem Sampler selbst)"""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own or not self._busy(ident) or self._waiting(frame.f_code):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}"))
+            stack.reverse()
+            self.stacks[';'.join(stack)] += 1
+        self.samples += 1
+    
+    def write_stacks(self):
+        """Schreibt die Collapsed Stacks (eine Zeile pro Stack: 'a;b;c anzahl')"""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp, self.path)
+    
+    def _update_threads(self):
+        """Merkt CPU-Zeit und Namen aller Threads (beendete Threads bleiben mit letztem Stand)"""
+        names = {thread.native_id: thread.name for thread in threading.enumerate()}
+        for thread in self._process.threads():
+            name = names.get(thread.id) or self._threads_seen.get(thread.id, (f"thread-{thread.id}",))[0]
+            self._threads_seen[thread.id] = (name, thread.user_time + thread.system_time)
+    
+    def _thread_usage(self, elapsed):
+        """CPU-Last pro Thread (Name -> % eines Kerns) seit der letzten Zusammenfassung"""
+        self._update_threads()
+        usage = {}
+        for tid, (name, cpu) in self._threads_seen.items():
+            percent = 100 * (cpu - self._threads_cpu.get(tid, 0.0)) / elapsed
+            if percent >= 0.001:
+                usage[name] = round(usage.get(name, 0.0) + percent, 3)
+        self._threads_cpu = {tid: cpu for tid, (_, cpu) in self._threads_seen.items()}
+        return dict(sorted(usage.items(), key=lambda item: -item[1]))
+    
+    def summary(self, now=None):
+        """
+        Schließt ein Zusammenfassungs-Fenster ab
+        
+        Returns:
+            dict: Dauer, CPU-Last des Monitors (ohne Profiler) und des Profilers
+                  in % eines Kerns, CPU-Last pro Thread, RSS aktuell/maximal in MB,
+                  Budget eingehalten
+        """
+        if now is None:
+            now = time.monotonic()
+        started, cpu_start, own_start, rss_max = self._window
+        elapsed = max(now - started, 1e-9)
+        cpu = time.process_time() - cpu_start
+        own = self._own_cpu - own_start
+        rss = self._process.memory_info().rss
+        monitor_percent = 100 * (cpu - own) / elapsed
+        result = {
+            'time': round(time.time(), 0),
+            'duration_s': round(elapsed, 1),
+            'cpu_percent': round(monitor_percent, 3),
+            'profiler_cpu_percent': round(100 * own / elapsed, 3),
+            'threads': self._thread_usage(elapsed),
+            'rss_mb': round(rss / 2**20, 1),
+            'rss_max_mb': round(max(rss, rss_max) / 2**20, 1),
+            'cpu_budget_percent': self.cpu_budget,
+            'within_budget': monitor_percent <= self.cpu_budget,
+            'samples': self.samples,
+        }
+        self.summaries.append(result)
+        with open(self.summary_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result) + '\n')
+        self._window = (now, time.process_time(), self._own_cpu, rss)
+        return result
+    
+    def _run(self):
+        period = 1.0 / self.rate
+        next_summary = time.monotonic() + self.summary_interval
+        next_refresh = 0.0
+        while not self.stop_event.wait(period):
+            start = time.thread_time()
+            self.sample()
+            now = time.monotonic()
+            if now >= next_refresh:
+                started, cpu, own, rss_max = self._window
+                self._window = (started, cpu, own, max(rss_max, self._process.memory_info().rss))
+                self._update_threads()
+                next_refresh = now + 1.0
+            self._own_cpu += time.thread_time() - start
+            if now >= next_summary:
+                self.summary(now)
+                self.write_stacks()
+                next_summary = now + self.summary_interval
+    
+    def start(self):
+        """Startet den Sampler-Thread"""
+        self._window = (time.monotonic(), time.process_time(), 0.0, self._process.memory_info().rss)
+        self._update_threads()
+        self._threads_cpu = {tid: cpu for tid, (_, cpu) in self._threads_seen.items()}
+        self.thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """
+        Stoppt den Sampler und schreibt Stacks und letzte Zusammenfassung
+        
+        Returns:
+            dict: Letzte Zusammenfassung
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.write_stacks()
+        return self.summary()
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    import tempfile
+    
+    def busy_loop(stop):
+        while not stop.is_set():
+            sum(i * i for i in range(2000))
+    
+    print("Teste Profiler...")
+    path = os.path.join(tempfile.mkdtemp(), 'test.folded')
+    profiler = Profiler(path, rate=100)
+    profiler.start()
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,), name="busy")
+    idle = threading.Thread(target=stop.wait, name="idle")
+    worker.start()
+    idle.start()
+    time.sleep(1.0)
+    stop.set()
+    worker.join()
+    idle.join()
+    result = profiler.stop()
+    
+    with open(path, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    print(f"  {len(lines)} Stacks, {profiler.samples} Samples, Modus: "
+          f"{'nur rechnende Threads' if profiler.on_cpu_only else 'alle Threads'}")
+    print(f"  häufigster Stack: {lines[0]}")
+    assert lines[0].startswith('busy;')
+    if profiler.on_cpu_only:
+        assert not any(line.startswith('idle;') for line in lines)
+    print(f"  ✓ Zusammenfassung: {result}")
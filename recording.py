@@ -0,0 +1,185 @@
+"""
+Aufzeichnung und Wiedergabe von Sensor-Frames
+Format: eine JSON-Zeile pro Frame mit 't' = Sekunden seit Aufnahmebeginn (wie
+die Traces von benchmarks/bench_delta.py), bei Endung .gz gzip-komprimiert
+(wenige Bytes pro Frame). Geschrieben wird nur angehängt und regelmäßig
+geflusht - eine abgebrochene Aufnahme bleibt bis zum letzten Flush lesbar.
+Gelesen wird zeilenweise als Stream, auch stundenlange Aufnahmen liegen nie
+komplett im Speicher.
+
+Beispiel:
+    writer = TraceWriter('aufnahme.jsonl.gz')
+    writer.write(data)
+    writer.close()
+    
+    for frame in TraceReplay('aufnahme.jsonl.gz', speed=10).frames():
+        send(frame)
+"""
+
+import gzip
+import json
+import time
+import zlib
+
+
+def _open(path, mode):
+    """Öffnet eine Aufnahme binär (.gz = gzip)"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 'b')
+    return open(path, mode + 'b')
+
+
+def read_trace(path):
+    """
+    Liest eine Aufnahme als Stream
+    
+    Args:
+        path: Datei (.jsonl oder .jsonl.gz)
+    
+    Yields:
+        dict: Frame inkl. 't' (falls aufgezeichnet)
+    """
+    with _open(path, 'r') as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    return  # Abgeschnittene letzte Zeile
+        except (EOFError, zlib.error):
+            return  # Aufnahme wurde nicht sauber beendet
+
+
+class TraceWriter:
+    def __init__(self, path, flush_interval=10.0):
+        """
+        Args:
+            path: Zieldatei (.gz = komprimiert); existierende Aufnahmen werden überschrieben
+            flush_interval: Abstand der Flushes auf die Platte in Sekunden
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.frames = 0
+        self._file = _open(path, 'w')
+        self._start = None
+        self._next_flush = 0.0
+    
+    def write(self, data, now=None):
+        """
+        Hängt einen Frame an
+        
+        Args:
+            data: Frame (dict)
+            now: Zeitpunkt in Sekunden (default: time.monotonic())
+        """
+        if now is None:
+            now = time.monotonic()
+        if self._start is None:
+            self._start = now
+        record = {'t': round(now - self._start, 3)}
+        record.update(data)
+        self._file.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+        self.frames += 1
+        if now >= self._next_flush:
+            self.flush()
+            self._next_flush = now + self.flush_interval
+    
+    def flush(self):
+        """Schreibt gepufferte Frames auf die Platte (gzip: Z_SYNC_FLUSH, bis hier lesbar)"""
+        self._file.flush()
+    
+    def close(self):
+        """Schließt die Aufnahme (gzip: mit vollständigem Trailer)"""
+        self._file.close()
+
+
+class TraceReplay:
+    """
+    Spielt eine Aufnahme im Originaltakt oder beschleunigt ab
+    
+    Beispiel:
+        replay = TraceReplay('aufnahme.jsonl.gz', speed=10, loop=True)
+        for frame in replay.frames(stop_event):
+            send(frame)
+    """
+    
+    def __init__(self, path, speed=1.0, loop=False, default_interval=1.0):
+        """
+        Args:
+            path: Aufnahme (.jsonl oder .jsonl.gz)
+            speed: Abspielgeschwindigkeit (1 = Originaltakt, 0 = so schnell wie möglich)
+            loop: Am Ende von vorn beginnen (Demo-Schleife)
+            default_interval: Abstand für Frames ohne 't' in Sekunden
+        """
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self.default_interval = default_interval
+        self.frames_played = 0
+        self.position = 0.0  # Zeitpunkt in der Aufnahme (Sekunden)
+    
+    def frames(self, stop_event=None):
+        """
+        Liefert die Frames zum jeweiligen Abspielzeitpunkt (driftfrei)
+        
+        Args:
+            stop_event: Optionales threading.Event zum vorzeitigen Abbruch
+        
+        Yields:
+            dict: Frame ohne 't'
+        """
+        while True:
+            start = time.monotonic()
+            first = None
+            empty = True
+            for index, frame in enumerate(read_trace(self.path)):
+                empty = False
+                t = frame.pop('t', index * self.default_interval)
+                if first is None:
+                    first = t
+                self.position = t
+                if self.speed > 0:
+                    delay = start + (t - first) / self.speed - time.monotonic()
+                    if delay > 0:
+                        if stop_event is not None:
+                            if stop_event.wait(delay):
+                                return
+                        else:
+                            time.sleep(delay)
+                if stop_event is not None and stop_event.is_set():
+                    return
+                self.frames_played += 1
+                yield frame
+            if not self.loop or empty:
+                return
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    import os
+    import tempfile
+    
+    print("Teste Aufnahme und Wiedergabe...")
+    path = os.path.join(tempfile.mkdtemp(), 'aufnahme.jsonl.gz')
+    writer = TraceWriter(path)
+    for i in range(3600):
+        writer.write({'cpu_temp': 45.0 + (i % 20) / 10, 'cpu_usage': float(i % 100), 'cpu_fan': 1200,
+                      'gpu_temp': 40.0, 'gpu_usage': 3.0, 'gpu_fan': 0, 'ram_usage': 41.5}, now=float(i))
+    writer.close()
+    size = os.path.getsize(path)
+    frames = list(read_trace(path))
+    assert len(frames) == 3600 and frames[-1]['t'] == 3599.0
+    print(f"  ✓ 1 h @ 1 Hz: {size / 1024:.1f} KB ({size / 3600:.1f} Bytes/Frame)")
+    
+    # Abgebrochene Aufnahme: lesbar bis zum letzten Flush
+    with open(path, 'r+b') as f:
+        f.truncate(size // 2)
+    partial = sum(1 for _ in read_trace(path))
+    print(f"  ✓ Abgeschnittene Datei: {partial} Frames lesbar")
+    
+    start = time.monotonic()
+    played = list(TraceReplay(path, speed=2000).frames())
+    print(f"  ✓ Wiedergabe {len(played)} Frames mit 2000x in {time.monotonic() - start:.2f} s")
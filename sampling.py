@@ -0,0 +1,233 @@
+"""
+High-Rate Sampling für den PC System Monitor
+Liest günstige Zähler (z.B. CPU-Last) mit hoher interner Rate in Ringpuffer
+fester Größe. Pro gesendetem Frame werden min/max/mean über alle Samples seit
+dem letzten Frame gebildet - Lastspitzen zwischen zwei Frames gehen so nicht
+mehr verloren, ohne die Serial-Framerate zu erhöhen.
+"""
+
+import threading
+import time
+from array import array
+
+from pipeline import FixedRateClock
+
+
+def _busy_and_total(times):
+    """
+    Zerlegt einen psutil cpu_times-Eintrag in (busy, total)
+    Wie psutil.cpu_percent: idle und iowait gelten als frei, guest-Zeiten sind
+    unter Linux bereits in user/nice enthalten und werden nicht doppelt gezählt.
+    """
+    total = sum(times)
+    total -= getattr(times, 'guest', 0.0) + getattr(times, 'guest_nice', 0.0)
+    idle = times.idle + getattr(times, 'iowait', 0.0)
+    return total - idle, total
+
+
+class CpuLoadSampler:
+    """
+    Nicht-blockierende CPU-Last aus cpu_times-Deltas zwischen zwei Aufrufen
+    Ersetzt psutil.cpu_percent(interval=0.1), das pro Messung 100 ms schläft.
+    Liefert Gesamtlast und Last pro Kern aus derselben Messung.
+    """
+    
+    def __init__(self, cpu_times=None):
+        """
+        Args:
+            cpu_times: Callable, liefert Liste von cpu_times pro Kern
+                       (default: psutil.cpu_times(percpu=True))
+        """
+        if cpu_times is None:
+            import psutil  # Erst hier: pc_monitor --help/--list kommen ohne psutil aus
+            cpu_times = lambda: psutil.cpu_times(percpu=True)
+        self._cpu_times = cpu_times
+        self._lock = threading.Lock()
+        self._last = [_busy_and_total(times) for times in self._cpu_times()]
+    
+    def sample(self):
+        """
+        Misst die Last seit dem letzten Aufruf (bzw. seit der Erzeugung)
+        
+        Returns:
+            tuple: (Gesamtlast in %, Liste Last pro Kern in %)
+        """
+        current = [_busy_and_total(times) for times in self._cpu_times()]
+        with self._lock:
+            last, self._last = self._last, current
+        
+        per_core = []
+        busy_sum = 0.0
+        total_sum = 0.0
+        for (busy, total), (last_busy, last_total) in zip(current, last):
+            busy_delta = max(0.0, busy - last_busy)
+            total_delta = total - last_total
+            busy_sum += busy_delta
+            total_sum += max(0.0, total_delta)
+            per_core.append(min(100.0, 100.0 * busy_delta / total_delta) if total_delta > 0 else 0.0)
+        
+        overall = min(100.0, 100.0 * busy_sum / total_sum) if total_sum > 0 else 0.0
+        return overall, per_core
+    
+    def total(self):
+        """Nur die Gesamtlast in % (für SamplingEngine-Probes)"""
+        return self.sample()[0]
+
+
+class RingBuffer:
+    """Ringpuffer fester Größe für float-Samples (kein Wachstum, keine Allokation pro Sample)"""
+    
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._values = array('d', bytes(8 * capacity))
+        self._written = 0  # Gesamtzahl geschriebener Samples
+    
+    def append(self, value):
+        self._values[self._written % self.capacity] = value
+        self._written += 1
+    
+    @property
+    def written(self):
+        return self._written
+    
+    def since(self, position):
+        """
+        Liefert alle Samples ab einer Schreibposition (höchstens capacity viele)
+        
+        Args:
+            position: Wert von written zu einem früheren Zeitpunkt
+        
+        Returns:
+            list: Samples in zeitlicher Reihenfolge
+        """
+        end = self._written
+        start = max(position, end - self.capacity)
+        return [self._values[i % self.capacity] for i in range(start, end)]
+
+
+def aggregate(samples):
+    """
+    Returns:
+        tuple: (min, max, mean) oder None ohne Samples
+    """
+    if not samples:
+        return None
+    return min(samples), max(samples), sum(samples) / len(samples)
+
+
+class SamplingEngine(threading.Thread):
+    """
+    Sampelt mehrere Messwerte mit fester Rate in je einen Ringpuffer
+    
+    Beispiel:
+        engine = SamplingEngine({'cpu_usage': read_cpu}, rate=20)
+        engine.start()
+        ...
+        engine.collect()  # {'cpu_usage': (min, max, mean)} seit letztem Aufruf
+    """
+    
+    def __init__(self, probes, rate=20.0, window=5.0):
+        """
+        Args:
+            probes: dict Name -> Callable ohne Argumente, liefert float
+            rate: Sample-Rate in Hz
+            window: Maximale Zeitspanne pro Ringpuffer in Sekunden
+        """
+        super().__init__(name="sampling-engine", daemon=True)
+        self.probes = probes
+        self.rate = rate
+        self.buffers = {name: RingBuffer(max(1, int(rate * window))) for name in probes}
+        self.stop_event = threading.Event()
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._read_positions = {name: 0 for name in probes}
+    
+    def run(self):
+        # Erster Durchlauf initialisiert Delta-Zähler (z.B. CpuLoadSampler) und wird verworfen
+        for probe in self.probes.values():
+            try:
+                probe()
+            except Exception:
+                pass
+        
+        clock = FixedRateClock(1.0 / self.rate)
+        clock.wait()
+        while clock.wait(self.stop_event):
+            for name, probe in self.probes.items():
+                try:
+                    value = float(probe())
+                except Exception:
+                    self.errors += 1
+                    continue
+                with self._lock:
+                    self.buffers[name].append(value)
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
+    
+    def collect(self):
+        """
+        Aggregiert alle Samples seit dem letzten Aufruf
+        
+        Returns:
+            dict: Name -> (min, max, mean); Messwerte ohne neue Samples fehlen
+        """
+        result = {}
+        with self._lock:
+            for name, buffer in self.buffers.items():
+                stats = aggregate(buffer.since(self._read_positions[name]))
+                self._read_positions[name] = buffer.written
+                if stats is not None:
+                    result[name] = stats
+        return result
+    
+    def frame_fields(self):
+        """
+        Aggregiert seit dem letzten Frame und liefert Frame-Felder
+        Pro Messwert: <name> = Mittelwert, <name>_min / <name>_max
+        
+        Returns:
+            dict: Frame-Felder (gerundet auf eine Nachkommastelle)
+        """
+        fields = {}
+        for name, (low, high, mean) in self.collect().items():
+            fields[name] = round(mean, 1)
+            fields[f"{name}_min"] = round(low, 1)
+            fields[f"{name}_max"] = round(high, 1)
+        return fields
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    import itertools
+    
+    values = itertools.cycle([10.0, 10.0, 95.0, 10.0])
+    engine = SamplingEngine({'cpu_usage': lambda: next(values)}, rate=50, window=2)
+    engine.start()
+    time.sleep(0.5)
+    fields = engine.frame_fields()
+    engine.stop()
+    
+    print("Teste Sampling-Engine...")
+    print(f"  {fields}")
+    assert fields['cpu_usage_max'] == 95.0 and fields['cpu_usage_min'] == 10.0
+    print("  ✓ Spitze zwischen zwei Frames erkannt")
+    
+    # CpuLoadSampler mit künstlichen cpu_times (2 Kerne)
+    from collections import namedtuple
+    Times = namedtuple('Times', ['user', 'system', 'idle'])
+    ticks = iter([
+        [Times(0, 0, 0), Times(0, 0, 0)],
+        [Times(5, 0, 5), Times(1, 0, 9)],
+    ])
+    overall, per_core = CpuLoadSampler(cpu_times=lambda: next(ticks)).sample()
+    assert per_core == [50.0, 10.0] and overall == 30.0, (overall, per_core)
+    print(f"  ✓ CPU-Last aus cpu_times-Deltas: {overall}% gesamt, {per_core} pro Kern")
+    
+    ring = RingBuffer(4)
+    for value in range(10):
+        ring.append(value)
+    assert ring.since(0) == [6, 7, 8, 9] and ring.since(8) == [8, 9]
+    print("  ✓ Ringpuffer überschreibt älteste Werte")
@@ -0,0 +1,182 @@
+"""
+Adaptive Update-Rate für den PC System Monitor
+Der Sender tickt mit der Maximalrate, der Scheduler entscheidet pro Tick, ob
+gesendet wird: sofort bei deutlichen Änderungen (z.B. Lastspitze beim Spielen),
+sonst erst nach dem aktuellen Intervall. Das Intervall halbiert sich bei
+Änderungen und wächst in ruhigen Phasen bis zum Heartbeat der Minimalrate.
+Die Rate bleibt immer unter der Link-Kapazität (Baudrate / Frame-Größe).
+"""
+
+import time
+from collections import deque
+
+# Änderung pro Feld, ab der ein Wert als "in Bewegung" gilt
+VOLATILITY_THRESHOLDS = {
+    'cpu_temp': 1.0,
+    'cpu_usage': 5.0,
+    'cpu_fan': 100,
+    'gpu_temp': 1.0,
+    'gpu_usage': 5.0,
+    'gpu_fan': 100,
+    'ram_usage': 2.0,
+}
+
+# Bits pro Byte auf der Leitung (8N1: Start + 8 Daten + Stopp)
+BITS_PER_BYTE = 10
+
+
+def link_rate(baudrate, frame_bytes, utilization=0.5):
+    """
+    Maximale Frame-Rate, die eine Serial-Verbindung bei gegebener Auslastung trägt
+    
+    Args:
+        baudrate: Baudrate
+        frame_bytes: Größe eines kodierten Frames in Bytes
+        utilization: Ziel-Auslastung der Leitung (0..1)
+    
+    Returns:
+        float: Frames pro Sekunde
+    """
+    return utilization * baudrate / BITS_PER_BYTE / max(1, frame_bytes)
+
+
+class AdaptiveRate:
+    """
+    Wählt pro Tick, ob ein Frame gesendet wird
+    
+    Beispiel:
+        scheduler = AdaptiveRate(min_rate=0.5, max_rate=10, baudrate=115200)
+        if scheduler.should_send(data, frame_bytes=130):
+            send(data)
+    """
+    
+    def __init__(self, min_rate=0.5, max_rate=10.0, baudrate=115200, utilization=0.5,
+                 thresholds=None, history_size=3600):
+        """
+        Args:
+            min_rate: Minimale Rate in Hz (Heartbeat im Leerlauf, über 0.2 Hz bleiben,
+                      sonst meldet die Firmware nach 5 s "CONNECTION LOST")
+            max_rate: Maximale Rate in Hz (Tick-Rate des Senders)
+            baudrate: Baudrate der (langsamsten) Verbindung
+            utilization: Ziel-Auslastung der Leitung (0..1)
+            thresholds: Änderung pro Feld, ab der gesendet wird (default: VOLATILITY_THRESHOLDS)
+            history_size: Anzahl gemerkter Sendeentscheidungen für history
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.baudrate = baudrate
+        self.utilization = utilization
+        self.thresholds = thresholds or dict(VOLATILITY_THRESHOLDS)
+        
+        self.interval = 1.0 / min_rate
+        self.link_max_rate = max_rate
+        self.history = deque(maxlen=history_size)  # (zeitpunkt, rate_hz, grund)
+        self.sent = 0
+        self.skipped = 0
+        self._last_sent = None
+        self._last_sent_at = None
+    
+    @property
+    def rate(self):
+        """Aktuell gewählte Rate in Hz"""
+        return 1.0 / self.interval
+    
+    def volatility(self, data):
+        """
+        Returns:
+            float: Größte Änderung seit dem letzten gesendeten Frame, relativ zum
+                   Schwellwert des Feldes (>= 1 = deutliche Änderung)
+        """
+        if self._last_sent is None:
+            return float('inf')
+        score = 0.0
+        for name, threshold in self.thresholds.items():
+            value = data.get(name)
+            last = self._last_sent.get(name)
+            if isinstance(value, (int, float)) and isinstance(last, (int, float)) and threshold > 0:
+                score = max(score, abs(value - last) / threshold)
+        return score
+    
+    def should_send(self, data, frame_bytes, now=None):
+        """
+        Entscheidet, ob der aktuelle Tick gesendet wird, und passt die Rate an
+        
+        Args:
+            data: Zusammengesetzter Frame (dict)
+            frame_bytes: Erwartete Größe des kodierten Frames in Bytes
+            now: Zeitpunkt in Sekunden (default: time.monotonic())
+        
+        Returns:
+            bool: True, falls gesendet werden soll
+        """
+        if now is None:
+            now = time.monotonic()
+        self.link_max_rate = link_rate(self.baudrate, frame_bytes, self.utilization)
+        fastest = 1.0 / min(self.max_rate, self.link_max_rate)
+        slowest = max(fastest, 1.0 / self.min_rate)
+        
+        elapsed = now - self._last_sent_at if self._last_sent_at is not None else float('inf')
+        if elapsed < fastest:
+            self.skipped += 1
+            return False
+        
+        if self.volatility(data) >= 1.0:
+            # Werte in Bewegung: sofort senden und schneller werden
+            self.interval = max(fastest, self.interval / 2)
+            reason = 'change'
+        elif elapsed >= self.interval:
+            # Ruhig: Heartbeat senden und langsamer werden
+            self.interval = min(slowest, self.interval * 1.5)
+            reason = 'idle'
+        else:
+            self.skipped += 1
+            return False
+        
+        self.interval = min(max(self.interval, fastest), slowest)
+        self._last_sent = dict(data)
+        self._last_sent_at = now
+        self.sent += 1
+        self.history.append((now, round(self.rate, 3), reason))
+        return True
+    
+    def snapshot(self):
+        """
+        Returns:
+            dict: Gewählte Rate, Link-Maximum (Hz), gesendete und ausgelassene Ticks
+        """
+        return {
+            'rate_hz': round(self.rate, 2),
+            'link_max_hz': round(self.link_max_rate, 1),
+            'sent': self.sent,
+            'skipped': self.skipped,
+        }
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    print("Teste adaptive Rate...")
+    scheduler = AdaptiveRate(min_rate=0.5, max_rate=10, baudrate=115200)
+    frame = {'cpu_temp': 45.0, 'cpu_usage': 5.0, 'gpu_temp': 40.0, 'gpu_usage': 2.0}
+    
+    # 20 s Leerlauf mit 10 Hz Ticks
+    t = 0.0
+    for _ in range(200):
+        scheduler.should_send(frame, frame_bytes=130, now=t)
+        t += 0.1
+    idle_rate = scheduler.rate
+    assert idle_rate == 0.5, idle_rate
+    print(f"  ✓ Leerlauf: {idle_rate:.1f} Hz")
+    
+    # Lastspitze: CPU-Last steigt um 10 % pro Tick
+    for step in range(20):
+        scheduler.should_send(dict(frame, cpu_usage=5.0 + 10 * step), frame_bytes=130, now=t)
+        t += 0.1
+    assert scheduler.rate == 10.0, scheduler.rate
+    print(f"  ✓ Lastspitze: {scheduler.rate:.1f} Hz")
+    
+    # Langsame Leitung begrenzt die Rate (9600 baud, 130 Bytes, 50 % = 3.7 Hz)
+    slow = AdaptiveRate(min_rate=0.5, max_rate=10, baudrate=9600)
+    for step in range(50):
+        slow.should_send(dict(frame, cpu_usage=float(step * 10 % 100)), frame_bytes=130, now=step * 0.1)
+    assert slow.rate <= slow.link_max_rate + 1e-9, slow.snapshot()
+    print(f"  ✓ Link-Grenze: {slow.rate:.1f} Hz bei max. {slow.link_max_rate:.1f} Hz (9600 baud)")
@@ -0,0 +1,253 @@
+"""
+Sensor-Zuordnung für LibreHardwareMonitor
+Legt pro Frame-Feld eine Prioritätsliste von Selektoren fest, die einmal pro
+Sensor-Layout gegen den LHM-Baum aufgelöst wird (SensorMap.compile). Pro Tick
+liest der Client dann nur noch die vorab ermittelten Positionen - keine
+Textsuche mehr, und 'Fan' trifft nicht mehr irgendeinen Lüfter im Baum.
+
+Selektor (ein Eintrag der Prioritätsliste):
+    "Hardware/Gruppe/Sensor"      Pfad wie in 'python debug_sensors.py --paths',
+                                  jeder Teil exakt oder mit * ? [..] (ohne
+                                  Groß-/Kleinschreibung); '/' im Sensornamen
+                                  ist erlaubt ("*/Temperatures/Core (Tctl/Tdie)")
+    {"path": ..., "index": 1}     Zweiter Treffer (z.B. zweite baugleiche GPU)
+    {"id": "/amdcpu/0/temperature/2"}
+                                  SensorId von LHM (stabil, auch mit Mustern)
+    {..., "scale": 0.5556, "offset": -17.78}
+                                  Umrechnung: Wert * scale + offset (hier °F -> °C)
+
+Datei (JSON, --lhm-map):
+    {
+      "fields": {
+        "cpu_fan": ["Nuvoton NCT6798D/Fans/Fan #2"],
+        "cpu_temp": [{"id": "/amdcpu/0/temperature/2"}, "*/Temperatures/Core (Tctl/Tdie)"],
+        "water_temp": [{"path": "*/Temperatures/Temperature #3", "offset": -1.5}]
+      }
+    }
+Nicht genannte Felder behalten die eingebaute Liste (DEFAULT_SENSOR_MAP), mit
+"defaults": false gelten nur die Felder der Datei. Der erste Kandidat mit
+gültigem Wert gewinnt; Felder des Standard-Frames fallen auf 0 zurück, eigene
+Felder fehlen dann im Frame.
+"""
+
+import fnmatch
+import json
+import re
+from collections import namedtuple
+
+# Eingebaute Zuordnung, Kandidaten in Prioritätsreihenfolge
+DEFAULT_SENSOR_MAP = {
+    'cpu_temp': ['*/Temperatures/Core Average', '*/Temperatures/CPU Package', '*/Temperatures/Core Max',
+                 '*/Temperatures/Core (Tctl/Tdie)'],
+    'cpu_usage': ['*/Load/CPU Total'],
+    'cpu_fan': ['*/Fans/CPU Fan', '*/Fans/CPU Fan #1', 'HP*/Fans/Fan', '*/Fans/Fan #1'],
+    'gpu_temp': ['*/Temperatures/GPU Core'],
+    'gpu_usage': ['*/Load/GPU Core'],
+    'gpu_fan': ['*/Fans/GPU Fan', '*/Fans/GPU Fan 1'],
+    'ram_usage': ['*Memory*/Load/Memory'],
+}
+
+# Felder des Standard-Frames: ohne Treffer 0 statt fehlend
+FRAME_FIELDS = ('cpu_temp', 'cpu_usage', 'cpu_fan', 'gpu_temp', 'gpu_usage', 'gpu_fan', 'ram_usage')
+
+# Nachkommastellen pro Feld (0 = int), sonst DEFAULT_DIGITS
+FIELD_DIGITS = {'cpu_fan': 0, 'gpu_fan': 0}
+DEFAULT_DIGITS = 1
+
+_GLOB_CHARS = re.compile(r'([*?\[])')
+
+SensorSelector = namedtuple('SensorSelector', ['pattern', 'sensor_id', 'index', 'scale', 'offset'])
+
+# Kompilierter Eintrag: Feld, Kandidaten ((Position, scale, offset), ...), Default, Nachkommastellen
+PlanEntry = namedtuple('PlanEntry', ['field', 'candidates', 'default', 'digits'])
+
+
+def sensor_path(hardware, group, sensor):
+    """Pfad eines Sensors wie in den Selektoren ('Hardware/Gruppe/Sensor')"""
+    return f"{hardware}/{group}/{sensor}"
+
+
+def exact_selector(hardware, group, sensor):
+    """
+    Selektor-Pfad, der genau diesen Sensor trifft
+    Glob-Zeichen im Namen ('Temperature [1]') werden maskiert.
+    """
+    return sensor_path(*(_GLOB_CHARS.sub(r'[\1]', text) for text in (hardware, group, sensor)))
+
+
+def _matcher(pattern):
+    """Vergleich für einen Pfad-Teil: exakt bzw. als Glob-Muster (ohne Groß-/Kleinschreibung)"""
+    pattern = pattern.lower()
+    if not any(char in pattern for char in '*?['):
+        return pattern.__eq__
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+def parse_selector(spec):
+    """
+    Liest einen Selektor aus der Zuordnung
+    
+    Args:
+        spec: Pfad als str oder dict mit path bzw. id und optional index, scale, offset
+    
+    Returns:
+        SensorSelector
+    
+    Raises:
+        ValueError: Ungültiger Selektor
+    """
+    if isinstance(spec, str):
+        spec = {'path': spec}
+    if not isinstance(spec, dict):
+        raise ValueError(f"Selektor muss Text oder Objekt sein: {spec!r}")
+    unknown = set(spec) - {'path', 'id', 'index', 'scale', 'offset'}
+    if unknown:
+        raise ValueError(f"Unbekannte Selektor-Option: {', '.join(sorted(unknown))}")
+    if ('path' in spec) == ('id' in spec):
+        raise ValueError(f"Selektor braucht genau eins von 'path' und 'id': {spec!r}")
+    
+    pattern = None
+    if 'path' in spec:
+        parts = str(spec['path']).split('/', 2)
+        if len(parts) != 3 or not all(parts):
+            raise ValueError(f"Pfad muss 'Hardware/Gruppe/Sensor' sein: {spec['path']!r}")
+        pattern = tuple(parts)
+    try:
+        index = int(spec.get('index', 0))
+        scale = float(spec.get('scale', 1.0))
+        offset = float(spec.get('offset', 0.0))
+    except (TypeError, ValueError):
+        raise ValueError(f"index/scale/offset müssen Zahlen sein: {spec!r}") from None
+    if index < 0:
+        raise ValueError(f"index muss mindestens 0 sein: {spec!r}")
+    return SensorSelector(pattern, spec.get('id'), index, scale, offset)
+
+
+class SensorMap:
+    def __init__(self, fields=None, defaults=True):
+        """
+        Args:
+            fields: dict Feld -> Liste von Selektoren (siehe parse_selector); ersetzt
+                    die eingebaute Liste des Felds
+            defaults: Eingebaute Zuordnung für nicht genannte Felder behalten
+        
+        Raises:
+            ValueError: Ungültiger Selektor
+        """
+        specs = dict(DEFAULT_SENSOR_MAP) if defaults else {}
+        specs.update(fields or {})
+        self.fields = {}
+        for field, selectors in specs.items():
+            if isinstance(selectors, (str, dict)):
+                selectors = [selectors]
+            try:
+                self.fields[field] = [parse_selector(spec) for spec in selectors]
+            except ValueError as e:
+                raise ValueError(f"{field}: {e}") from None
+        # Muster einmal übersetzen (compile läuft bei jeder Layout-Änderung)
+        self._matchers = {}
+        for selectors in self.fields.values():
+            for selector in selectors:
+                for part in (selector.pattern or ()) + ((selector.sensor_id,) if selector.sensor_id else ()):
+                    if part not in self._matchers:
+                        self._matchers[part] = _matcher(part)
+    
+    def _positions(self, selector, layout, ids):
+        """Alle Positionen im Layout, auf die der Selektor passt (Baum-Reihenfolge)"""
+        if selector.sensor_id is not None:
+            match = self._matchers[selector.sensor_id]
+            return [i for i, sensor_id in enumerate(ids) if sensor_id and match(sensor_id.lower())]
+        match_hardware, match_group, match_sensor = (self._matchers[part] for part in selector.pattern)
+        return [i for i, (hardware, group, sensor) in enumerate(layout)
+                if match_group(group) and match_sensor(sensor) and match_hardware(hardware)]
+    
+    def compile(self, layout, ids=()):
+        """
+        Löst alle Selektoren gegen ein Sensor-Layout auf
+        
+        Args:
+            layout: (hardware, gruppe, sensor)-Texte pro Sensor, klein geschrieben
+            ids: SensorId pro Sensor (oder None), gleiche Reihenfolge
+        
+        Returns:
+            tuple: PlanEntry pro Feld; Kandidaten ohne Treffer entfallen
+        """
+        plan = []
+        for field, selectors in self.fields.items():
+            candidates = []
+            seen = set()
+            for selector in selectors:
+                positions = self._positions(selector, layout, ids)
+                if selector.index < len(positions) and positions[selector.index] not in seen:
+                    position = positions[selector.index]
+                    seen.add(position)
+                    candidates.append((position, selector.scale, selector.offset))
+            default = 0 if field in FRAME_FIELDS else None
+            plan.append(PlanEntry(field, tuple(candidates), default, FIELD_DIGITS.get(field, DEFAULT_DIGITS)))
+        return tuple(plan)
+
+
+def load_sensor_map(path):
+    """
+    Lädt eine Sensor-Zuordnung aus einer JSON-Datei
+    
+    Returns:
+        SensorMap
+    
+    Raises:
+        OSError: Datei nicht lesbar
+        ValueError: Ungültiges JSON oder ungültige Zuordnung
+    """
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict) or not isinstance(config.get('fields', {}), dict):
+        raise ValueError("Erwartet ein Objekt mit 'fields': {Feld: [Selektoren]}")
+    return SensorMap(config.get('fields'), defaults=config.get('defaults', True))
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    print("Teste Sensor-Zuordnung...")
+    layout = [
+        ('hp 8870', 'fans', 'fan'),
+        ('nuvoton nct6798d', 'fans', 'fan #1'),
+        ('nuvoton nct6798d', 'fans', 'fan #2'),
+        ('amd ryzen 9 7950x', 'temperatures', 'core (tctl/tdie)'),
+        ('amd ryzen 9 7950x', 'load', 'cpu total'),
+        ('nvidia geforce rtx 4090', 'temperatures', 'gpu core'),
+        ('nvidia geforce rtx 4090', 'fans', 'gpu fan 1'),
+        ('nvidia geforce rtx 4090', 'temperatures', 'gpu core'),
+        ('generic memory', 'load', 'memory'),
+    ]
+    ids = [None, '/lpc/nct6798d/fan/0', '/lpc/nct6798d/fan/1', '/amdcpu/0/temperature/2', '/amdcpu/0/load/0',
+           '/gpu-nvidia/0/temperature/0', '/gpu-nvidia/0/fan/1', '/gpu-nvidia/1/temperature/0', '/ram/load/0']
+    
+    plan = {entry.field: entry for entry in SensorMap().compile(layout, ids)}
+    positions = {field: [c[0] for c in entry.candidates] for field, entry in plan.items()}
+    assert positions['cpu_temp'] == [3] and positions['cpu_fan'] == [0, 1], positions
+    assert positions['gpu_fan'] == [6] and positions['ram_usage'] == [8], positions
+    print(f"  ✓ Eingebaute Zuordnung: {positions}")
+    
+    custom = SensorMap({
+        'cpu_fan': ['Nuvoton*/Fans/Fan #2'],
+        'gpu_temp': [{'path': '*/Temperatures/GPU Core', 'index': 1}],
+        'cpu_temp': [{'id': '/amdcpu/*/temperature/2', 'scale': 1.8, 'offset': 32}],
+        'water_temp': ['*/Temperatures/Water'],
+    }).compile(layout, ids)
+    custom = {entry.field: entry for entry in custom}
+    assert custom['cpu_fan'].candidates == ((2, 1.0, 0.0),) and custom['gpu_temp'].candidates[0][0] == 7
+    assert custom['cpu_temp'].candidates == ((3, 1.8, 32.0),)
+    assert custom['water_temp'].candidates == () and custom['water_temp'].default is None
+    print("  ✓ Eigene Zuordnung (Pfad, index, id mit Umrechnung)")
+    
+    pinned = SensorMap({'x': [exact_selector('Board', 'Temperatures', 'Temp [1]*')]}, defaults=False)
+    entry, = pinned.compile([('board', 'temperatures', 'temp 1x'), ('board', 'temperatures', 'temp [1]*')])
+    assert entry.candidates[0][0] == 1, entry
+    print(f"  ✓ Exakter Pfad mit Glob-Zeichen: {exact_selector('Board', 'Temperatures', 'Temp [1]*')}")
+    
+    for bad in (['CPU/Fan'], [{'path': 'a/b/c', 'id': 'x'}], [{'path': 'a/b/c', 'scale': 'x'}], [42]):
+        try:
+            SensorMap({'cpu_fan': bad})
+            raise AssertionError(f"ValueError erwartet: {bad}")
+        except ValueError as e:
+            print(f"  ✓ {e}")
@@ -0,0 +1,571 @@
+"""
+Serial-Protokoll zwischen PC und ESP32 USB Display
+JSON (zeilenbasiert) oder kompakte Binär-Frames, falls das Display sie
+in seiner IDENTIFY-Antwort anbietet (z.B. "USB_DISPLAY BIN1").
+
+Binär-Frame:
+    +------+------+------+-----+-----------+---------+
+    | 0xA5 | 0x5A | TYPE | LEN | PAYLOAD   | CRC16   |
+    +------+------+------+-----+-----------+---------+
+    CRC16-CCITT (Poly 0x1021, Init 0xFFFF) über TYPE, LEN und PAYLOAD,
+    Little Endian. Alle Felder im Payload sind Little Endian.
+
+Delta-Modus (Capability "DELTA1"): Nur Felder, die sich seit dem letzten
+gesendeten Wert um mehr als epsilon geändert haben, werden übertragen.
+Binär als Frame-Typ 0x02 (16-Bit-Bitmaske + geänderte Felder), JSON als Objekt
+mit nur den geänderten Schlüsseln. Regelmäßige Keyframes erlauben Resync.
+
+Aggregat-Felder (Capability "AGG1"): min/max der CPU-Last seit dem letzten
+Frame. Binär werden sie an den Daten-Frame angehängt (14 oder 18 Bytes Payload).
+
+Verlauf (Capability "HIST1"): Nach einem (Re-)Connect füllt der PC das
+Histogramm des Displays in einem Schwung mit den letzten Sekunden. Frame-Typ
+0x03, Payload: uint16 Gesamtzahl, uint16 Offset, dann pro Sekunde 4 Bytes
+(CPU-Last, CPU-Spitze, GPU-Last, GPU-Spitze in 0.5 %, 0xFF = keine Werte),
+ältester Eintrag zuerst. Der letzte Eintrag des letzten Frames liegt direkt vor
+dem nächsten Schreibplatz des Displays.
+"""
+
+import binascii
+import json
+import struct
+import time
+
+SYNC = b'\xA5\x5A'
+HEADER_SIZE = 4
+CRC_SIZE = 2
+MAX_PAYLOAD = 250
+
+FRAME_TYPE_DATA = 0x01
+FRAME_TYPE_DELTA = 0x02
+FRAME_TYPE_HISTORY = 0x03
+
+# Capability-Tokens in der IDENTIFY-Antwort
+CAP_BINARY = 'BIN1'
+CAP_DELTA = 'DELTA1'
+CAP_AGGREGATE = 'AGG1'
+CAP_ACK = 'ACK1'  # Display bestätigt nach "ACK ON" jeden verarbeiteten Frame mit "ACK"
+CAP_PING = 'PING1'  # Display beantwortet "PING <t>" mit "PONG <t>" (nach allen vorherigen Frames)
+CAP_HISTORY = 'HIST1'  # Display nimmt Verlaufs-Frames (FRAME_TYPE_HISTORY) für das Histogramm an
+
+# Flow Control (Textzeilen)
+ACK_ON_REQUEST = b"ACK ON\n"
+ACK_RESPONSE = b"ACK"
+
+# Render-Latenz: Zeitstempel (ms) kommt unverändert zurück
+PING_REQUEST = "PING {}\n"
+PONG_RESPONSE = b"PONG"
+
+# Feld-Layout des Daten-Frames: (Name, struct-Format, Skalierung)
+FIELDS = (
+    ('cpu_temp', 'h', 10),
+    ('cpu_usage', 'H', 10),
+    ('cpu_fan', 'H', 1),
+    ('gpu_temp', 'h', 10),
+    ('gpu_usage', 'H', 10),
+    ('gpu_fan', 'H', 1),
+    ('ram_usage', 'H', 10),
+    # Aggregat-Felder (nur mit CAP_AGGREGATE)
+    ('cpu_usage_min', 'H', 10),
+    ('cpu_usage_max', 'H', 10),
+)
+BASE_FIELD_COUNT = 7
+BASE_FIELD_NAMES = tuple(name for name, _, _ in FIELDS[:BASE_FIELD_COUNT])
+
+BASE_STRUCT = struct.Struct('<' + ''.join(fmt for _, fmt, _ in FIELDS[:BASE_FIELD_COUNT]))
+DATA_STRUCT = struct.Struct('<' + ''.join(fmt for _, fmt, _ in FIELDS))
+MASK_STRUCT = struct.Struct('<H')
+FIELD_STRUCTS = [struct.Struct('<' + fmt) for _, fmt, _ in FIELDS]
+
+# Standard-Schwellwerte für den Delta-Modus (Änderung, ab der gesendet wird)
+DEFAULT_EPSILON = {
+    'cpu_temp': 0.5,
+    'cpu_usage': 1.0,
+    'cpu_fan': 50,
+    'gpu_temp': 0.5,
+    'gpu_usage': 1.0,
+    'gpu_fan': 50,
+    'ram_usage': 0.5,
+    'cpu_usage_min': 1.0,
+    'cpu_usage_max': 1.0,
+}
+
+# Verlaufs-Frame: Gesamtzahl und Offset, dann Einträge aus 4 Werten (0.5 % pro Schritt)
+HISTORY_HEADER = struct.Struct('<HH')
+HISTORY_SAMPLE_SIZE = 4
+HISTORY_SCALE = 2
+HISTORY_GAP = 0xFF
+HISTORY_CHUNK = (MAX_PAYLOAD - HISTORY_HEADER.size) // HISTORY_SAMPLE_SIZE  # Einträge pro Frame
+HISTORY_SLOTS = 320  # Einträge im Histogramm des Displays (HISTORY_SIZE in main.cpp)
+
+_LIMITS = {
+    'h': (-32768, 32767),
+    'H': (0, 65535),
+}
+
+
+class FrameError(ValueError):
+    """Ungültiger oder beschädigter Binär-Frame"""
+
+
+def crc16(data):
+    """CRC16-CCITT (Poly 0x1021, Init 0xFFFF)"""
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def parse_capabilities(response):
+    """
+    Liest die Capabilities aus einer IDENTIFY-Antwort
+    
+    Args:
+        response: Empfangener Text, z.B. "USB_DISPLAY BIN1\r\n"
+    
+    Returns:
+        set: Capability-Tokens (leer bei alter Firmware)
+    """
+    for line in response.splitlines():
+        tokens = line.split()
+        if tokens and tokens[0] == 'USB_DISPLAY':
+            return set(tokens[1:])
+    return set()
+
+
+def _pack_value(value, fmt, scale):
+    low, high = _LIMITS[fmt]
+    scaled = int(round((value or 0) * scale))
+    return min(high, max(low, scaled))
+
+
+def _unpack_value(raw, scale):
+    if scale == 1:
+        return raw
+    return round(raw / scale, 1)
+
+
+def build_frame(frame_type, payload):
+    """
+    Verpackt einen Payload in Sync-Header, Länge und CRC
+    
+    Returns:
+        bytes: Kompletter Frame
+    """
+    if len(payload) > MAX_PAYLOAD:
+        raise FrameError(f"Payload zu groß ({len(payload)} Bytes)")
+    body = bytes((frame_type, len(payload))) + payload
+    return SYNC + body + struct.pack('<H', crc16(body))
+
+
+def encode_json(data):
+    """Kodiert einen Frame als JSON-Zeile"""
+    return (json.dumps(data) + '\n').encode('utf-8')
+
+
+def encode_frame(data, extended=False):
+    """
+    Kodiert System-Daten als Binär-Frame
+    
+    Args:
+        data: dict wie von SystemMonitor.get_system_data
+        extended: Aggregat-Felder anhängen (Display mit CAP_AGGREGATE)
+    
+    Returns:
+        bytes: Binär-Frame (20 Bytes, mit Aggregat-Feldern 24 Bytes)
+    """
+    fields = FIELDS if extended else FIELDS[:BASE_FIELD_COUNT]
+    layout = DATA_STRUCT if extended else BASE_STRUCT
+    values = [_pack_value(data.get(name), fmt, scale) for name, fmt, scale in fields]
+    return build_frame(FRAME_TYPE_DATA, layout.pack(*values))
+
+
+def encode_delta_frame(changes, extended=False):
+    """
+    Kodiert geänderte Felder als Delta-Frame (Bitmaske + Werte)
+    
+    Args:
+        changes: dict mit einer Teilmenge der Felder
+        extended: Aggregat-Felder berücksichtigen (Display mit CAP_AGGREGATE)
+    
+    Returns:
+        bytes: Binär-Frame
+    """
+    count = len(FIELDS) if extended else BASE_FIELD_COUNT
+    mask = 0
+    payload = bytearray(MASK_STRUCT.size)
+    for bit, ((name, fmt, scale), field_struct) in enumerate(zip(FIELDS[:count], FIELD_STRUCTS)):
+        if name in changes:
+            mask |= 1 << bit
+            payload += field_struct.pack(_pack_value(changes[name], fmt, scale))
+    MASK_STRUCT.pack_into(payload, 0, mask)
+    return build_frame(FRAME_TYPE_DELTA, bytes(payload))
+
+
+def encode_history_frames(samples):
+    """
+    Kodiert einen Verlauf als Folge von Verlaufs-Frames
+    
+    Args:
+        samples: Pro Sekunde (CPU-Last, CPU-Spitze, GPU-Last, GPU-Spitze) in %
+                 oder None für Sekunden ohne Werte, ältester zuerst
+                 (höchstens HISTORY_SLOTS Einträge werden vom Display übernommen)
+    
+    Returns:
+        list: Binär-Frames (je höchstens HISTORY_CHUNK Einträge)
+    """
+    total = len(samples)
+    frames = []
+    for offset in range(0, total, HISTORY_CHUNK):
+        payload = bytearray(HISTORY_HEADER.pack(total, offset))
+        for sample in samples[offset:offset + HISTORY_CHUNK]:
+            if sample is None:
+                payload += bytes((HISTORY_GAP,) * HISTORY_SAMPLE_SIZE)
+                continue
+            payload += bytes(HISTORY_GAP if value is None
+                             else min(100 * HISTORY_SCALE, max(0, int(round(value * HISTORY_SCALE))))
+                             for value in sample)
+        frames.append(build_frame(FRAME_TYPE_HISTORY, bytes(payload)))
+    return frames
+
+
+def decode_payload(frame_type, payload):
+    """
+    Dekodiert den Payload eines Frames
+    
+    Returns:
+        dict: System-Daten (bei Delta-Frames nur die enthaltenen Felder, bei
+              Verlaufs-Frames history_total, history_offset und history)
+    """
+    if frame_type == FRAME_TYPE_DATA:
+        if len(payload) == DATA_STRUCT.size:
+            raw = DATA_STRUCT.unpack(payload)
+        elif len(payload) == BASE_STRUCT.size:
+            raw = BASE_STRUCT.unpack(payload)
+        else:
+            raise FrameError(f"Falsche Payload-Länge {len(payload)}")
+        return {name: _unpack_value(value, scale) for (name, _, scale), value in zip(FIELDS, raw)}
+    
+    if frame_type == FRAME_TYPE_DELTA:
+        if len(payload) < MASK_STRUCT.size:
+            raise FrameError("Leerer Delta-Frame")
+        (mask,) = MASK_STRUCT.unpack_from(payload)
+        offset = MASK_STRUCT.size
+        data = {}
+        for bit, ((name, _, scale), field_struct) in enumerate(zip(FIELDS, FIELD_STRUCTS)):
+            if mask & (1 << bit):
+                if offset + field_struct.size > len(payload):
+                    raise FrameError("Delta-Frame zu kurz")
+                (raw,) = field_struct.unpack_from(payload, offset)
+                data[name] = _unpack_value(raw, scale)
+                offset += field_struct.size
+        if offset != len(payload):
+            raise FrameError(f"Falsche Payload-Länge {len(payload)}")
+        return data
+    
+    if frame_type == FRAME_TYPE_HISTORY:
+        if len(payload) < HISTORY_HEADER.size or (len(payload) - HISTORY_HEADER.size) % HISTORY_SAMPLE_SIZE:
+            raise FrameError(f"Falsche Payload-Länge {len(payload)}")
+        total, offset = HISTORY_HEADER.unpack_from(payload)
+        values = [None if raw == HISTORY_GAP else raw / HISTORY_SCALE for raw in payload[HISTORY_HEADER.size:]]
+        samples = [tuple(values[i:i + HISTORY_SAMPLE_SIZE]) for i in range(0, len(values), HISTORY_SAMPLE_SIZE)]
+        return {'history_total': total, 'history_offset': offset, 'history': samples}
+    
+    raise FrameError(f"Unbekannter Frame-Typ 0x{frame_type:02X}")
+
+
+def decode_frame(frame):
+    """
+    Dekodiert genau einen Binär-Frame
+    
+    Args:
+        frame: bytes inkl. Sync-Header und CRC
+    
+    Returns:
+        dict: System-Daten
+    """
+    if len(frame) < HEADER_SIZE + CRC_SIZE or frame[:2] != SYNC:
+        raise FrameError("Kein gültiger Frame-Anfang")
+    frame_type, length = frame[2], frame[3]
+    if len(frame) != HEADER_SIZE + length + CRC_SIZE:
+        raise FrameError("Frame-Länge stimmt nicht")
+    body = frame[2:HEADER_SIZE + length]
+    (crc,) = struct.unpack_from('<H', frame, HEADER_SIZE + length)
+    if crc != crc16(body):
+        raise FrameError("CRC-Fehler")
+    return decode_payload(frame_type, body[2:])
+
+
+class FrameDecoder:
+    """
+    Stream-Decoder für Binär-Frames (wie der Parser auf dem ESP32)
+    Synchronisiert sich nach beschädigten Frames selbst wieder.
+    """
+    
+    def __init__(self):
+        self.buffer = bytearray()
+        self.errors = 0
+    
+    def feed(self, data):
+        """
+        Verarbeitet empfangene Bytes
+        
+        Args:
+            data: Neue Bytes vom Stream
+        
+        Returns:
+            list: Dekodierte Frames als (frame_type, dict)
+        """
+        self.buffer += data
+        frames = []
+        
+        while True:
+            start = self.buffer.find(SYNC)
+            if start < 0:
+                # Letztes Byte könnte der Anfang eines Sync-Headers sein
+                del self.buffer[:max(0, len(self.buffer) - 1)]
+                return frames
+            del self.buffer[:start]
+            if len(self.buffer) < HEADER_SIZE:
+                return frames
+            
+            frame_type, length = self.buffer[2], self.buffer[3]
+            total = HEADER_SIZE + length + CRC_SIZE
+            if length > MAX_PAYLOAD:
+                self.errors += 1
+                del self.buffer[:1]
+                continue
+            if len(self.buffer) < total:
+                return frames
+            
+            frame = bytes(self.buffer[:total])
+            try:
+                frames.append((frame_type, decode_frame(frame)))
+                del self.buffer[:total]
+            except FrameError:
+                # Falscher Sync-Treffer oder beschädigt: ein Byte weiter suchen
+                self.errors += 1
+                del self.buffer[:1]
+
+
+def parse_epsilon(spec):
+    """
+    Liest Delta-Schwellwerte von der Kommandozeile
+    
+    Args:
+        spec: Eine Zahl für alle Felder ('0.5') oder Paare ('cpu_temp=0.5,cpu_fan=100')
+    
+    Returns:
+        dict: Schwellwert pro Feld
+    """
+    epsilon = dict(DEFAULT_EPSILON)
+    if not spec:
+        return epsilon
+    if '=' not in spec:
+        value = float(spec)
+        return {name: value for name in epsilon}
+    for pair in spec.split(','):
+        name, value = pair.split('=', 1)
+        name = name.strip()
+        if name not in epsilon:
+            raise ValueError(f"Unbekanntes Feld: {name}")
+        epsilon[name] = float(value)
+    return epsilon
+
+
+class FrameEncoder:
+    """
+    Kodiert Frames für das Display (JSON oder binär, optional als Delta)
+    
+    Im Delta-Modus werden nur Felder gesendet, die sich seit dem zuletzt
+    gesendeten Wert um mehr als epsilon geändert haben. Alle keyframe_interval
+    Ticks, nach reset() (z.B. Reconnect) und spätestens nach heartbeat Sekunden
+    ohne Frame wird ein vollständiger Keyframe gesendet. Leere Frames werden
+    unterdrückt (encode liefert None).
+    """
+    
+    def __init__(self, binary=False, delta=False, epsilon=None, keyframe_interval=30, heartbeat=2.0,
+                 extended=False, partial=False, delta_frames=False):
+        """
+        Args:
+            binary: Binär-Frames statt JSON
+            delta: Delta-Modus aktivieren
+            epsilon: Schwellwert pro Feld (dict) oder None für DEFAULT_EPSILON
+            keyframe_interval: Keyframe alle N Ticks
+            heartbeat: Maximale Zeit ohne Frame in Sekunden (unter DATA_TIMEOUT der Firmware)
+            extended: Aggregat-Felder binär mitsenden (Display mit CAP_AGGREGATE)
+            partial: Frames enthalten nur eine Teilmenge der Felder - binäre Keyframes
+                     werden dann als Delta-Frame mit allen vorhandenen Feldern gesendet
+                     (Display mit CAP_DELTA), statt fehlende Felder mit 0 zu überschreiben
+            delta_frames: Display nimmt Delta-Frames an (CAP_DELTA) - binäre Keyframes,
+                          denen Felder fehlen (z.B. Quelle per Plugin ersetzt), gehen
+                          dann ebenfalls als Delta-Frame statt mit 0 hinaus
+        """
+        self.binary = binary
+        self.partial = partial
+        self.delta_frames = delta_frames or partial
+        self.extended = extended
+        self.delta = delta
+        self.epsilon = epsilon or dict(DEFAULT_EPSILON)
+        self.keyframe_interval = keyframe_interval
+        self.heartbeat = heartbeat
+        # Binär übertragbare Felder: Änderungen an anderen Feldern (cpu_cores,
+        # gpu_count, fleet_*, ...) ergäben einen Delta-Frame mit leerer Bitmaske
+        count = len(FIELDS) if extended else BASE_FIELD_COUNT
+        self._wire_fields = frozenset(name for name, _, _ in FIELDS[:count]) if binary else None
+        
+        self.frames = 0
+        self.keyframes = 0
+        self.suppressed = 0
+        self.bytes_sent = 0
+        
+        self._last_sent = {}
+        self._ticks_since_keyframe = 0
+        self._last_frame_time = None
+        self._force_keyframe = True
+    
+    def reset(self):
+        """Erzwingt beim nächsten Frame einen Keyframe (z.B. nach Reconnect)"""
+        self._force_keyframe = True
+    
+    def _changes(self, data):
+        changes = {}
+        for name, value in data.items():
+            last = self._last_sent.get(name)
+            if isinstance(value, (int, float)) and isinstance(last, (int, float)):
+                changed = abs(value - last) > self.epsilon.get(name, 0)
+            else:
+                changed = value != last
+            if changed:
+                changes[name] = value
+        return changes
+    
+    def encode(self, data, now=None):
+        """
+        Kodiert einen Frame
+        
+        Args:
+            data: dict wie von SystemMonitor.get_system_data
+            now: Zeitpunkt in Sekunden für den Heartbeat (default: time.monotonic())
+        
+        Returns:
+            bytes: Zu sendende Daten oder None, falls der Frame unterdrückt wird
+        """
+        if now is None:
+            now = time.monotonic()
+        self._ticks_since_keyframe += 1
+        
+        keyframe = (not self.delta
+                    or self._force_keyframe
+                    or self._ticks_since_keyframe >= self.keyframe_interval
+                    or self._last_frame_time is None
+                    or now - self._last_frame_time >= self.heartbeat)
+        
+        if keyframe:
+            changes = data
+        else:
+            changes = self._changes(data)
+            if self._wire_fields is not None:
+                changes = {name: value for name, value in changes.items() if name in self._wire_fields}
+            if not changes:
+                self.suppressed += 1
+                return None
+        
+        if self.binary:
+            complete = not self.delta_frames or all(name in changes for name in BASE_FIELD_NAMES)
+            if keyframe and not self.partial and complete:
+                payload = encode_frame(changes, self.extended)
+            else:
+                payload = encode_delta_frame(changes, self.extended)
+        else:
+            payload = encode_json(changes)
+        
+        if keyframe:
+            self.keyframes += 1
+            self._ticks_since_keyframe = 0
+            self._force_keyframe = False
+            self._last_sent = dict(data)
+        else:
+            self._last_sent.update(changes)
+        self._last_frame_time = now
+        self.frames += 1
+        self.bytes_sent += len(payload)
+        return payload
+
+
+# Test-Funktion (Round-Trip)
+if __name__ == '__main__':
+    samples = [
+        {'cpu_temp': 55.3, 'cpu_usage': 42.5, 'cpu_fan': 1800,
+         'gpu_temp': 68.0, 'gpu_usage': 85.2, 'gpu_fan': 2400, 'ram_usage': 67.8},
+        {'cpu_temp': 0.0, 'cpu_usage': 0.0, 'cpu_fan': 0,
+         'gpu_temp': 0.0, 'gpu_usage': 0.0, 'gpu_fan': 0, 'ram_usage': 0.0},
+        {'cpu_temp': -12.5, 'cpu_usage': 100.0, 'cpu_fan': 65535,
+         'gpu_temp': 110.9, 'gpu_usage': 100.0, 'gpu_fan': 4100, 'ram_usage': 99.9},
+    ]
+    
+    print("Teste Binär-Protokoll...")
+    for sample in samples:
+        frame = encode_frame(sample)
+        assert decode_frame(frame) == sample, (decode_frame(frame), sample)
+        print(f"  ✓ {len(encode_json(sample)):3d} Bytes JSON → {len(frame):2d} Bytes binär")
+    
+    # Stream mit Störbytes, gestückelt und mit beschädigtem Frame
+    stream = b'noise\n' + encode_frame(samples[0])
+    broken = bytearray(encode_frame(samples[1]))
+    broken[6] ^= 0xFF
+    stream += bytes(broken) + b'\xA5' + encode_frame(samples[2])
+    decoder = FrameDecoder()
+    decoded = []
+    for i in range(0, len(stream), 3):
+        decoded += [data for _, data in decoder.feed(stream[i:i + 3])]
+    assert decoded == [samples[0], samples[2]], decoded
+    print(f"  ✓ Stream-Decoder resynchronisiert ({decoder.errors} verworfene Bytes)")
+    
+    # Delta-Frames
+    for changes in ({'cpu_temp': 56.1}, {'gpu_fan': 2500, 'ram_usage': 12.3}, dict(samples[0])):
+        frame = encode_delta_frame(changes)
+        assert decode_frame(frame) == changes, (decode_frame(frame), changes)
+    print(f"  ✓ Delta-Frames ({len(encode_delta_frame({'cpu_temp': 56.1}))} Bytes für ein Feld)")
+    
+    # Aggregat-Felder
+    extended = dict(samples[0], cpu_usage_min=12.0, cpu_usage_max=97.5)
+    assert decode_frame(encode_frame(extended, extended=True)) == extended
+    assert decode_frame(encode_frame(extended)) == samples[0]
+    changes = {'cpu_usage_max': 97.5}
+    assert decode_frame(encode_delta_frame(changes, extended=True)) == changes
+    assert decode_frame(encode_delta_frame(changes)) == {}
+    print(f"  ✓ Aggregat-Felder ({len(encode_frame(extended, extended=True))} Bytes)")
+    
+    encoder = FrameEncoder(binary=True, delta=True, keyframe_interval=3, heartbeat=60)
+    state = {}
+    frames = [encoder.encode(dict(samples[0], cpu_temp=55.3 + i * 0.3)) for i in range(6)]
+    for frame in filter(None, frames):
+        state.update(decode_frame(frame))
+    assert frames[1] is None and frames[3] is not None, frames
+    assert abs(state['cpu_temp'] - 55.3 - 5 * 0.3) < 0.05, state
+    print(f"  ✓ Delta-Encoder ({encoder.keyframes} Keyframes, {encoder.suppressed} unterdrückt)")
+    
+    # Nur nicht übertragbare Felder geändert: binär unterdrückt statt leerer Bitmaske
+    encoder = FrameEncoder(binary=True, delta=True, heartbeat=60)
+    encoder.encode(dict(samples[0], cpu_cores=[10.0, 20.0]))
+    assert encoder.encode(dict(samples[0], cpu_cores=[90.0, 5.0], gpu_count=2)) is None
+    assert encoder.suppressed == 1 and encoder.frames == 1
+    print("  ✓ Änderungen nur an nicht übertragbaren Feldern unterdrückt")
+    
+    # Keyframe ohne cpu_fan (Quelle ersetzt): mit DELTA1 als Delta-Frame, Wert bleibt unberührt
+    incomplete = {name: value for name, value in samples[0].items() if name != 'cpu_fan'}
+    frame = FrameEncoder(binary=True, delta_frames=True).encode(incomplete)
+    assert frame[2] == FRAME_TYPE_DELTA and decode_frame(frame) == incomplete, decode_frame(frame)
+    assert FrameEncoder(binary=True, delta_frames=True).encode(samples[0])[2] == FRAME_TYPE_DATA
+    print("  ✓ Keyframe mit fehlenden Feldern als Delta-Frame")
+    
+    assert parse_capabilities("USB_DISPLAY BIN1\r\n") == {CAP_BINARY}
+    assert parse_capabilities("USB_DISPLAY\r\n") == set()
+    print("  ✓ Capability-Erkennung")
+    
+    history = [(i % 100, 99.5, None, 0.0) if i % 7 else None for i in range(HISTORY_SLOTS)]
+    decoder = FrameDecoder()
+    received = []
+    for frame_type, data in decoder.feed(b''.join(encode_history_frames(history))):
+        assert frame_type == FRAME_TYPE_HISTORY and data['history_offset'] == len(received)
+        received += data['history']
+    assert received == [sample or (None,) * HISTORY_SAMPLE_SIZE for sample in history], received[:8]
+    print(f"  ✓ Verlaufs-Frames ({len(encode_history_frames(history))} Frames für {HISTORY_SLOTS} s)")
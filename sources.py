@@ -0,0 +1,157 @@
+"""
+Registry der Datenquellen für den PC System Monitor
+Jede Quelle deklariert ihre Kosten und ihre Abfrage-Periode und läuft in einem
+eigenen Collector-Thread der Pipeline. Ihr letzter Wert bleibt im Cache
+(LatestValueStore) für ttl Sekunden gültig: Teure oder langsam veränderliche
+Quellen wie Lüfter-Drehzahlen oder GPUtil (nvidia-smi pro Abfrage) werden so
+seltener abgefragt als die CPU-Last. Der Frame wird trotzdem in jedem Takt aus
+dem Cache zusammengesetzt.
+
+Eigene Quellen registrieren sich in einem Modul, das mit --plugin geladen wird:
+
+    # wasserkuehlung.py
+    from sources import register_source
+    
+    def read_water_temp(monitor):
+        return {'water_temp': 31.5}
+    
+    register_source('water', read_water_temp, period=5.0, cost='medium')
+    
+    python pc_monitor.py --plugin wasserkuehlung.py
+"""
+
+import importlib
+import importlib.util
+import os
+from collections import namedtuple
+
+# Kosten einer Abfrage -> Mindest-Periode in Sekunden, falls die Quelle keine eigene angibt
+# (low: jeder Sende-Takt, medium: z.B. psutil-Sensor-Scan, high: Subprozess pro Abfrage)
+COST_PERIODS = {'low': 0.0, 'medium': 2.0, 'high': 5.0}
+
+# Datenquelle (Felder und Defaults siehe register_source)
+MetricSource = namedtuple('MetricSource', ['name', 'collect', 'period', 'ttl', 'cost', 'required',
+                                           'defer_to', 'enabled'],
+                          defaults=(None, None, 'low', False, None, None))
+
+# Name -> MetricSource, in Registrierungs-Reihenfolge (= Reihenfolge der Felder im Frame)
+_registry = {}
+
+
+def register_source(name, collect, period=None, ttl=None, cost='low', required=False, defer_to=None,
+                    enabled=None):
+    """
+    Registriert eine Datenquelle (gleicher Name ersetzt die bisherige Quelle an
+    ihrer Position)
+    
+    Args:
+        name: Name der Quelle (Schlüssel im Cache, Telemetrie: sources.<name>)
+        collect: Callable(monitor) -> dict mit Frame-Feldern oder None (kein neuer Wert)
+        period: Abfrage-Periode in Sekunden (None = Sende-Intervall, bei cost
+                'medium'/'high' mindestens COST_PERIODS[cost])
+        ttl: Gültigkeit eines Werts in Sekunden (None = 2 Perioden, mindestens 2 s)
+        cost: 'low', 'medium', 'high' oder Callable(monitor) -> Kosten, falls sie
+              vom Backend abhängen (wird bei jeder Abfrage neu ausgewertet)
+        required: Ohne gültigen Wert dieser Quelle wird kein Frame gesendet
+        defer_to: Name einer zuvor registrierten Quelle, die dieselben Felder
+                  vollständiger liefert (z.B. 'lhm'): solange deren Wert gültig
+                  ist und alle Felder dieser Quelle enthält, pausiert diese
+                  Quelle (sonst ergänzt sie nur die fehlenden Felder)
+        enabled: Callable(monitor) -> bool, ob die Quelle auf diesem System läuft
+                 (None = immer)
+    
+    Returns:
+        MetricSource: Registrierte Quelle
+    
+    Raises:
+        ValueError: Unbekannte Kosten
+    """
+    if not callable(cost) and cost not in COST_PERIODS:
+        raise ValueError(f"Unbekannte Kosten '{cost}' (erlaubt: {', '.join(COST_PERIODS)})")
+    source = MetricSource(name, collect, period, ttl, cost, required, defer_to, enabled)
+    _registry[name] = source
+    return source
+
+
+def unregister_source(name):
+    """
+    Entfernt eine Datenquelle (z.B. eine eingebaute, die ein Plugin ersetzt)
+    Liefert der Ersatz nicht alle Felder der entfernten Quelle, fehlen diese im
+    Frame: JSON sendet sie nicht, binär bleiben sie auf Displays mit DELTA1
+    unverändert (sonst 0).
+    """
+    _registry.pop(name, None)
+
+
+def registered_sources():
+    """
+    Returns:
+        list: Alle registrierten MetricSource in Registrierungs-Reihenfolge
+    """
+    return list(_registry.values())
+
+
+def source_cost(source, monitor):
+    """Kosten einer Quelle ('low', 'medium' oder 'high')"""
+    return source.cost(monitor) if callable(source.cost) else source.cost
+
+
+def source_period(source, interval, monitor):
+    """Abfrage-Periode einer Quelle in Sekunden beim Sende-Intervall interval"""
+    if source.period is not None:
+        return source.period
+    return max(interval, COST_PERIODS.get(source_cost(source, monitor), 0.0))
+
+
+def source_ttl(source, interval, monitor):
+    """Gültigkeit eines Werts der Quelle in Sekunden"""
+    if source.ttl is not None:
+        return source.ttl
+    return max(2 * source_period(source, interval, monitor), 2.0)
+
+
+def load_plugin(spec):
+    """
+    Lädt ein Plugin-Modul, das beim Import eigene Quellen registriert
+    
+    Args:
+        spec: Modulname ('meine_sensoren') oder Pfad zu einer .py-Datei
+    
+    Returns:
+        module: Geladenes Modul
+    
+    Raises:
+        ImportError: Modul nicht gefunden oder fehlerhaft
+    """
+    if not spec.endswith('.py'):
+        return importlib.import_module(spec)
+    if not os.path.exists(spec):
+        raise ImportError(f"Datei nicht gefunden: {spec}")
+    name = os.path.splitext(os.path.basename(spec))[0]
+    module_spec = importlib.util.spec_from_file_location(name, spec)
+    module = importlib.util.module_from_spec(module_spec)
+    module_spec.loader.exec_module(module)
+    return module
+
+
+# Test-Funktion
+if __name__ == '__main__':
+    print("Teste Quellen-Registry...")
+    register_source('cheap', lambda monitor: {'a': 1})
+    register_source('fan', lambda monitor: {'b': 2}, cost='medium')
+    register_source('smi', lambda monitor: {'c': 3}, cost=lambda monitor: 'high', ttl=30.0)
+    
+    periods = {s.name: (source_period(s, 0.5, None), source_ttl(s, 0.5, None)) for s in registered_sources()}
+    assert periods == {'cheap': (0.5, 2.0), 'fan': (2.0, 4.0), 'smi': (5.0, 30.0)}, periods
+    print(f"  ✓ Periode/TTL bei 0.5 s Sende-Intervall: {periods}")
+    
+    register_source('cheap', lambda monitor: {'a': 2}, period=0.1)
+    assert [s.name for s in registered_sources()] == ['cheap', 'fan', 'smi']
+    assert source_period(registered_sources()[0], 0.5, None) == 0.1
+    print("  ✓ Erneute Registrierung ersetzt die Quelle")
+    
+    try:
+        register_source('bad', lambda monitor: None, cost='teuer')
+        raise AssertionError("ValueError erwartet")
+    except ValueError as e:
+        print(f"  ✓ {e}")
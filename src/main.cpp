@@ -15,6 +15,9 @@ struct SystemData {
   float cpuUsage = 0.0;
   float gpuUsage = 0.0;
   float ramUsage = 0.0;
+  float cpuUsageMin = 0.0;  // min/max seit dem letzten Frame (High-Rate Sampling am PC)
+  float cpuUsageMax = 0.0;
+  bool hasAggregates = false;
   unsigned long lastUpdate = 0;
   bool firstDataReceived = false;
 } sysData;
@@ -34,10 +37,15 @@ float wavePhase = 0.0;
 #define HISTORY_SIZE 320
 float cpuHistory[HISTORY_SIZE];
 float gpuHistory[HISTORY_SIZE];
+float cpuPeakHistory[HISTORY_SIZE];  // Spitzenwert pro History-Intervall
+float gpuPeakHistory[HISTORY_SIZE];
+float cpuPeak = 0.0;  // Spitzen seit dem letzten History-Update
+float gpuPeak = 0.0;
 int historyIndex = 0;
 unsigned long lastHistoryUpdate = 0;
 #define HISTORY_UPDATE_INTERVAL 1000  // Alle 1 Sekunde neuer Wert
 unsigned long lastHistogramDraw = 0;
+bool historyRestored = false;  // Verlauf vom PC nachgeladen: Histogramm sofort neu zeichnen
 #define HISTOGRAM_DRAW_INTERVAL 5000  // Alle 5 Sekunden neu zeichnen
 
 #define SCREEN_WIDTH 320
@@ -54,10 +62,35 @@ unsigned long lastHistogramDraw = 0;
 #define COLOR_WARN 0xFD20
 #define COLOR_CRIT 0xF800
 #define COLOR_BAR_BG 0x2104
+#define COLOR_PEAK 0x4208  // Gedimmt für Spitzenwerte
 
 unsigned long lastDataReceived = 0;
 #define DATA_TIMEOUT 5000
 
+// Serial-Protokoll (siehe serial_protocol.py)
+#define DISPLAY_CAPABILITIES "BIN1 DELTA1 AGG1 ACK1 PING1 HIST1"  // Wird in der IDENTIFY-Antwort angeboten
+#define FRAME_SYNC1 0xA5
+#define FRAME_SYNC2 0x5A
+#define FRAME_TYPE_DATA 0x01
+#define FRAME_TYPE_DELTA 0x02
+#define FRAME_TYPE_HISTORY 0x03
+#define HISTORY_SAMPLE_SIZE 4  // CPU-Last, CPU-Spitze, GPU-Last, GPU-Spitze in 0.5 %
+#define HISTORY_GAP 0xFF       // Sekunde ohne Werte
+#define FRAME_MAX_PAYLOAD 250
+#define BASE_FIELD_COUNT 7
+#define DATA_FIELD_COUNT 9  // inkl. Aggregat-Felder cpu_usage_min/max
+#define BASE_PAYLOAD_SIZE (BASE_FIELD_COUNT * 2)
+#define DATA_PAYLOAD_SIZE (DATA_FIELD_COUNT * 2)
+#define LINE_BUFFER_SIZE 512  // JSON-Zeile inkl. Arrays (gpus, cpu_cores)
+
+enum RxState { RX_IDLE, RX_SYNC, RX_TYPE, RX_LENGTH, RX_PAYLOAD, RX_CRC };
+RxState rxState = RX_IDLE;
+char lineBuffer[LINE_BUFFER_SIZE];
+size_t lineLength = 0;
+uint8_t frameBuffer[FRAME_MAX_PAYLOAD + 4];  // Typ, Länge, Payload, CRC
+size_t frameLength = 0;
+bool ackMode = false;  // "ACK ON": nach jedem verarbeiteten Frame "ACK" senden (Flow Control)
+
 void drawStaticLayout() {
   tft.fillRect(0, HEADER_HEIGHT, SCREEN_WIDTH, SCREEN_HEIGHT - HEADER_HEIGHT, COLOR_BG);
   tft.setTextColor(COLOR_LABEL);
@@ -85,6 +118,7 @@ void drawStaticLayout() {
 }
 
 void setup() {
+  Serial.setRxBufferSize(2048);  // Platz für JSON-Zeilen und den Verlauf-Backfill (~1.4 KB), während gezeichnet wird
   Serial.begin(115200);
   tft.init();
   tft.setRotation(3);  // 270° - um 180° gedreht gegenüber vorher (war 1 = 90°)
@@ -117,6 +151,8 @@ void setup() {
   for (int i = 0; i < HISTORY_SIZE; i++) {
     cpuHistory[i] = 0.0;
     gpuHistory[i] = 0.0;
+    cpuPeakHistory[i] = 0.0;
+    gpuPeakHistory[i] = 0.0;
   }
 }
 
@@ -264,10 +300,16 @@ void drawWaveVisualization() {
   
   // CPU Wave im Sprite zeichnen (obere Hälfte) - relativ zur Sprite-Größe
   uint16_t cpuColor = (sysData.cpuUsage > 90) ? COLOR_CRIT : (sysData.cpuUsage > 70) ? COLOR_WARN : 0x07FF;
+  float cpuPeakAmp = (sysData.hasAggregates ? sysData.cpuUsageMax : sysData.cpuUsage) / 100.0 * maxWaveHeight;
   for (int x = 0; x < SCREEN_WIDTH; x++) {
     float cpuAmp = (sysData.cpuUsage / 100.0) * maxWaveHeight;
     float amplitude = (cpuAmp < 3.0) ? 3.0 : cpuAmp;  // Minimum 3px für Sichtbarkeit
     float freq = 0.05 + (sysData.cpuTemp / 200.0);
+    // Hüllkurve mit der Spitzenlast seit dem letzten Frame
+    if (cpuPeakAmp > amplitude) {
+      int peakY = 25 + (int)(sin((x * freq) + wavePhase) * cpuPeakAmp);
+      waveSprite.drawFastVLine(x, peakY, 1, COLOR_PEAK);
+    }
     float y = sin((x * freq) + wavePhase) * amplitude;
     int py = 25 + (int)y;  // CPU bei y=25 (25±20 = 5-45, passt ins Sprite)
     waveSprite.drawFastVLine(x, py - 2, 5, cpuColor);
@@ -296,10 +338,11 @@ void drawHistogram() {
   int graphHeight = 80;  // Höhe pro Graph
   
   // Nur alle 5 Sekunden neu zeichnen
-  if (!firstDraw && millis() - lastHistogramDraw < HISTOGRAM_DRAW_INTERVAL) {
+  if (!firstDraw && !historyRestored && millis() - lastHistogramDraw < HISTOGRAM_DRAW_INTERVAL) {
     return;
   }
   lastHistogramDraw = millis();
+  historyRestored = false;
   
   // Hintergrund löschen
   tft.fillRect(0, startY, SCREEN_WIDTH, height, COLOR_BG);
@@ -321,22 +364,30 @@ void drawHistogram() {
   tft.setTextColor(COLOR_GOOD);  // Grün
   tft.drawString("GPU", 5, gpuStartY - 15, 2);
   
-  // Zeichne CPU-Histogramm
+  // Zeichne CPU-Histogramm (Spitzenwert gedimmt hinter dem Mittelwert)
   for (int x = 0; x < SCREEN_WIDTH; x++) {
     int idx = (historyIndex + x) % HISTORY_SIZE;
     float value = cpuHistory[idx];
     int barHeight = (int)((value / 100.0) * graphHeight);
+    int peakHeight = (int)((cpuPeakHistory[idx] / 100.0) * graphHeight);
+    if (peakHeight > barHeight) {
+      tft.drawFastVLine(x, cpuStartY + graphHeight - peakHeight, peakHeight - barHeight, COLOR_PEAK);
+    }
     if (barHeight > 0) {
       uint16_t color = (value > 90) ? COLOR_CRIT : (value > 70) ? COLOR_WARN : 0x07FF;
       tft.drawFastVLine(x, cpuStartY + graphHeight - barHeight, barHeight, color);
     }
   }
   
-  // Zeichne GPU-Histogramm
+  // Zeichne GPU-Histogramm (Spitzenwert gedimmt hinter dem Mittelwert)
   for (int x = 0; x < SCREEN_WIDTH; x++) {
     int idx = (historyIndex + x) % HISTORY_SIZE;
     float value = gpuHistory[idx];
     int barHeight = (int)((value / 100.0) * graphHeight);
+    int peakHeight = (int)((gpuPeakHistory[idx] / 100.0) * graphHeight);
+    if (peakHeight > barHeight) {
+      tft.drawFastVLine(x, gpuStartY + graphHeight - peakHeight, peakHeight - barHeight, COLOR_PEAK);
+    }
     if (barHeight > 0) {
       uint16_t color = (value > 90) ? COLOR_CRIT : (value > 70) ? COLOR_WARN : COLOR_GOOD;
       tft.drawFastVLine(x, gpuStartY + graphHeight - barHeight, barHeight, color);
@@ -354,31 +405,29 @@ void drawHistogram() {
   firstDraw = false;
 }
 
-void parseSerialData(String data) {
-  JsonDocument doc;
-  DeserializationError error = deserializeJson(doc, data);
-  if (error) {
-    return;
-  }
+// Gemeinsame Verarbeitung nach jedem empfangenen Datensatz (JSON oder binär)
+void onDataReceived() {
   if (!sysData.firstDataReceived) {
     drawStaticLayout();
     sysData.firstDataReceived = true;
     lastModeSwitch = millis();  // Initialisiere Mode-Timer beim ersten Datenempfang
   }
-  sysData.cpuTemp = doc["cpu_temp"] | 0.0;
-  sysData.gpuTemp = doc["gpu_temp"] | 0.0;
-  sysData.cpuFanSpeed = doc["cpu_fan"] | 0;
-  sysData.gpuFanSpeed = doc["gpu_fan"] | 0;
-  sysData.cpuUsage = doc["cpu_usage"] | 0.0;
-  sysData.gpuUsage = doc["gpu_usage"] | 0.0;
-  sysData.ramUsage = doc["ram_usage"] | 0.0;
   lastDataReceived = millis();
   sysData.lastUpdate = millis();
   
+  // Spitzen seit dem letzten History-Update merken
+  float cpuMax = sysData.hasAggregates ? sysData.cpuUsageMax : sysData.cpuUsage;
+  if (cpuMax > cpuPeak) cpuPeak = cpuMax;
+  if (sysData.gpuUsage > gpuPeak) gpuPeak = sysData.gpuUsage;
+  
   // History-Update (alle 1 Sekunde)
   if (millis() - lastHistoryUpdate >= HISTORY_UPDATE_INTERVAL) {
     cpuHistory[historyIndex] = sysData.cpuUsage;
     gpuHistory[historyIndex] = sysData.gpuUsage;
+    cpuPeakHistory[historyIndex] = cpuPeak;
+    gpuPeakHistory[historyIndex] = gpuPeak;
+    cpuPeak = 0.0;
+    gpuPeak = 0.0;
     historyIndex = (historyIndex + 1) % HISTORY_SIZE;
     lastHistoryUpdate = millis();
   }
@@ -388,25 +437,206 @@ void parseSerialData(String data) {
   if (displayMode == DISPLAY_MODE_NORMAL) {
     updateDisplay();
   }
+  
+  // Credit an den PC zurückgeben, erst nach dem Zeichnen
+  if (ackMode) {
+    Serial.println("ACK");
+  }
+}
+
+void parseSerialData(const char* data, size_t length) {
+  JsonDocument doc;
+  DeserializationError error = deserializeJson(doc, data, length);
+  if (error) {
+    return;
+  }
+  // Fehlende Felder behalten ihren Wert (Delta-Modus sendet nur Änderungen)
+  sysData.cpuTemp = doc["cpu_temp"] | sysData.cpuTemp;
+  sysData.gpuTemp = doc["gpu_temp"] | sysData.gpuTemp;
+  sysData.cpuFanSpeed = doc["cpu_fan"] | sysData.cpuFanSpeed;
+  sysData.gpuFanSpeed = doc["gpu_fan"] | sysData.gpuFanSpeed;
+  sysData.cpuUsage = doc["cpu_usage"] | sysData.cpuUsage;
+  sysData.gpuUsage = doc["gpu_usage"] | sysData.gpuUsage;
+  sysData.ramUsage = doc["ram_usage"] | sysData.ramUsage;
+  if (!doc["cpu_usage_min"].isNull() || !doc["cpu_usage_max"].isNull()) {
+    sysData.cpuUsageMin = doc["cpu_usage_min"] | sysData.cpuUsageMin;
+    sysData.cpuUsageMax = doc["cpu_usage_max"] | sysData.cpuUsageMax;
+    sysData.hasAggregates = true;
+  }
+  onDataReceived();
+}
+
+// Little-Endian Helfer für Binär-Frames
+int16_t readInt16(const uint8_t* p) { return (int16_t)(p[0] | (p[1] << 8)); }
+uint16_t readUInt16(const uint8_t* p) { return (uint16_t)(p[0] | (p[1] << 8)); }
+
+// CRC16-CCITT (Poly 0x1021, Init 0xFFFF) - identisch zu serial_protocol.py
+uint16_t crc16(const uint8_t* data, size_t length) {
+  uint16_t crc = 0xFFFF;
+  for (size_t i = 0; i < length; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (int bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+// Setzt ein Feld aus dem Binär-Payload (Index = Position in FIELDS, serial_protocol.py)
+void applyField(uint8_t index, const uint8_t* p) {
+  switch (index) {
+    case 0: sysData.cpuTemp = readInt16(p) / 10.0; break;
+    case 1: sysData.cpuUsage = readUInt16(p) / 10.0; break;
+    case 2: sysData.cpuFanSpeed = readUInt16(p); break;
+    case 3: sysData.gpuTemp = readInt16(p) / 10.0; break;
+    case 4: sysData.gpuUsage = readUInt16(p) / 10.0; break;
+    case 5: sysData.gpuFanSpeed = readUInt16(p); break;
+    case 6: sysData.ramUsage = readUInt16(p) / 10.0; break;
+    case 7: sysData.cpuUsageMin = readUInt16(p) / 10.0; sysData.hasAggregates = true; break;
+    case 8: sysData.cpuUsageMax = readUInt16(p) / 10.0; sysData.hasAggregates = true; break;
+  }
+}
+
+void handleBinaryFrame(uint8_t type, const uint8_t* payload, uint8_t length) {
+  if (type == FRAME_TYPE_DATA && (length == BASE_PAYLOAD_SIZE || length == DATA_PAYLOAD_SIZE)) {
+    // Basis-Felder, optional gefolgt von den Aggregat-Feldern
+    for (uint8_t i = 0; i < length / 2; i++) {
+      applyField(i, payload + i * 2);
+    }
+    onDataReceived();
+  } else if (type == FRAME_TYPE_DELTA && length >= 2) {
+    // 16-Bit-Bitmaske + nur die geänderten Felder
+    uint16_t mask = readUInt16(payload);
+    uint8_t offset = 2;
+    for (uint8_t i = 0; i < DATA_FIELD_COUNT; i++) {
+      if (mask & (1 << i)) {
+        if (offset + 2 > length) return;
+        applyField(i, payload + offset);
+        offset += 2;
+      }
+    }
+    onDataReceived();
+  } else if (type == FRAME_TYPE_HISTORY && length >= 4 && (length - 4) % HISTORY_SAMPLE_SIZE == 0) {
+    // Verlauf vom PC (nach Reconnect): Gesamtzahl, Offset, dann Einträge, ältester zuerst.
+    // Der letzte Eintrag landet direkt vor historyIndex (nächster Schreibplatz).
+    uint16_t total = readUInt16(payload);
+    uint16_t offset = readUInt16(payload + 2);
+    uint8_t count = (length - 4) / HISTORY_SAMPLE_SIZE;
+    if (total > HISTORY_SIZE) {
+      // Nur die neuesten HISTORY_SIZE Einträge passen
+      uint16_t skip = total - HISTORY_SIZE;
+      if (offset + count <= skip) return;
+      total = HISTORY_SIZE;
+      if (offset < skip) {
+        payload += (skip - offset) * HISTORY_SAMPLE_SIZE;
+        count -= skip - offset;
+        offset = 0;
+      } else {
+        offset -= skip;
+      }
+    }
+    if (offset + count > total) return;
+    for (uint8_t j = 0; j < count; j++) {
+      const uint8_t* sample = payload + 4 + j * HISTORY_SAMPLE_SIZE;
+      int idx = (historyIndex - total + offset + j + HISTORY_SIZE) % HISTORY_SIZE;
+      cpuHistory[idx] = sample[0] == HISTORY_GAP ? 0.0 : sample[0] / 2.0;
+      cpuPeakHistory[idx] = sample[1] == HISTORY_GAP ? 0.0 : sample[1] / 2.0;
+      gpuHistory[idx] = sample[2] == HISTORY_GAP ? 0.0 : sample[2] / 2.0;
+      gpuPeakHistory[idx] = sample[3] == HISTORY_GAP ? 0.0 : sample[3] / 2.0;
+    }
+    if (offset + count == total) {
+      // Nächster eigener Eintrag erst eine Sekunde nach dem letzten nachgeladenen
+      lastHistoryUpdate = millis();
+      historyRestored = true;
+    }
+    // Kein ACK: Verlaufs-Frames sind keine Daten-Frames
+  }
 }
 
-void handleSerialCommand(String data) {
-  data.trim();
-  if (data == "IDENTIFY") {
-    Serial.println("USB_DISPLAY");
+// Arbeitet direkt auf dem Zeilenpuffer, ohne String-Kopie pro Frame
+void handleSerialCommand(char* data, size_t length) {
+  while (length > 0 && isspace((unsigned char)*data)) {
+    data++;
+    length--;
+  }
+  while (length > 0 && isspace((unsigned char)data[length - 1])) {
+    length--;
+  }
+  data[length] = '\0';
+  if (strcmp(data, "IDENTIFY") == 0) {
+    ackMode = false;  // Neue Sitzung: Flow Control erst nach "ACK ON"
+    Serial.println("USB_DISPLAY " DISPLAY_CAPABILITIES);
     Serial.flush();
     return;
   }
-  if (data.length() > 0 && (data.startsWith("{") || data.indexOf("cpu_temp") > 0)) {
-    parseSerialData(data);
+  if (strcmp(data, "ACK ON") == 0) {
+    ackMode = true;
+    return;
+  }
+  if (strncmp(data, "PING ", 5) == 0) {
+    // Zeitstempel des PCs zurückschicken: alle vorherigen Frames sind dann gezeichnet
+    Serial.print("PONG ");
+    Serial.println(data + 5);
+    return;
+  }
+  if (length > 0 && (data[0] == '{' || strstr(data + 1, "cpu_temp") != nullptr)) {
+    parseSerialData(data, length);
+  }
+}
+
+// Byte-weiser Parser: Textzeilen (IDENTIFY, JSON) und Binär-Frames gemischt
+void processSerialByte(uint8_t b) {
+  switch (rxState) {
+    case RX_IDLE:
+      if (b == FRAME_SYNC1 && lineLength == 0) {
+        rxState = RX_SYNC;
+      } else if (b == '\n') {
+        lineBuffer[lineLength] = '\0';
+        handleSerialCommand(lineBuffer, lineLength);
+        lineLength = 0;
+      } else if (lineLength < LINE_BUFFER_SIZE - 1) {
+        lineBuffer[lineLength++] = (char)b;
+      }
+      break;
+    case RX_SYNC:
+      rxState = (b == FRAME_SYNC2) ? RX_TYPE : RX_IDLE;
+      break;
+    case RX_TYPE:
+      frameBuffer[0] = b;
+      rxState = RX_LENGTH;
+      break;
+    case RX_LENGTH:
+      frameBuffer[1] = b;
+      frameLength = 0;
+      if (b > FRAME_MAX_PAYLOAD) {
+        rxState = RX_IDLE;
+      } else {
+        rxState = (b == 0) ? RX_CRC : RX_PAYLOAD;
+      }
+      break;
+    case RX_PAYLOAD:
+      frameBuffer[2 + frameLength++] = b;
+      if (frameLength == frameBuffer[1]) {
+        rxState = RX_CRC;
+      }
+      break;
+    case RX_CRC:
+      frameBuffer[2 + frameLength++] = b;
+      if (frameLength == (size_t)frameBuffer[1] + 2) {
+        uint16_t received = readUInt16(frameBuffer + 2 + frameBuffer[1]);
+        if (received == crc16(frameBuffer, frameBuffer[1] + 2)) {
+          handleBinaryFrame(frameBuffer[0], frameBuffer + 2, frameBuffer[1]);
+        }
+        rxState = RX_IDLE;
+      }
+      break;
   }
 }
 
 void loop() {
-  // Serial-Daten verarbeiten
-  if (Serial.available()) {
-    String data = Serial.readStringUntil('\n');
-    handleSerialCommand(data);
+  // Serial-Daten verarbeiten (nicht-blockierend, Byte für Byte)
+  while (Serial.available()) {
+    processSerialByte((uint8_t)Serial.read());
   }
   
   // Mode-Wechsel prüfen
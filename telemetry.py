@@ -0,0 +1,196 @@
+"""
+Telemetrie für den PC System Monitor
+Sammelt Laufzeiten pro Datenquelle, Kodier-/Schreibzeit, überholte Frames,
+Bytes/s und die vom Display bestätigte Render-Latenz (PING/PONG) mit
+p50/p95/p99. Ausgabe als JSON-Zeile pro Intervall in eine Datei und/oder über
+einen lokalen HTTP-Endpunkt (nur 127.0.0.1), der auch den Verlauf der
+gesendeten Frames als CSV liefert (/history.csv).
+
+Beispiel:
+    telemetry = Telemetry(monitor, interval=10, log_path='metrics.jsonl', http_port=9108)
+    monitor.run(telemetry=telemetry)
+    # curl http://127.0.0.1:9108/metrics
+    # curl "http://127.0.0.1:9108/history.csv?resolution=60&minutes=1440"
+"""
+
+import json
+import threading
+import time
+
+
+class Telemetry:
+    def __init__(self, monitor, interval=10.0, log_path=None, http_port=None):
+        """
+        Args:
+            monitor: SystemMonitor (Pipeline und Sinks werden bei jeder Abfrage gelesen)
+            interval: Abstand der Log-Zeilen in Sekunden
+            log_path: Datei für JSON-Zeilen (None = kein Log)
+            http_port: Port des lokalen HTTP-Endpunkts (None = aus)
+        """
+        self.monitor = monitor
+        self.interval = interval
+        self.log_path = log_path
+        self.http_port = http_port
+        
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.server = None
+        self._log = None
+        self._started = time.monotonic()
+        self._baseline = (self._started, {})  # (zeitpunkt, bytes pro Port) für Bytes/s
+    
+    def snapshot(self):
+        """
+        Returns:
+            dict: Aktuelle Messwerte (Zeiten in ms, Perzentile über die letzten 1024 Messungen)
+        """
+        now = time.monotonic()
+        since, last_bytes = self._baseline
+        elapsed = max(now - since, 1e-9)
+        snapshot = {
+            'time': round(time.time(), 3),
+            'uptime_s': round(now - self._started, 1),
+            'sources': {},
+        }
+        
+        pipeline = self.monitor.pipeline
+        if pipeline is not None:
+            stats = pipeline.timing_stats()
+            errors = {collector.source: collector.errors for collector in pipeline.collectors}
+            settings = self.monitor.source_settings()
+            for stage, values in stats.items():
+                if stage.startswith('collect.'):
+                    name = stage[len('collect.'):]
+                    snapshot['sources'][name] = dict(values, errors=errors.get(name, 0), **settings.get(name, {}))
+                else:
+                    snapshot[stage] = values
+        
+        snapshot['sinks'] = []
+        for sink in self.monitor.sinks:
+            status = sink.status()
+            status['bytes_per_s'] = round((status['bytes'] - last_bytes.get(sink.port, 0)) / elapsed, 1)
+            snapshot['sinks'].append(status)
+        
+        if self.monitor.scheduler is not None:
+            snapshot['rate'] = self.monitor.scheduler.snapshot()
+        
+        if self.monitor.fleet is not None:
+            snapshot['fleet'] = self.monitor.fleet.status()
+        if self.monitor.agent is not None:
+            snapshot['agent'] = self.monitor.agent.status()
+        
+        snapshot['history'] = self.monitor.history.status()
+        
+        # Alle hwmon-Kanäle (Linux), auch die nicht im Frame gesendeten
+        if self.monitor.hwmon:
+            snapshot['sensors'] = {
+                'temperatures': [reading._asdict() for reading in self.monitor.hwmon.temperatures()],
+                'fans': [reading._asdict() for reading in self.monitor.hwmon.fans()],
+            }
+        return snapshot
+    
+    def report(self):
+        """
+        Schreibt eine Log-Zeile und startet das nächste Bytes/s-Fenster
+        
+        Returns:
+            dict: Geschriebener Snapshot
+        """
+        snapshot = self.snapshot()
+        self._baseline = (time.monotonic(), {sink['port']: sink['bytes'] for sink in snapshot['sinks']})
+        if self._log:
+            self._log.write(json.dumps(snapshot, separators=(',', ':')) + '\n')
+            self._log.flush()
+        return snapshot
+    
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                print(f"⚠ Telemetrie: {e}")
+    
+    def history_csv(self, query):
+        """
+        Verlauf als CSV für /history.csv
+        
+        Args:
+            query: Parameter der URL (parse_qs): resolution (Sekunden pro Zeile,
+                   default 1), minutes (nur die letzten N Minuten, default alles)
+        
+        Returns:
+            str: CSV-Text
+        
+        Raises:
+            ValueError: Ungültige Parameter
+        """
+        import io
+        
+        resolution = int(query.get('resolution', ['1'])[0])
+        if resolution not in self.monitor.history.rings:
+            raise ValueError(f"resolution muss eine von {sorted(self.monitor.history.rings)} sein")
+        start = None
+        if 'minutes' in query:
+            start = time.time() - float(query['minutes'][0]) * 60
+        buffer = io.StringIO()
+        self.monitor.history.write_csv(buffer, resolution=resolution, start=start)
+        return buffer.getvalue()
+    
+    def _serve(self):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlsplit
+        
+        telemetry = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path == '/history.csv':
+                    try:
+                        body = telemetry.history_csv(parse_qs(url.query)).encode('utf-8')
+                    except ValueError as e:
+                        self.send_error(400, str(e))
+                        return
+                    content_type = 'text/csv; charset=utf-8'
+                elif url.path in ('/', '/metrics'):
+                    body = json.dumps(telemetry.snapshot(), indent=2).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass  # Konsole gehört der Statusanzeige
+        
+        # Nur lokal erreichbar
+        self.server = ThreadingHTTPServer(('127.0.0.1', self.http_port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name="telemetry-http", daemon=True).start()
+    
+    def start(self):
+        """Startet Log-Thread und HTTP-Endpunkt"""
+        if self.log_path:
+            self._log = open(self.log_path, 'a', encoding='utf-8')
+        if self.http_port is not None:
+            self._serve()
+            print(f"✓ Telemetrie: http://127.0.0.1:{self.server.server_address[1]}/metrics")
+        self.thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        """Schreibt eine letzte Log-Zeile und beendet Threads und Endpunkt"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        if self._log:
+            self.report()
+            self._log.close()
+            self._log = None
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()